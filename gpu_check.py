@@ -4,22 +4,373 @@ print(torch.__version__)
 print(f'cuda is available {torch.cuda.is_available()}')
 
 #%%
+import os
+import json
+import time
+import platform
+import argparse
+
+MACHINE_PROFILE_FILE = "machine_profile.json"
+MACHINE_PROFILE_VERSION = 1
+
+
+def _cpu_flags():
+    """CPU 가 지원하는 명령어 확장(flags) 집합 (/proc/cpuinfo, 없으면 torch 가 감지한 capability)"""
+    flags = set()
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags") or line.startswith("Features"):
+                    flags.update(line.split(":", 1)[1].split())
+                    break
+    except OSError:
+        pass
+
+    if not flags:
+        # /proc/cpuinfo 가 없는 OS (Windows, macOS) 는 torch 가 고른 커널 수준으로 추정
+        import torch
+        try:
+            capability = torch.backends.cpu.get_cpu_capability()
+        except AttributeError:
+            capability = ""
+        if capability.startswith("AVX512"):
+            flags.update(("avx2", "avx512f"))
+        elif capability == "AVX2":
+            flags.add("avx2")
+    return flags
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _physical_cores():
+    """물리 코어 수 (psutil 이 없으면 /proc/cpuinfo 의 (physical id, core id) 쌍으로 계산)"""
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+        if count:
+            return count
+    except ImportError:
+        pass
+
+    cores = set()
+    physical_id = core_id = None
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("physical id"):
+                    physical_id = line.split(":", 1)[1].strip()
+                elif line.startswith("core id"):
+                    core_id = line.split(":", 1)[1].strip()
+                elif not line.strip() and core_id is not None:
+                    cores.add((physical_id, core_id))
+                    physical_id = core_id = None
+    except OSError:
+        pass
+    return len(cores) or os.cpu_count() or 1
+
+
+def _memory_gb():
+    """(전체, 사용 가능) RAM 크기 (GB)"""
+    try:
+        import psutil
+        memory = psutil.virtual_memory()
+        return memory.total / 1e9, memory.available / 1e9
+    except ImportError:
+        pass
+
+    info = {}
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                info[key] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return None, None
+    return info.get("MemTotal", 0) / 1e9, info.get("MemAvailable", 0) / 1e9
+
+
+def probe_cpu():
+    """
+    CPU 코어 수, 명령어 확장(AVX2/AVX-512/AMX), 네이티브 bf16/fp16 지원, RAM 을 조사합니다.
+
+    Returns:
+        dict: CPU 정보
+    """
+    flags = _cpu_flags()
+    logical = os.cpu_count() or 1
+    try:
+        usable = len(os.sched_getaffinity(0))
+    except AttributeError:
+        usable = logical
+    total_gb, available_gb = _memory_gb()
+
+    isa = [name for name, flag in (("AVX2", "avx2"), ("AVX-512", "avx512f"), ("AVX512-BF16", "avx512_bf16"),
+                                   ("AVX512-FP16", "avx512_fp16"), ("AMX-BF16", "amx_bf16"), ("AMX-INT8", "amx_int8"),
+                                   ("NEON", "asimd"))
+           if flag in flags]
+    return {
+        "model": _cpu_model(),
+        "physical_cores": _physical_cores(),
+        "logical_cores": logical,
+        "usable_cores": usable,
+        "isa": isa,
+        # bf16 행렬곱을 하드웨어로 처리할 수 있어야 float32 보다 빠를 수 있음
+        "native_bf16": bool(flags & {"avx512_bf16", "amx_bf16"}),
+        "native_fp16": bool(flags & {"avx512_fp16", "amx_fp16", "asimdhp"}),
+        "memory_total_gb": total_gb,
+        "memory_available_gb": available_gb,
+    }
+
+
+def probe_gpus():
+    """CUDA GPU 별 이름, compute capability, 메모리, bf16/fp16 지원"""
+    import torch
+
+    gpus = []
+    if not torch.cuda.is_available():
+        return gpus
+    for i in range(torch.cuda.device_count()):
+        props = torch.cuda.get_device_properties(i)
+        try:
+            free, total = torch.cuda.mem_get_info(i)
+        except RuntimeError:
+            free, total = None, props.total_memory
+        with torch.cuda.device(i):
+            bf16 = torch.cuda.is_bf16_supported()
+        gpus.append({
+            "index": i,
+            "name": props.name,
+            "capability": f"{props.major}.{props.minor}",
+            "memory_total_gb": total / 1e9,
+            "memory_free_gb": free / 1e9 if free is not None else None,
+            "bf16": bool(bf16),
+            "fp16": (props.major, props.minor) >= (5, 3),
+        })
+    return gpus
+
+
+def _time_per_call(fn, device, min_sec=0.2, max_iters=50):
+    """fn 한 번 실행 시간 (초, 워밍업 1회 후 min_sec 동안 반복한 평균)"""
+    import torch
+
+    def sync():
+        if str(device).startswith("cuda"):
+            torch.cuda.synchronize(device)
+
+    fn()
+    sync()
+    iters = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        iters += 1
+        sync()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sec or iters >= max_iters:
+            return elapsed / iters
+
+
+def bench_matmul(device, dtype, size=1024):
+    """size x size 행렬곱 처리량 (GFLOPS)"""
+    import torch
+
+    a = torch.randn(size, size, device=device).to(dtype)
+    b = torch.randn(size, size, device=device).to(dtype)
+    with torch.inference_mode():
+        sec = _time_per_call(lambda: torch.matmul(a, b), device)
+    return 2 * size ** 3 / sec / 1e9
+
+
+def bench_attention(device, dtype, heads=8, seq_len=256, head_dim=64):
+    """scaled dot-product attention 한 번의 시간 (ms, Whisper 디코더/Gemma 어텐션과 비슷한 크기)"""
+    import torch
+    import torch.nn.functional as F
+
+    q, k, v = (torch.randn(1, heads, seq_len, head_dim, device=device).to(dtype) for _ in range(3))
+    with torch.inference_mode():
+        sec = _time_per_call(lambda: F.scaled_dot_product_attention(q, k, v, is_causal=True), device)
+    return sec * 1000
+
+
+def bench_threads(thread_counts, size=512):
+    """CPU 스레드 수별 float32 행렬곱 처리량 (GFLOPS)"""
+    import torch
+
+    previous = torch.get_num_threads()
+    results = {}
+    try:
+        for count in thread_counts:
+            torch.set_num_threads(count)
+            results[str(count)] = bench_matmul("cpu", torch.float32, size)
+    finally:
+        torch.set_num_threads(previous)
+    return results
+
+
+def bench_int8_linear(in_features=2048, out_features=2048, tokens=8):
+    """
+    동적 int8 양자화 Linear 의 float32 대비 속도 배율 (토큰 생성처럼 작은 배치 기준)
+
+    Returns:
+        float or None: 배율 (양자화 엔진을 쓸 수 없으면 None)
+    """
+    import torch
+
+    model = torch.nn.Sequential(torch.nn.Linear(in_features, out_features)).eval()
+    x = torch.randn(tokens, in_features)
+    try:
+        quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        with torch.inference_mode():
+            fp32_sec = _time_per_call(lambda: model(x), "cpu")
+            int8_sec = _time_per_call(lambda: quantized(x), "cpu")
+    except (RuntimeError, AttributeError) as e:
+        print(f"int8 양자화 벤치마크 생략: {e}")
+        return None
+    return fp32_sec / int8_sec
+
+
+def _bench_device(device, dtypes, size):
+    """디바이스의 dtype 별 행렬곱/어텐션 벤치마크 (실패한 dtype 은 제외)"""
+    import torch
+
+    results = {"matmul_gflops": {}, "attention_ms": {}}
+    for dtype in dtypes:
+        name = str(dtype).replace("torch.", "")
+        try:
+            results["matmul_gflops"][name] = bench_matmul(device, dtype, size)
+            results["attention_ms"][name] = bench_attention(device, dtype)
+        except RuntimeError as e:
+            print(f"{device} {name} 벤치마크 실패: {e}")
+            results["matmul_gflops"].pop(name, None)
+            results["attention_ms"].pop(name, None)
+    if str(device).startswith("cuda"):
+        torch.cuda.empty_cache()
+    return results
+
+
+def _relative_time(bench, dtype, base="float32"):
+    """float32 대비 상대 시간 (행렬곱과 어텐션의 평균, 1보다 작으면 더 빠름)"""
+    if dtype not in bench["matmul_gflops"] or base not in bench["matmul_gflops"]:
+        return None
+    matmul = bench["matmul_gflops"][base] / bench["matmul_gflops"][dtype]
+    attention = bench["attention_ms"][dtype] / bench["attention_ms"][base]
+    return (matmul + attention) / 2
+
+
+def recommend_profile(cpu, gpus, benchmarks, margin=0.9):
+    """
+    벤치마크 결과로 STT/LLM 의 디바이스, dtype, 스레드 수, 양자화 방식을 고릅니다.
+
+    - GPU 가 있으면 cuda:0. STT 는 float16/bfloat16 중 빠른 쪽,
+      LLM 은 float16 에서 오버플로가 나는 Gemma 계열을 고려해 bfloat16 (미지원이면 float32)
+    - CPU 에서는 네이티브 bf16 이 있고 float32 보다 margin 이상 빠를 때만 bfloat16
+    - CPU float32 LLM 은 int8 동적 양자화가 1.2배 이상 빠르면 양자화
+    - 스레드 수는 처리량이 최고치의 95% 이상인 가장 적은 값
+
+    Returns:
+        dict: {"stt": {...}, "llm": {...}}
+    """
+    threads = benchmarks.get("cpu_threads") or {}
+    if threads:
+        best = max(threads.values())
+        thread_count = min(int(count) for count, gflops in threads.items() if gflops >= best * 0.95)
+    else:
+        thread_count = cpu["physical_cores"]
+
+    if gpus and "cuda:0" in benchmarks:
+        bench = benchmarks["cuda:0"]
+        candidates = [d for d in ("float16", "bfloat16") if _relative_time(bench, d) is not None]
+        stt_dtype = min(candidates, key=lambda d: _relative_time(bench, d)) if candidates else "float32"
+        llm_dtype = "bfloat16" if gpus[0]["bf16"] else "float32"
+        return {
+            "stt": {"device": "cuda:0", "torch_dtype": stt_dtype, "threads": thread_count, "quantization": None},
+            "llm": {"device": "cuda:0", "torch_dtype": llm_dtype, "threads": thread_count, "quantization": None},
+        }
+
+    bench = benchmarks["cpu"]
+    relative = _relative_time(bench, "bfloat16")
+    dtype = "bfloat16" if cpu["native_bf16"] and relative is not None and relative < margin else "float32"
+    speedup = benchmarks.get("cpu_int8_speedup")
+    quantization = "dynamic_int8" if dtype == "float32" and speedup is not None and speedup >= 1.2 else None
+    return {
+        "stt": {"device": "cpu", "torch_dtype": dtype, "threads": thread_count, "quantization": None},
+        "llm": {"device": "cpu", "torch_dtype": dtype, "threads": thread_count, "quantization": quantization},
+    }
+
+
+def probe_machine():
+    """
+    하드웨어 성능을 조사하고 마이크로 벤치마크를 실행하여 머신 프로파일을 만듭니다. (수십 초 소요)
+
+    Returns:
+        dict: machine_profile.json 에 저장되는 프로파일
+    """
+    import torch
+
+    cpu = probe_cpu()
+    gpus = probe_gpus()
+    benchmarks = {}
+
+    print("CPU 벤치마크 중...")
+    benchmarks["cpu"] = _bench_device("cpu", (torch.float32, torch.bfloat16), size=512)
+    counts = sorted({max(1, cpu["physical_cores"] // 2), cpu["physical_cores"], cpu["usable_cores"]})
+    benchmarks["cpu_threads"] = bench_threads(counts)
+    benchmarks["cpu_int8_speedup"] = bench_int8_linear()
+
+    if gpus:
+        print(f"GPU 벤치마크 중... ({gpus[0]['name']})")
+        dtypes = [torch.float32, torch.float16] + ([torch.bfloat16] if gpus[0]["bf16"] else [])
+        benchmarks["cuda:0"] = _bench_device("cuda:0", dtypes, size=2048)
+
+    return {
+        "version": MACHINE_PROFILE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "torch_version": torch.__version__,
+        "cpu": cpu,
+        "gpus": gpus,
+        "benchmarks": benchmarks,
+        "recommended": recommend_profile(cpu, gpus, benchmarks),
+    }
+
+
+def save_machine_profile(profile, cache_dir="./model_cache"):
+    """<cache_dir>/machine_profile.json 에 저장 (vcon 의 STT/LLM 로더가 읽음)"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, MACHINE_PROFILE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
 def check_torch_env():
     """
-    PyTorch 환경(버전, CUDA, MPS, GPU 정보 등)을 확인하여 문자열로 반환하는 함수입니다.
+    PyTorch 환경(버전, CUDA, MPS, GPU 정보 등)과 CPU 성능 정보를 확인하여 문자열로 반환하는 함수입니다.
     """
     import torch
 
     lines = []
     lines.append(f"PyTorch version: {torch.__version__}")
     lines.append(f"CUDA is available: {torch.cuda.is_available()}")
-    
+
     # CUDA 관련 정보 출력
     if torch.cuda.is_available():
         lines.append(f"CUDA version: {torch.version.cuda}")
         count = torch.cuda.device_count()
-        for i in range(count):
-            lines.append(f"GPU {i}: {torch.cuda.get_device_name(i)}")
+        for gpu in probe_gpus():
+            free = f"{gpu['memory_free_gb']:.1f}" if gpu['memory_free_gb'] is not None else "?"
+            lines.append(f"GPU {gpu['index']}: {gpu['name']} (sm {gpu['capability']}, "
+                         f"{free}/{gpu['memory_total_gb']:.1f} GB free, bf16 {gpu['bf16']}, fp16 {gpu['fp16']})")
         lines.append(f"GPU count: {count}")
         try:
             a = torch.rand(3).to('cuda')
@@ -35,9 +386,50 @@ def check_torch_env():
     # CUDA 빌드 여부 출력
     lines.append(f"CUDA built: {torch.backends.cuda.is_built()}")
 
+    # CPU 정보 출력
+    cpu = probe_cpu()
+    lines.append(f"CPU: {cpu['model']}")
+    lines.append(f"CPU cores: {cpu['physical_cores']} physical, {cpu['logical_cores']} logical, "
+                 f"{cpu['usable_cores']} usable")
+    lines.append(f"CPU ISA: {', '.join(cpu['isa']) or '-'}")
+    lines.append(f"CPU native bf16: {cpu['native_bf16']}, fp16: {cpu['native_fp16']}")
+    if cpu['memory_total_gb'] is not None:
+        lines.append(f"RAM: {cpu['memory_available_gb']:.1f}/{cpu['memory_total_gb']:.1f} GB available")
+
+    return "\n".join(lines)
+
+
+def format_profile(profile):
+    """머신 프로파일의 벤치마크와 추천 설정 요약 문자열"""
+    lines = []
+    for device, bench in profile["benchmarks"].items():
+        if isinstance(bench, dict) and "matmul_gflops" in bench:
+            for dtype, gflops in bench["matmul_gflops"].items():
+                lines.append(f"{device:>7} {dtype:>9}: matmul {gflops:8.1f} GFLOPS, "
+                             f"attention {bench['attention_ms'][dtype]:7.3f} ms")
+    threads = profile["benchmarks"].get("cpu_threads") or {}
+    if threads:
+        lines.append("CPU threads: " + ", ".join(f"{count}={gflops:.1f}" for count, gflops in threads.items()))
+    speedup = profile["benchmarks"].get("cpu_int8_speedup")
+    if speedup is not None:
+        lines.append(f"CPU int8 dynamic quantization speedup: {speedup:.2f}x")
+    for component, config in profile["recommended"].items():
+        lines.append(f"recommended {component}: {config['device']} {config['torch_dtype']}, "
+                     f"{config['threads']} threads, quantization {config['quantization'] or '-'}")
     return "\n".join(lines)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the torch environment and build the machine profile used by vcon")
+    parser.add_argument("--cache_dir", default="./model_cache", help="Where machine_profile.json is saved")
+    parser.add_argument("--env_only", action="store_true", help="Only print the environment (no benchmarks)")
+    args = parser.parse_args()
+
     # 직접 실행할 때 환경 정보를 출력합니다.
     print(check_torch_env())
+
+    if not args.env_only:
+        # 벤치마크 후 추천 설정을 머신 프로파일로 저장합니다.
+        machine_profile = probe_machine()
+        print(format_profile(machine_profile))
+        print(f"머신 프로파일 저장: {save_machine_profile(machine_profile, args.cache_dir)}")
@@ -12,25 +12,180 @@ please do not modify this comment block. you can modify other than this block.
 
 from dotenv import load_dotenv
 import os
+import json
+import time
+import fnmatch
+import hashlib
 import argparse
-from transformers import AutoConfig
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# The export layout is defined once in vcon/model_artifacts.py, which also locates exports at load time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "vcon"))
+from model_artifacts import EXPORT_INFO_FILE, exported_model_dir
 
 # Dictionary mapping model domains to their respective model classes
 MODEL_CLASSES = {
     "causal_lm": "AutoModelForCausalLM",  # GPT-like, Gemma, etc.
     "seq2seq_lm": "AutoModelForSeq2SeqLM",  # T5, BART, etc.
-    "speech_recognition": "AutoModelForSpeechRecognition",  # Whisper
+    "speech_recognition": "AutoModelForSpeechSeq2Seq",  # Whisper
     "vision_text": "AutoModelForVisionTextDual",  # CLIP, etc.
     "image_classification": "AutoModelForImageClassification",  # ViT, etc.
     "object_detection": "AutoModelForObjectDetection",  # DETR, etc.
     "masked_lm": "AutoModelForMaskedLM",  # BERT, RoBERTa, etc.
 }
 
-def get_model_domain(model_id):
+# Top-level repo files fetched in download-only mode (configs, tokenizer/processor files, safetensors weights)
+DOWNLOAD_PATTERNS = [
+    "*.json",
+    "*.safetensors",
+    "*.model",
+    "*.txt",
+    "*.tiktoken",
+]
+
+# Weights fetched only when the repo has no safetensors
+FALLBACK_WEIGHT_PATTERNS = ["*.bin"]
+
+# model_type (config.json) -> domain
+MODEL_TYPE_DOMAINS = {
+    "causal_lm": ["gpt2", "gpt_neo", "gpt_neox", "gptj", "llama", "gemma", "gemma2", "gemma3", "gemma3_text",
+                  "mistral", "mixtral", "phi", "phi3", "qwen2", "qwen3", "falcon", "opt", "exaone"],
+    "seq2seq_lm": ["t5", "mt5", "bart", "mbart", "pegasus", "marian"],
+    "speech_recognition": ["whisper", "wav2vec2", "hubert", "speech_to_text"],
+    "vision_text": ["clip", "blip", "blip-2"],
+    "image_classification": ["vit", "deit", "convnext", "resnet"],
+    "object_detection": ["detr", "yolos", "rt_detr"],
+    "masked_lm": ["bert", "roberta", "albert", "distilbert", "electra"],
+}
+
+# Architecture class suffix -> domain, checked before model_type
+ARCHITECTURE_DOMAINS = [
+    ("ForCausalLM", "causal_lm"),
+    ("ForSpeechSeq2Seq", "speech_recognition"),
+    ("ForCTC", "speech_recognition"),
+    ("ForMaskedLM", "masked_lm"),
+    ("ForImageClassification", "image_classification"),
+    ("ForObjectDetection", "object_detection"),
+]
+
+DOMAIN_INDEX_FILE = "domain_index.json"
+_index_lock = threading.Lock()
+
+def domain_from_config(config):
+    """
+    Map a model config (dict loaded from config.json) to a domain.
+    Returns None if the config does not identify a known domain.
+    """
+    model_type = config.get("model_type")
+    # Whisper's architecture is *ForConditionalGeneration, so model_type wins for speech models
+    if model_type in MODEL_TYPE_DOMAINS["speech_recognition"]:
+        return "speech_recognition"
+    for architecture in config.get("architectures") or []:
+        for suffix, domain in ARCHITECTURE_DOMAINS:
+            if architecture.endswith(suffix):
+                return domain
+    for domain, model_types in MODEL_TYPE_DOMAINS.items():
+        if model_type in model_types:
+            return domain
+    return None
+
+def _index_entry(config, commit=None):
+    return {
+        "model_type": config.get("model_type"),
+        "architectures": config.get("architectures"),
+        "domain": domain_from_config(config),
+        "commit": commit,
+    }
+
+def build_domain_index(cache_dir):
+    """
+    Build the domain index by scanning config.json files in a Hugging Face cache directory.
+    The newest snapshot of each repo wins. Works fully offline.
+
+    Returns:
+        dict: model_id -> {model_type, architectures, domain, commit}
+    """
+    index = {}
+    if not os.path.isdir(cache_dir):
+        return index
+    for repo_dir in os.listdir(cache_dir):
+        if not repo_dir.startswith("models--"):
+            continue
+        model_id = repo_dir[len("models--"):].replace("--", "/", 1)
+        snapshots_dir = os.path.join(cache_dir, repo_dir, "snapshots")
+        if not os.path.isdir(snapshots_dir):
+            continue
+        configs = [
+            os.path.join(snapshots_dir, commit, "config.json")
+            for commit in os.listdir(snapshots_dir)
+            if os.path.exists(os.path.join(snapshots_dir, commit, "config.json"))
+        ]
+        if not configs:
+            continue
+        config_path = max(configs, key=os.path.getmtime)
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping unreadable config {config_path}: {e}")
+            continue
+        index[model_id] = _index_entry(config, os.path.basename(os.path.dirname(config_path)))
+    return index
+
+def load_domain_index(cache_dir):
+    """Load the domain index from <cache_dir>/domain_index.json (empty dict if missing)."""
+    path = os.path.join(cache_dir, DOMAIN_INDEX_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_domain_index(cache_dir, index):
+    """Write the domain index atomically."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, DOMAIN_INDEX_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+def update_domain_index(cache_dir, model_id, config, commit=None):
+    """Add or refresh one model in the domain index. config is the parsed config.json dict."""
+    with _index_lock:
+        index = load_domain_index(cache_dir)
+        index[model_id] = _index_entry(config, commit)
+        save_domain_index(cache_dir, index)
+    return index[model_id]
+
+def rebuild_domain_index(cache_dir):
+    """Rescan the cache and merge the result into the stored domain index."""
+    with _index_lock:
+        index = load_domain_index(cache_dir)
+        index.update(build_domain_index(cache_dir))
+        save_domain_index(cache_dir, index)
+    return index
+
+def get_model_domain(model_id, cache_dir="./model_cache"):
     """
     Determine the most appropriate model domain based on model_id.
-    This is a heuristic approach and may need refinements.
+
+    The local domain index (built from config.json files in the cache) is consulted
+    first, so detection is instant and works offline. Then a name heuristic is tried,
+    and only as a last resort the config is fetched from the Hub (skipped when
+    HF_HUB_OFFLINE is set).
     """
+    if cache_dir:
+        entry = load_domain_index(cache_dir).get(model_id)
+        if entry is None:
+            # Cache may hold models downloaded before the index existed
+            entry = rebuild_domain_index(cache_dir).get(model_id)
+        if entry and entry.get("domain"):
+            return entry["domain"]
+
     model_id_lower = model_id.lower()
     
     if any(name in model_id_lower for name in ["gpt", "llama", "gemma", "mistral", "phi"]):
@@ -47,29 +202,27 @@ def get_model_domain(model_id):
         return "object_detection"
     elif any(name in model_id_lower for name in ["bert", "roberta", "albert"]):
         return "masked_lm"
+
+    # Try to determine from the remote model config
+    if os.getenv("HF_HUB_OFFLINE", "0").lower() in ("1", "true", "yes"):
+        print(f"Offline mode: no local config for {model_id}")
     else:
-        # Try to determine from model config
         try:
-            config = AutoConfig.from_pretrained(model_id)
-            model_type = config.model_type
-            
-            # Map model_type to domain
-            if model_type in ["gpt2", "gpt_neo", "llama", "gemma", "mistral"]:
-                return "causal_lm"
-            elif model_type in ["t5", "bart"]:
-                return "seq2seq_lm"
-            elif model_type in ["whisper", "wav2vec2"]:
-                return "speech_recognition"
-            elif model_type in ["bert", "roberta", "albert"]:
-                return "masked_lm"
-        except:
-            pass
-            
-        # Default to causal_lm if cannot determine
-        print(f"Could not determine model domain for {model_id}, defaulting to causal_lm")
-        return "causal_lm"
+            from transformers import AutoConfig
+            config = AutoConfig.from_pretrained(model_id, cache_dir=cache_dir)
+            domain = domain_from_config(config.to_dict())
+            if domain:
+                if cache_dir:
+                    update_domain_index(cache_dir, model_id, config.to_dict())
+                return domain
+        except (OSError, ValueError) as e:
+            print(f"Could not fetch config for {model_id}: {e}")
+        
+    # Default to causal_lm if cannot determine
+    print(f"Could not determine model domain for {model_id}, defaulting to causal_lm")
+    return "causal_lm"
 
-def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=True, torch_dtype="auto"):
+def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=True, torch_dtype="auto", revision=None):
     """
     Download and cache a Hugging Face model and its tokenizer or processor.
     
@@ -80,6 +233,7 @@ def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=T
                                If None, will try to auto-detect
         use_token (bool): Whether to use API token for authentication
         torch_dtype (str): Torch data type to use for the model
+        revision (str, optional): Branch, tag or commit to load
     
     Returns:
         tuple: (model, tokenizer_or_processor)
@@ -95,7 +249,7 @@ def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=T
     
     # Determine model domain if not provided
     if domain is None:
-        domain = get_model_domain(model_id)
+        domain = get_model_domain(model_id, cache_dir)
     
     print(f"Loading model '{model_id}' as {domain} type")
     
@@ -112,7 +266,8 @@ def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=T
     model_args = {
         "pretrained_model_name_or_path": model_id,
         "cache_dir": cache_dir,
-        "torch_dtype": torch_dtype
+        "torch_dtype": torch_dtype,
+        "revision": revision
     }
     
     # Add token if needed
@@ -121,6 +276,8 @@ def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=T
     
     # Load the model
     model = ModelClass.from_pretrained(**model_args)
+    update_domain_index(cache_dir, model_id, model.config.to_dict(),
+                        getattr(model.config, "_commit_hash", None))
     
     # For ASR models like Whisper, use processor instead of tokenizer
     if domain == "speech_recognition":
@@ -128,6 +285,7 @@ def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=T
         processor = AutoProcessor.from_pretrained(
             model_id, 
             cache_dir=cache_dir, 
+            revision=revision,
             token=token if use_token else None
         )
         tokenizer_or_processor = processor
@@ -137,6 +295,7 @@ def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=T
         tokenizer = AutoTokenizer.from_pretrained(
             model_id, 
             cache_dir=cache_dir, 
+            revision=revision,
             token=token if use_token else None
         )
         tokenizer_or_processor = tokenizer
@@ -147,31 +306,450 @@ def download_model(model_id, cache_dir="./model_cache", domain=None, use_token=T
     
     return model, tokenizer_or_processor
 
+def _file_digest(path, algorithm="sha256", header=None):
+    """Hash a file in 1 MiB chunks, optionally prefixed with a header (used for git blob ids)."""
+    h = hashlib.new(algorithm)
+    if header:
+        h.update(header)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def verify_file(path, entry):
+    """
+    Verify a downloaded file against the checksum reported by the Hub.
+    LFS files (weights) carry a sha256; regular files are checked against their git blob sha1.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) != entry["size"]:
+        return False
+    if entry.get("sha256"):
+        return _file_digest(path, "sha256") == entry["sha256"]
+    if entry.get("blob_id"):
+        header = f"blob {entry['size']}\0".encode()
+        return _file_digest(path, "sha1", header) == entry["blob_id"]
+    return True
+
+def resolve_repo_files(model_id, revision=None, token=None, patterns=None):
+    """
+    Resolve the list of files to fetch for a model repo, with sizes and checksums.
+
+    Returns:
+        tuple: (commit_sha, list of file entries)
+    """
+    from huggingface_hub import HfApi
+
+    info = HfApi(token=token).model_info(model_id, revision=revision, files_metadata=True)
+    patterns = patterns or DOWNLOAD_PATTERNS
+
+    def matches(name, pats):
+        return "/" not in name and any(fnmatch.fnmatch(name, p) for p in pats)
+
+    siblings = info.siblings or []
+    selected = [s for s in siblings if matches(s.rfilename, patterns)]
+    if not any(s.rfilename.endswith(".safetensors") for s in selected):
+        selected += [s for s in siblings if matches(s.rfilename, FALLBACK_WEIGHT_PATTERNS)]
+
+    entries = []
+    for s in selected:
+        lfs = s.lfs or {}
+        entries.append({
+            "name": s.rfilename,
+            "size": s.size if s.size is not None else lfs.get("size", 0),
+            "sha256": lfs.get("sha256"),
+            "blob_id": None if lfs else s.blob_id,
+        })
+    # Largest files first so the long transfers start immediately
+    entries.sort(key=lambda e: e["size"] or 0, reverse=True)
+    return info.sha, entries
+
+def manifest_path(cache_dir, model_id):
+    """Path of the download manifest written for a model."""
+    return os.path.join(cache_dir, "manifests", model_id.replace("/", "--") + ".json")
+
+def write_manifest(cache_dir, manifest):
+    """Write a download manifest atomically."""
+    path = manifest_path(cache_dir, manifest["model_id"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+def _fetch_file(model_id, commit, entry, cache_dir, token):
+    """Download (or resume) a single file and verify it. Retries once from scratch on a checksum mismatch."""
+    from huggingface_hub import hf_hub_download
+
+    for attempt in range(2):
+        path = hf_hub_download(
+            repo_id=model_id,
+            filename=entry["name"],
+            revision=commit,
+            cache_dir=cache_dir,
+            token=token,
+            force_download=attempt > 0,
+        )
+        if verify_file(path, entry):
+            return path
+        print(f"Checksum mismatch for {entry['name']}, re-downloading")
+    raise IOError(f"Checksum verification failed for {model_id}/{entry['name']}")
+
+def download_files(model_id, cache_dir="./model_cache", revision=None, domain=None, token=None, max_workers=8,
+                   torch_dtype=None):
+    """
+    Fetch model files into the Hugging Face cache without instantiating the model.
+
+    Weights, configs and tokenizer files are downloaded concurrently; interrupted
+    downloads resume from their partial files. Every file is verified against the
+    Hub checksum and a manifest is written to <cache_dir>/manifests/.
+
+    Args:
+        model_id (str): The model ID on Hugging Face Hub
+        cache_dir (str): Directory to store the downloaded files
+        revision (str, optional): Branch, tag or commit to download
+        domain (str, optional): Model domain, recorded in the manifest
+        token (str, optional): Hugging Face API token
+        max_workers (int): Number of concurrent file downloads
+        torch_dtype (str, optional): Intended torch dtype, recorded in the manifest
+
+    Returns:
+        dict: The written manifest
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    start = time.time()
+
+    commit, entries = resolve_repo_files(model_id, revision=revision, token=token)
+    total_bytes = sum(e["size"] or 0 for e in entries)
+    print(f"Fetching {len(entries)} files ({total_bytes / 1e6:.1f} MB) for '{model_id}' @ {commit[:10]}")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(_fetch_file, model_id, commit, entry, cache_dir, token): entry
+            for entry in entries
+        }
+        for future in as_completed(futures):
+            entry = futures[future]
+            entry["path"] = os.path.relpath(future.result(), cache_dir)
+            print(f"  [{model_id}] {entry['name']} ({(entry['size'] or 0) / 1e6:.1f} MB) verified")
+
+    config_entry = next((e for e in entries if e["name"] == "config.json"), None)
+    if config_entry:
+        with open(os.path.join(cache_dir, config_entry["path"]), "r", encoding="utf-8") as f:
+            index_entry = update_domain_index(cache_dir, model_id, json.load(f), commit)
+        domain = domain or index_entry["domain"]
+
+    elapsed = time.time() - start
+    manifest = {
+        "model_id": model_id,
+        "revision": revision,
+        "commit": commit,
+        "domain": domain,
+        "torch_dtype": torch_dtype,
+        "files": sorted(entries, key=lambda e: e["name"]),
+        "total_bytes": total_bytes,
+        "elapsed_sec": round(elapsed, 3),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    path = write_manifest(cache_dir, manifest)
+    print(f"Downloaded '{model_id}' in {elapsed:.1f}s ({total_bytes / 1e6 / max(elapsed, 1e-6):.1f} MB/s), manifest: {path}")
+    return manifest
+
+def export_model(model_id, profile, cache_dir="./model_cache", domain=None, use_token=True):
+    """
+    Export a model as pre-cast, device-ready safetensors for one inference profile.
+
+    The model is loaded once here, cast to the profile dtype and saved with its
+    tokenizer/processor, so the vcon loaders can memory-map the files at startup
+    without any dtype conversion.
+
+    Args:
+        model_id (str): The model ID on Hugging Face Hub
+        profile (str): "<device>-<dtype>", e.g. "cpu-float32", "cpu-bfloat16", "cuda-float16"
+        cache_dir (str): Hugging Face cache directory; exports go to <cache_dir>/exported/
+        domain (str, optional): Model domain, auto-detected if None
+        use_token (bool): Whether to use API token for authentication
+
+    Returns:
+        str: The export directory
+    """
+    import torch
+
+    device, _, dtype_name = profile.partition("-")
+    torch_dtype = getattr(torch, dtype_name, None)
+    if device not in ("cpu", "cuda", "mps") or not isinstance(torch_dtype, torch.dtype):
+        raise ValueError(f"Invalid export profile '{profile}', expected e.g. cpu-float32 or cuda-float16")
+
+    domain = domain or get_model_domain(model_id, cache_dir)
+    start = time.time()
+    model, tokenizer_or_processor = download_model(
+        model_id=model_id,
+        cache_dir=cache_dir,
+        domain=domain,
+        use_token=use_token,
+        torch_dtype=torch_dtype
+    )
+    # Weights are cast at load time; keep all floating tensors in the profile dtype
+    model = model.to(dtype=torch_dtype)
+
+    export_dir = exported_model_dir(cache_dir, model_id, profile)
+    os.makedirs(export_dir, exist_ok=True)
+    model.save_pretrained(export_dir, safe_serialization=True, max_shard_size="2GB")
+    tokenizer_or_processor.save_pretrained(export_dir)
+
+    info = {
+        "model_id": model_id,
+        "profile": profile,
+        "device": device,
+        "torch_dtype": dtype_name,
+        "domain": domain,
+        "source_commit": getattr(model.config, "_commit_hash", None),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(export_dir, EXPORT_INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+
+    del model
+    print(f"Exported '{model_id}' for profile {profile} in {time.time() - start:.1f}s: {export_dir}")
+    return export_dir
+
+def is_download_complete(cache_dir, model_id, revision=None, require_loaded=False):
+    """
+    Check the cache for a finished download of model_id using its manifest.
+    Only file presence and sizes are checked, so this is cheap and works offline.
+    With require_loaded, the manifest must also record a successful model load (download_only: false).
+    """
+    path = manifest_path(cache_dir, model_id)
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if revision and revision not in (manifest.get("revision"), manifest.get("commit")):
+        return False
+    if require_loaded and not manifest.get("loaded"):
+        return False
+    for entry in manifest.get("files", []):
+        file_path = os.path.join(cache_dir, entry.get("path", ""))
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != entry["size"]:
+            return False
+    return True
+
+def load_prefetch_manifest(manifest_file):
+    """
+    Load a prefetch manifest (YAML or JSON) listing the models to provision.
+
+    Expected layout:
+        cache_dir: ./model_cache      # optional
+        max_parallel: 2               # optional, models processed at once
+        models:
+          - model_id: google/gemma-3-1b-it
+            revision: main            # optional
+            domain: causal_lm         # optional
+            torch_dtype: bfloat16     # optional
+            download_only: true       # optional, default true
+    """
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        if manifest_file.lower().endswith((".yaml", ".yml")):
+            import yaml
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    # A bare list of models is accepted as well
+    if isinstance(data, list):
+        data = {"models": data}
+    models = []
+    for item in data.get("models", []):
+        if isinstance(item, str):
+            item = {"model_id": item}
+        if not item.get("model_id"):
+            raise ValueError(f"Manifest entry without model_id: {item}")
+        models.append(item)
+    data["models"] = models
+    return data
+
+def _prefetch_one(entry, cache_dir, token, max_workers):
+    """Process a single prefetch manifest entry and return its report."""
+    model_id = entry["model_id"]
+    revision = entry.get("revision")
+    report = {"model_id": model_id, "revision": revision, "status": "skipped", "bytes": 0,
+              "elapsed_sec": 0.0, "mb_per_sec": 0.0}
+
+    download_only = entry.get("download_only", True)
+    if is_download_complete(cache_dir, model_id, revision, require_loaded=not download_only):
+        with open(manifest_path(cache_dir, model_id), "r", encoding="utf-8") as f:
+            report["bytes"] = json.load(f).get("total_bytes", 0)
+        print(f"[{model_id}] already complete in cache, skipping")
+        return report
+
+    start = time.time()
+    try:
+        # Files are always fetched through download_files so both modes write the completion manifest
+        manifest = download_files(
+            model_id=model_id,
+            cache_dir=cache_dir,
+            revision=revision,
+            domain=entry.get("domain"),
+            token=token,
+            max_workers=max_workers,
+            torch_dtype=entry.get("torch_dtype"),
+        )
+        report["bytes"] = manifest["total_bytes"]
+        if not download_only:
+            # Also load the model once from the pinned commit to check that it instantiates
+            download_model(
+                model_id=model_id,
+                cache_dir=cache_dir,
+                domain=entry.get("domain"),
+                use_token=token is not None,
+                torch_dtype=entry.get("torch_dtype", "auto"),
+                revision=manifest["commit"],
+            )
+            manifest["loaded"] = True
+            write_manifest(cache_dir, manifest)
+        report["status"] = "downloaded"
+    except Exception as e:
+        report["status"] = "failed"
+        report["error"] = str(e)
+        print(f"[{model_id}] failed: {e}")
+
+    report["elapsed_sec"] = round(time.time() - start, 3)
+    report["mb_per_sec"] = round(report["bytes"] / 1e6 / max(report["elapsed_sec"], 1e-6), 2)
+    return report
+
+def prefetch_models(manifest_file, cache_dir=None, max_parallel=None, max_workers=8, use_token=True):
+    """
+    Provision every model listed in a prefetch manifest with a bounded worker pool.
+    Models already complete in the cache are skipped, so the command is idempotent.
+
+    Args:
+        manifest_file (str): YAML or JSON prefetch manifest
+        cache_dir (str, optional): Overrides the manifest's cache_dir
+        max_parallel (int, optional): Overrides the manifest's max_parallel (models at once)
+        max_workers (int): Concurrent file downloads per model
+        use_token (bool): Whether to use API token for authentication
+
+    Returns:
+        list: Per-model reports (status, bytes, elapsed_sec, mb_per_sec)
+    """
+    # Environment is loaded once for the whole batch
+    load_dotenv('.env')
+    token = os.getenv("HUGGINGFACEHUB_API_TOKEN") if use_token else None
+
+    manifest = load_prefetch_manifest(manifest_file)
+    cache_dir = cache_dir or manifest.get("cache_dir", "./model_cache")
+    max_parallel = max_parallel or manifest.get("max_parallel", 2)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    start = time.time()
+    reports = []
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        futures = [executor.submit(_prefetch_one, entry, cache_dir, token, max_workers)
+                   for entry in manifest["models"]]
+        for future in futures:
+            reports.append(future.result())
+    elapsed = time.time() - start
+
+    print(f"\n{'model':<45} {'status':<11} {'MB':>10} {'sec':>8} {'MB/s':>8}")
+    for r in reports:
+        print(f"{r['model_id']:<45} {r['status']:<11} {r['bytes'] / 1e6:>10.1f} "
+              f"{r['elapsed_sec']:>8.1f} {r['mb_per_sec']:>8.1f}")
+    total_bytes = sum(r["bytes"] for r in reports if r["status"] == "downloaded")
+    print(f"Total: {total_bytes / 1e6:.1f} MB downloaded in {elapsed:.1f}s")
+    return reports
+
 def main():
     parser = argparse.ArgumentParser(description="Download and cache Hugging Face models")
     parser.add_argument("--model_id", type=str, 
                         help="The model ID on Hugging Face Hub (e.g., 'google/gemma-3-1b-it')")
-    parser.add_argument("--cache_dir", type=str, default="./model_cache",
-                        help="Directory to store the downloaded model")
+    parser.add_argument("--manifest", type=str, default=None,
+                        help="YAML/JSON prefetch manifest listing several models to provision")
+    parser.add_argument("--max_parallel", type=int, default=None,
+                        help="Number of models processed at once with --manifest")
+    parser.add_argument("--report", type=str, default=None,
+                        help="Write the per-model prefetch report to this JSON file")
+    parser.add_argument("--export", type=str, nargs="+", default=None, metavar="PROFILE",
+                        help="Export pre-cast safetensors for the given profiles (e.g. cpu-float32 cuda-float16)")
+    parser.add_argument("--rebuild_index", action="store_true",
+                        help="Rescan the cache's config.json files into the offline domain index and exit")
+    parser.add_argument("--cache_dir", type=str, default=None,
+                        help="Directory to store the downloaded model (default: ./model_cache)")
     parser.add_argument("--domain", type=str, choices=list(MODEL_CLASSES.keys()), default=None,
                         help="Model domain (causal_lm, speech_recognition, etc.)")
     parser.add_argument("--no_token", action="store_true", 
                         help="Don't use API token even if available in .env")
     parser.add_argument("--torch_dtype", type=str, default="auto",
                         help="Torch data type to use for the model")
+    parser.add_argument("--download_only", action="store_true",
+                        help="Only fetch files into the cache (concurrent, resumable, verified); never load the model")
+    parser.add_argument("--revision", type=str, default=None,
+                        help="Branch, tag or commit to download")
+    parser.add_argument("--max_workers", type=int, default=8,
+                        help="Number of concurrent file downloads (download-only mode)")
     
     args = parser.parse_args()
     
+    if args.rebuild_index:
+        index = rebuild_domain_index(args.cache_dir or "./model_cache")
+        for model_id, entry in sorted(index.items()):
+            print(f"{model_id:<45} {entry.get('model_type') or '-':<16} {entry.get('domain') or '-'}")
+        return index
+    
+    if args.manifest:
+        reports = prefetch_models(
+            manifest_file=args.manifest,
+            cache_dir=args.cache_dir,
+            max_parallel=args.max_parallel,
+            max_workers=args.max_workers,
+            use_token=not args.no_token
+        )
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(reports, f, ensure_ascii=False, indent=2)
+        # Exit nonzero when any model failed, so provisioning scripts notice
+        if any(r["status"] == "failed" for r in reports):
+            sys.exit(1)
+        return reports
+    
     # If running as a script, model_id is required
     if args.model_id is None:
-        parser.error("the following arguments are required: --model_id")
+        parser.error("the following arguments are required: --model_id (or --manifest)")
+    args.cache_dir = args.cache_dir or "./model_cache"
+    
+    if args.export:
+        return [
+            export_model(
+                model_id=args.model_id,
+                profile=profile,
+                cache_dir=args.cache_dir,
+                domain=args.domain,
+                use_token=not args.no_token
+            )
+            for profile in args.export
+        ]
+    
+    if args.download_only:
+        load_dotenv('.env')
+        token = None if args.no_token else os.getenv("HUGGINGFACEHUB_API_TOKEN")
+        return download_files(
+            model_id=args.model_id,
+            cache_dir=args.cache_dir,
+            revision=args.revision,
+            domain=args.domain,
+            token=token,
+            max_workers=args.max_workers
+        )
     
     model, tokenizer_or_processor = download_model(
         model_id=args.model_id,
         cache_dir=args.cache_dir,
         domain=args.domain,
         use_token=not args.no_token,
-        torch_dtype=args.torch_dtype
+        torch_dtype=args.torch_dtype,
+        revision=args.revision
     )
     
     return model, tokenizer_or_processor
@@ -18,6 +18,7 @@ import time
 from serial_port_manager import SerialPortManager
 from voice_command_manager import VoiceCommandManager
 from drone_control_manager import DroneControlManager
+from resource_plan import load_resource_plan
 
 class DroneControlApp:
     def __init__(self, root):
@@ -39,11 +40,16 @@ class DroneControlApp:
         # 로그 텍스트 창 생성 (로그 관리자 모듈 초기화보다 먼저 해야 함)
         self.create_log_widget()
         
+        # 구성 요소별 CPU 자원 계획 (Tk 루프는 "ui" 자원 사용)
+        self.resource_plan = load_resource_plan()
+        self.resource_plan.apply("ui")
+        
         # 모듈 초기화
         self.init_modules()
         
         # UI 구성
         self.create_ui()
+        self.log(f"CPU 자원 계획: {self.resource_plan.describe()}")
     
     def init_modules(self):
         """각 모듈 초기화"""
@@ -0,0 +1,243 @@
+"""
+네트워크 오디오 클라이언트 (원격 스테이션 / 루프백 테스트)
+
+audio_server.py 로 오디오를 UDP 스트림으로 보내고 인식 결과를 받습니다.
+WAV 파일을 실시간 속도로 흘려 보내면 한 PC 에서 서버와 함께 실행해 전체 경로를 시험할 수 있고,
+--clients 로 여러 스테이션이 동시에 말하는 상황을 만들 수 있습니다.
+--mic 를 주면 마이크 입력을 계속 스트리밍합니다 (발화 구간은 서버가 잘라냄).
+
+사용법:
+    python audio_server.py --simulate alpha bravo          (다른 터미널)
+    python audio_client.py --drone alpha sample1.wav sample2.wav
+    python audio_client.py --drone bravo --clients 3 --name station sample1.wav
+    python audio_client.py --server 192.168.0.10:50007 --token 공유토큰 --drone alpha --mic
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+
+import numpy as np
+
+from audio_input import TARGET_SAMPLE_RATE, PolyphaseResampler, to_float32_mono, load_audio_file
+from audio_protocol import DEFAULT_PORT, HELLO, AUDIO, END, BYE, RESULT, STATUS, MAX_DATAGRAM, encode_packet, decode_packet
+
+
+class AudioStreamClient:
+    """서버 하나에 오디오를 보내고 결과를 받는 클라이언트"""
+
+    def __init__(self, server, name, drone=None, frame_ms=20, log=print, token=None):
+        """
+        Args:
+            server (tuple): (호스트, 포트)
+            name (str): 클라이언트 이름 (서버의 클라이언트-드론 매핑에 사용)
+            drone (str, optional): 대상 드론 id
+            frame_ms (int): 패킷 하나에 담을 오디오 길이 (ms)
+            log (callable): 로그 함수
+            token (str, optional): 서버의 공유 토큰 (HELLO 에 담아 보냄)
+        """
+        self.server = server
+        self.name = name
+        self.drone = drone
+        self.token = token
+        self.frame_len = int(TARGET_SAMPLE_RATE * frame_ms / 1000)
+        self.log = log
+        self.seq = 0
+        self.results = []  # (END 전송부터 결과 수신까지 초, 결과 dict)
+
+        self._status = None
+        self._status_event = threading.Event()
+        self._result_event = threading.Event()
+        self._sent_end = []  # END 를 보낸 시각 (결과와 순서대로 짝지음)
+        self._closed = False
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(0.5)
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+
+    def connect(self, timeout_sec=3.0):
+        """
+        HELLO 를 보내고 서버 응답 대기
+
+        Raises:
+            ConnectionError: 응답이 없거나 서버가 거절한 경우
+        """
+        hello = {"client": self.name, "drone": self.drone, "sample_rate": TARGET_SAMPLE_RATE}
+        if self.token is not None:
+            hello["token"] = self.token
+        self._send(HELLO, hello)
+        self._thread.start()
+        if not self._status_event.wait(timeout_sec):
+            raise ConnectionError(f"서버 응답 없음: {self.server[0]}:{self.server[1]}")
+        if not self._status.get("ok"):
+            raise ConnectionError(self._status.get("message", "서버가 연결을 거절했습니다."))
+        self.log(f"[{self.name}] {self._status.get('message', '')}")
+
+    def send_audio(self, audio, realtime=True, end=True):
+        """
+        16 kHz float32 모노 오디오를 패킷으로 나눠 전송
+
+        Args:
+            audio (np.ndarray): 오디오
+            realtime (bool): 실제 말하는 속도로 보낼지 여부
+            end (bool): 끝에 END 를 보내 발화를 바로 끝낼지 여부
+        """
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+        start = time.perf_counter()
+        for i in range(0, len(pcm), self.frame_len):
+            if realtime:
+                delay = start + i / TARGET_SAMPLE_RATE - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self._send(AUDIO, pcm[i:i + self.frame_len].tobytes())
+        if end:
+            self.end_utterance()
+
+    def end_utterance(self):
+        self._sent_end.append(time.perf_counter())
+        self._send(END)
+
+    def wait_result(self, timeout_sec=30.0):
+        """
+        결과 하나를 기다림
+
+        Returns:
+            dict or None: 결과 (시간 안에 오지 않으면 None)
+        """
+        count = len(self.results)
+        deadline = time.monotonic() + timeout_sec
+        while len(self.results) == count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._result_event.wait(remaining)
+            self._result_event.clear()
+        return self.results[-1][1]
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._send(BYE)
+            if self._thread.is_alive():
+                self._thread.join()
+            self.sock.close()
+
+    def _send(self, kind, payload=b""):
+        self.seq += 1
+        self.sock.sendto(encode_packet(kind, self.seq, payload), self.server)
+
+    def _receive(self):
+        while not self._closed:
+            try:
+                data, _ = self.sock.recvfrom(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            packet = decode_packet(data)
+            if packet is None:
+                continue
+            kind, _, payload = packet
+            message = json.loads(payload.decode("utf-8"))
+            if kind == STATUS:
+                self._status = message
+                self._status_event.set()
+                if not message.get("ok"):
+                    self.log(f"[{self.name}] 서버: {message.get('message')}")
+            elif kind == RESULT:
+                sent = self._sent_end.pop(0) if self._sent_end else None
+                round_trip = time.perf_counter() - sent if sent is not None else None
+                self.results.append((round_trip, message))
+                timing = f" ({round_trip * 1000:.0f}ms)" if round_trip is not None else ""
+                self.log(f"[{self.name}] '{message.get('transcript', '')}' -> {message.get('command')} "
+                         f"[{message.get('source')}]{timing}")
+                self._result_event.set()
+
+
+def run_files(client, files, gap_sec, timeout_sec):
+    """WAV 파일들을 차례로 말하듯이 보내고 각 결과를 기다림"""
+    lead = np.zeros(int(TARGET_SAMPLE_RATE * 0.3), dtype=np.float32)  # 서버가 배경 소음을 잡을 여유
+    for path in files:
+        client.send_audio(np.concatenate((lead, load_audio_file(path))))
+        if client.wait_result(timeout_sec) is None:
+            client.log(f"[{client.name}] 결과 없음: {path}")
+        time.sleep(gap_sec)
+
+
+def run_microphone(client, device_index=None, poll_ms=20):
+    """마이크 입력을 계속 스트리밍 (Ctrl+C 로 종료)"""
+    from stt import AudioRecorder
+
+    recorder = AudioRecorder(device_index=device_index)
+    resampler = PolyphaseResampler(recorder.rate, TARGET_SAMPLE_RATE)
+    read_index = recorder.frames_written
+    pending = np.zeros(0, dtype=np.float32)
+    client.log(f"[{client.name}] 마이크 스트리밍 중... (Ctrl+C 로 종료)")
+    try:
+        while True:
+            time.sleep(poll_ms / 1000)
+            end_index = recorder.frames_written
+            frames = recorder.read_frames(read_index, end_index)
+            read_index = end_index
+            pending = np.concatenate((pending, resampler.process(to_float32_mono(frames))))
+            whole = len(pending) // client.frame_len * client.frame_len
+            if whole:
+                client.send_audio(pending[:whole], realtime=False, end=False)
+                pending = pending[whole:]
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream audio to the voice-control ingestion server")
+    parser.add_argument("files", nargs="*", help="WAV files to speak (one utterance each)")
+    parser.add_argument("--server", default=f"127.0.0.1:{DEFAULT_PORT}", help="host:port")
+    parser.add_argument("--name", default="station", help="Client name (suffixed with an index for --clients > 1)")
+    parser.add_argument("--drone", default=None, help="Target drone id")
+    parser.add_argument("--token", default=None, help="Shared token configured on the server")
+    parser.add_argument("--clients", type=int, default=1, help="Concurrent simulated stations sending the same files")
+    parser.add_argument("--gap_sec", type=float, default=1.0, help="Pause between utterances")
+    parser.add_argument("--timeout_sec", type=float, default=30.0, help="Wait for each result")
+    parser.add_argument("--mic", action="store_true", help="Stream the microphone instead of files")
+    parser.add_argument("--device_index", type=int, default=None, help="Microphone device index")
+    args = parser.parse_args()
+
+    host, _, port = args.server.rpartition(":")
+    server = (host or "127.0.0.1", int(port))
+    if not args.mic and not args.files:
+        raise SystemExit("보낼 WAV 파일을 지정하거나 --mic 를 사용하세요.")
+
+    names = [args.name] if args.clients == 1 else [f"{args.name}-{i + 1}" for i in range(args.clients)]
+    clients = [AudioStreamClient(server, name, args.drone, token=args.token) for name in names]
+    for client in clients:
+        client.connect()
+
+    try:
+        if args.mic:
+            run_microphone(clients[0], args.device_index)
+        else:
+            threads = [threading.Thread(target=run_files, args=(client, args.files, args.gap_sec, args.timeout_sec))
+                       for client in clients]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        for client in clients:
+            client.close()
+
+    for client in clients:
+        round_trips = [rt * 1000 for rt, _ in client.results if rt is not None]
+        if round_trips:
+            print(f"{client.name}: 결과 {len(client.results)}개, 발화 끝 -> 결과 p50 {np.percentile(round_trips, 50):.0f}ms, "
+                  f"최대 {max(round_trips):.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
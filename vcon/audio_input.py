@@ -0,0 +1,182 @@
+"""
+오디오 입력 정규화 및 리샘플링
+
+마이크/WAV 입력을 Whisper 가 기대하는 16 kHz, float32, 모노, contiguous 배열로 변환합니다.
+리샘플링은 polyphase FIR 필터(scipy.signal.upfirdn)로 청크 단위 스트리밍 처리하며,
+scipy.signal.resample_poly 와 같은 필터 설계(kaiser, beta=5)를 사용하므로 결과도 같습니다.
+"""
+
+from math import gcd
+
+import numpy as np
+from scipy import signal
+import scipy.io.wavfile as wavfile
+
+TARGET_SAMPLE_RATE = 16000  # Whisper 모델 입력 샘플레이트
+
+_INT_SCALES = {
+    np.dtype(np.int16): 1.0 / 32768.0,
+    np.dtype(np.int32): 1.0 / 2147483648.0,
+}
+
+
+def to_float32_mono(data, channels=1):
+    """
+    PCM 데이터를 float32 모노(-1.0 ~ 1.0)로 변환
+
+    Args:
+        data (bytes or np.ndarray): int16 PCM 바이트, 또는 (frames,) / (frames, channels) 배열
+        channels (int): bytes 입력일 때 인터리브된 채널 수
+
+    Returns:
+        np.ndarray: contiguous float32 모노 배열
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        # 복사 없이 버퍼를 그대로 int16 배열로 해석
+        data = np.frombuffer(data, dtype=np.int16)
+        if channels > 1:
+            data = data.reshape(-1, channels)
+
+    if data.dtype == np.uint8:
+        # 8비트 WAV 는 unsigned (128 이 무음)
+        data = data.astype(np.float32)
+        data -= 128.0
+        scale = 1.0 / 128.0
+    else:
+        scale = _INT_SCALES.get(data.dtype, 1.0)
+
+    if data.ndim > 1 and data.shape[1] > 1:
+        # 다운믹스와 float32 변환을 한 번의 연산으로 처리
+        mono = data.mean(axis=1, dtype=np.float32)
+    else:
+        mono = data.reshape(-1).astype(np.float32, copy=data.dtype != np.float32)
+
+    if scale != 1.0:
+        mono *= scale
+    return np.ascontiguousarray(mono)
+
+
+class PolyphaseResampler:
+    """청크 단위로 입력을 받아 목표 샘플레이트로 변환하는 스트리밍 polyphase 리샘플러"""
+
+    def __init__(self, orig_rate, target_rate=TARGET_SAMPLE_RATE):
+        """
+        Args:
+            orig_rate (int): 입력 샘플레이트
+            target_rate (int): 출력 샘플레이트
+        """
+        orig_rate = int(orig_rate)
+        target_rate = int(target_rate)
+        g = gcd(orig_rate, target_rate)
+        self.up = target_rate // g
+        self.down = orig_rate // g
+        self.orig_rate = orig_rate
+        self.target_rate = target_rate
+        self.passthrough = self.up == self.down
+
+        if not self.passthrough:
+            # scipy.signal.resample_poly 와 동일한 저역통과 필터
+            max_rate = max(self.up, self.down)
+            self.half_len = 10 * max_rate
+            h = signal.firwin(2 * self.half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * self.up
+            self.h = h.astype(np.float32)
+            self.taps = -(-len(h) // self.up)  # 출력 샘플 하나가 참조하는 입력 샘플 수
+            # 입력 구간 시작 위치를 출력 격자에 맞추기 위한 up 의 (mod down) 역원
+            self._up_inv = pow(self.up, -1, self.down) if self.down > 1 else 0
+            self._history = self.taps - 1 + self.down - 1
+        self.reset()
+
+    def reset(self):
+        """스트림 상태 초기화"""
+        self.n_in = 0
+        self.n_out = 0
+        if not self.passthrough:
+            # 시작 이전 구간은 0 으로 간주
+            self._buf = np.zeros(self._history, dtype=np.float32)
+            self._buf_start = -self._history
+
+    def process(self, chunk):
+        """
+        입력 청크를 처리하고 지금까지 계산 가능한 출력 샘플을 반환
+
+        Args:
+            chunk (np.ndarray): float32 모노 입력
+
+        Returns:
+            np.ndarray: float32 출력 (필터 지연만큼 입력보다 늦게 나옴)
+        """
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if self.passthrough:
+            self.n_in += len(chunk)
+            self.n_out += len(chunk)
+            return chunk
+        self._buf = np.concatenate((self._buf, chunk))
+        self.n_in += len(chunk)
+        return self._produce(self.n_in)
+
+    def flush(self):
+        """남은 출력을 모두 계산하여 반환 (입력 끝 이후는 0 으로 채움)"""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        n_total = -(-self.n_in * self.up // self.down)
+        if n_total <= self.n_out:
+            return np.zeros(0, dtype=np.float32)
+        last_i = ((n_total - 1) * self.down + self.half_len) // self.up
+        pad = max(0, last_i + 1 - self.n_in)
+        self._buf = np.concatenate((self._buf, np.zeros(pad, dtype=np.float32)))
+        return self._produce(self.n_in + pad, limit=n_total)
+
+    def resample(self, audio):
+        """배열 전체를 한 번에 리샘플링 (스트림 상태는 초기화됨)"""
+        self.reset()
+        if self.passthrough:
+            return np.ascontiguousarray(audio, dtype=np.float32)
+        out = np.concatenate((self.process(audio), self.flush()))
+        self.reset()
+        return out
+
+    def _produce(self, available_end, limit=None):
+        """입력 [.., available_end) 로 계산 가능한 출력 샘플 생성"""
+        # 출력 n 은 업샘플 격자의 위치 t = n*down + half_len (필터 지연 보정) 에 해당
+        n_end = (self.up * available_end - 1 - self.half_len) // self.down + 1
+        if limit is not None:
+            n_end = min(n_end, limit)
+        if n_end <= self.n_out:
+            return np.zeros(0, dtype=np.float32)
+
+        t_first = self.n_out * self.down + self.half_len
+        t_last = (n_end - 1) * self.down + self.half_len
+        # upfirdn 의 출력 격자(구간 시작 기준 down 간격)가 t_first 와 맞도록 구간 시작 위치 선택
+        base = t_first // self.up - (self.taps - 1)
+        aligned = (t_first * self._up_inv) % self.down
+        seg_start = base - ((base - aligned) % self.down)
+        segment = self._buf[seg_start - self._buf_start:t_last // self.up + 1 - self._buf_start]
+
+        m0 = (t_first - self.up * seg_start) // self.down
+        out = signal.upfirdn(self.h, segment, self.up, self.down)[m0:m0 + n_end - self.n_out]
+        self.n_out = n_end
+
+        # 다음 출력 계산에 필요한 구간만 남김
+        keep_from = (n_end * self.down + self.half_len) // self.up - self._history
+        if keep_from > self._buf_start:
+            self._buf = self._buf[keep_from - self._buf_start:]
+            self._buf_start = keep_from
+        return np.ascontiguousarray(out, dtype=np.float32)
+
+
+def resample(audio, orig_rate, target_rate=TARGET_SAMPLE_RATE):
+    """float32 모노 배열을 목표 샘플레이트로 변환"""
+    if int(orig_rate) == int(target_rate):
+        return np.ascontiguousarray(audio, dtype=np.float32)
+    return PolyphaseResampler(orig_rate, target_rate).resample(audio)
+
+
+def load_audio_file(path, target_rate=TARGET_SAMPLE_RATE):
+    """
+    WAV 파일을 읽어 16 kHz float32 모노 배열로 변환 (ffmpeg 불필요)
+
+    Returns:
+        np.ndarray: contiguous float32 모노 배열
+    """
+    sample_rate, data = wavfile.read(path)
+    return resample(to_float32_mono(data), sample_rate, target_rate)
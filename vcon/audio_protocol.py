@@ -0,0 +1,46 @@
+"""
+원격 오디오 스트림 패킷 형식 (audio_server.py / audio_client.py 공용)
+
+클라이언트가 torch 없이도 쓸 수 있도록 서버 모듈과 분리했습니다.
+
+    헤더 "!2sBBI" = 매직 b"VC", 버전, 종류, 순번 + 페이로드
+    HELLO  (클라이언트 -> 서버) JSON {"client": 이름, "drone": 드론 id, "sample_rate": 16000, "token": 공유 토큰(선택)}
+    AUDIO  (클라이언트 -> 서버) int16 little-endian PCM
+    END    (클라이언트 -> 서버) 발화 종료
+    BYE    (클라이언트 -> 서버) 세션 종료
+    RESULT (서버 -> 클라이언트) JSON {"transcript", "command", "source", "dispatched", "latency_ms"}
+    STATUS (서버 -> 클라이언트) JSON {"ok": bool, "message": 문자열}
+"""
+
+import json
+import struct
+
+DEFAULT_PORT = 50007
+
+MAGIC = b"VC"
+VERSION = 1
+HEADER = struct.Struct("!2sBBI")
+MAX_DATAGRAM = 65507
+
+HELLO, AUDIO, END, BYE, RESULT, STATUS = 1, 2, 3, 4, 5, 6
+PACKET_NAMES = {HELLO: "hello", AUDIO: "audio", END: "end", BYE: "bye", RESULT: "result", STATUS: "status"}
+
+
+def encode_packet(kind, seq, payload=b""):
+    """패킷 생성 (dict 페이로드는 JSON 으로 인코딩)"""
+    if isinstance(payload, dict):
+        payload = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return HEADER.pack(MAGIC, VERSION, kind, seq & 0xFFFFFFFF) + payload
+
+
+def decode_packet(data):
+    """
+    Returns:
+        tuple or None: (종류, 순번, 페이로드 bytes) - 형식이 맞지 않으면 None
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, version, kind, seq = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or kind not in PACKET_NAMES:
+        return None
+    return kind, seq, data[HEADER.size:]
@@ -0,0 +1,422 @@
+"""
+네트워크 오디오 수신 서버 (원격 조종 스테이션용)
+
+모델이 올라간 한 대의 PC 가 여러 원격 스테이션의 음성을 받아 각자의 드론으로 명령을 보냅니다.
+스테이션은 UDP 로 16 kHz(또는 HELLO 에서 알린 샘플레이트) int16 모노 PCM 을 보내고,
+서버는 클라이언트마다 세션 상태(끝점 검출기, 단일 처리 파이프라인, 대상 드론)를 따로 둡니다.
+
+    - 끝점 검출: StreamingEndpointer 가 발화를 잘라냄 (END 패킷을 받으면 바로 끝냄 - 푸시투토크)
+    - 처리: 클라이언트마다 PipelineController 를 두어 같은 클라이언트의 새 발화는 이전 발화를 선점하고,
+      STT/LLM 모델은 공유하므로 단계별로 하나씩 실행 (다른 클라이언트의 발화는 대기, 대기 시간도 처리 시간 예산에 포함)
+      정지 명령은 STT 직후 판정하므로 다른 클라이언트의 LLM 생성을 기다리지 않고, 예산을 넘긴 대기 발화는 버림
+    - 결과: 인식 문장과 명령을 RESULT 패킷으로 클라이언트에 돌려줌
+
+패킷 형식은 audio_protocol.py 를 참고하세요 (HELLO/AUDIO/END/BYE -> 서버, RESULT/STATUS -> 클라이언트).
+
+드론 구성 파일 (--drones):
+    {"drones": {"alpha": "COM3", "bravo": "COM4"}, "clients": {"station-1": "alpha"},
+     "token": "공유 토큰", "allow": ["192.168.0.0/24"]}
+    clients 에 있는 스테이션은 HELLO 의 drone 값과 관계없이 지정된 드론으로 고정됩니다.
+    token 이 있으면 HELLO 의 token 이 같아야 하고, allow 가 있으면 그 주소 대역에서 온 패킷만 받습니다.
+    실제 드론을 움직이므로 token 과 allow 중 하나는 반드시 있어야 합니다.
+
+기본 바인드 주소는 127.0.0.1 이므로, 다른 PC 의 스테이션을 받으려면 --host 0.0.0.0 처럼 명시하세요.
+
+사용법:
+    python audio_server.py --simulate alpha bravo --prompt_file prompt_mission.txt
+    python audio_server.py --drones drones.json --host 0.0.0.0 --port 50007
+    python audio_client.py --server 127.0.0.1:50007 --drone alpha --clients 2 sample1.wav sample2.wav
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+
+from audio_input import TARGET_SAMPLE_RATE, PolyphaseResampler, to_float32_mono
+from audio_protocol import DEFAULT_PORT, HELLO, AUDIO, END, BYE, RESULT, STATUS, MAX_DATAGRAM, encode_packet, decode_packet
+from pipeline_controller import PipelineController
+from vad import StreamingEndpointer
+
+
+class ClientSession:
+    """원격 클라이언트 하나의 상태"""
+
+    def __init__(self, address, name, drone_id, sample_rate, endpointer_options=None):
+        self.address = address
+        self.name = name
+        self.drone_id = drone_id
+        self.sample_rate = sample_rate
+        self.resampler = PolyphaseResampler(sample_rate, TARGET_SAMPLE_RATE) if sample_rate != TARGET_SAMPLE_RATE else None
+        self.endpointer = StreamingEndpointer(**(endpointer_options or {}))
+        self.pipeline = None
+        self.record = None  # 처리 중인 발화의 결과 (작업이 끝나면 RESULT 로 전송)
+        self.last_seen = time.monotonic()
+
+        # 수신 통계
+        self.expected_seq = None
+        self.packets = 0
+        self.lost_packets = 0
+        self.late_packets = 0
+        self.received_sec = 0.0
+        self.utterances = 0
+
+    def accept_seq(self, seq):
+        """
+        순번 확인 (유실은 세고, 늦게 도착한 이전 패킷은 버림)
+
+        Returns:
+            bool: 처리할 패킷인지 여부
+        """
+        self.packets += 1
+        if self.expected_seq is not None:
+            gap = (seq - self.expected_seq) & 0xFFFFFFFF
+            if gap >= 0x80000000:
+                self.late_packets += 1
+                return False
+            self.lost_packets += gap
+        self.expected_seq = (seq + 1) & 0xFFFFFFFF
+        return True
+
+    def feed(self, pcm):
+        """
+        int16 PCM 입력
+
+        Returns:
+            list[np.ndarray]: 끝난 발화들 (16 kHz float32)
+        """
+        audio = to_float32_mono(pcm[:len(pcm) // 2 * 2])
+        if self.resampler is not None:
+            audio = self.resampler.process(audio)
+        self.received_sec += len(audio) / TARGET_SAMPLE_RATE
+        return self.endpointer.process(audio)
+
+    def describe(self):
+        return (f"{self.name}@{self.address[0]}:{self.address[1]} -> {self.drone_id}, 수신 {self.received_sec:.1f}초, "
+                f"발화 {self.utterances}개, 유실 {self.lost_packets}/{self.packets + self.lost_packets} 패킷")
+
+
+class AudioIngestServer:
+    """UDP 로 여러 클라이언트의 오디오를 받아 각자의 드론으로 명령을 보내는 서버"""
+
+    def __init__(self, inference, drones, log, host="127.0.0.1", port=DEFAULT_PORT, client_drones=None,
+                 idle_timeout_sec=30.0, endpointer_options=None, resource_plan=None, token=None, allow=None):
+        """
+        Args:
+            inference (CommandInference): 공유 명령 변환 단계 (STT/LLM)
+            drones (dict): {드론 id: dispatch(command) 함수}
+            log (callable): 로그 함수
+            host (str): 바인드 주소
+            port (int): UDP 포트
+            client_drones (dict, optional): {클라이언트 이름: 드론 id} 고정 매핑
+            idle_timeout_sec (float): 이 시간 동안 패킷이 없으면 세션 정리
+            endpointer_options (dict, optional): StreamingEndpointer 인자
+            resource_plan (ResourcePlan, optional): 수신 스레드에 "io" 자원을 적용할 계획
+            token (str, optional): HELLO 에 들어 있어야 하는 공유 토큰 (None 이면 확인 안 함)
+            allow (list[str], optional): 패킷을 받을 주소 대역 (예: "192.168.0.0/24", None 이면 모든 주소)
+        """
+        self.inference = inference
+        self.drones = drones
+        self.log = log
+        self.client_drones = client_drones or {}
+        self.idle_timeout_sec = idle_timeout_sec
+        self.endpointer_options = endpointer_options
+        self.resource_plan = resource_plan
+        self.token = token
+        self.allowed_networks = [ipaddress.ip_network(network, strict=False) for network in allow] if allow else None
+        self.sessions = {}  # {주소: ClientSession}
+
+        # STT/LLM 은 하나뿐이므로 단계마다 한 번에 하나씩 (한 클라이언트의 LLM 과 다른 클라이언트의 STT 는 겹쳐 실행)
+        inference.stage_locks.setdefault("stt", threading.Lock())
+        inference.stage_locks.setdefault("llm", threading.Lock())
+        self._send_lock = threading.Lock()
+        self._reply_seq = 0
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.5)
+        self.address = self.sock.getsockname()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.log(f"오디오 수신 서버 시작: udp://{self.address[0]}:{self.address[1]}, 드론 {', '.join(drones)}")
+
+    def stop(self):
+        self._stopped = True
+        self._thread.join()
+        for session in list(self.sessions.values()):
+            self._close_session(session, "서버 종료")
+        self.sock.close()
+
+    def send(self, address, kind, payload):
+        with self._send_lock:
+            self._reply_seq += 1
+            try:
+                self.sock.sendto(encode_packet(kind, self._reply_seq, payload), address)
+            except OSError as e:
+                self.log(f"응답 전송 실패 ({address}): {e}")
+
+    def _run(self):
+        if self.resource_plan is not None:
+            self.resource_plan.apply("io")
+        last_sweep = time.monotonic()
+        while not self._stopped:
+            try:
+                data, address = self.sock.recvfrom(MAX_DATAGRAM)
+            except socket.timeout:
+                data = None
+            except OSError as e:
+                # Windows 는 상대 포트가 닫히면 다음 recvfrom 에서 ConnectionResetError 를 냄
+                self.log(f"수신 오류: {e}")
+                data = None
+
+            if data is not None:
+                packet = decode_packet(data)
+                if packet is None:
+                    self.log(f"알 수 없는 패킷 무시 ({address}, {len(data)}바이트)")
+                else:
+                    try:
+                        self._handle(address, *packet)
+                    except Exception as e:
+                        self.log(f"패킷 처리 오류 ({address}): {e}")
+
+            now = time.monotonic()
+            if now - last_sweep >= 1.0:
+                last_sweep = now
+                for session in [s for s in self.sessions.values() if now - s.last_seen > self.idle_timeout_sec]:
+                    self._close_session(session, "응답 없음")
+
+    def _is_allowed(self, address):
+        if self.allowed_networks is None:
+            return True
+        ip = ipaddress.ip_address(address[0])
+        return any(ip in network for network in self.allowed_networks)
+
+    def _handle(self, address, kind, seq, payload):
+        if not self._is_allowed(address):
+            # 허용 목록 밖의 주소에는 응답하지 않음
+            if kind == HELLO:
+                self.log(f"허용되지 않은 주소의 연결 거부: {address[0]}:{address[1]}")
+            return
+        if kind == HELLO:
+            self._open_session(address, json.loads(payload.decode("utf-8") or "{}"))
+            return
+
+        session = self.sessions.get(address)
+        if session is None:
+            self.send(address, STATUS, {"ok": False, "message": "HELLO 를 먼저 보내세요."})
+            return
+        session.last_seen = time.monotonic()
+
+        if kind == AUDIO:
+            if not session.accept_seq(seq):
+                return
+            for audio in session.feed(payload):
+                self._submit(session, audio)
+        elif kind == END:
+            audio = session.endpointer.flush()
+            if audio is not None:
+                self._submit(session, audio)
+        elif kind == BYE:
+            # 이미 받은 발화는 끝까지 처리하고 종료
+            self._close_session(session, "클라이언트 종료", drain=True)
+
+    def _open_session(self, address, hello):
+        name = str(hello.get("client") or f"{address[0]}:{address[1]}")
+        if self.token is not None and not hmac.compare_digest(str(hello.get("token") or "").encode("utf-8"),
+                                                              self.token.encode("utf-8")):
+            self.log(f"인증 실패로 연결 거부: {name} ({address[0]}:{address[1]})")
+            self.send(address, STATUS, {"ok": False, "message": "인증 실패: 토큰이 맞지 않습니다."})
+            return
+        drone_id = self.client_drones.get(name) or hello.get("drone")
+        if drone_id is None and len(self.drones) == 1:
+            drone_id = next(iter(self.drones))
+        if drone_id not in self.drones:
+            self.send(address, STATUS, {"ok": False, "message": f"알 수 없는 드론: {drone_id} ({', '.join(self.drones)})"})
+            return
+
+        previous = self.sessions.get(address)
+        if previous is not None:
+            self._close_session(previous, "다시 연결")
+        session = ClientSession(address, name, drone_id, int(hello.get("sample_rate", TARGET_SAMPLE_RATE)),
+                                self.endpointer_options)
+        session.pipeline = PipelineController(
+            lambda audio, cancel_event, generation: self._infer(session, audio, cancel_event),
+            self.drones[drone_id],
+            lambda message: self.log(f"[{name}] {message}"),
+            on_done=lambda: self._send_result(session),
+            on_dispatched=lambda generation, command: session.record.update(dispatched=True),
+        )
+        self.sessions[address] = session
+        self.log(f"클라이언트 연결: {name} ({address[0]}:{address[1]}) -> 드론 {drone_id}")
+        self.send(address, STATUS, {"ok": True, "message": f"드론 {drone_id} 에 연결되었습니다."})
+
+    def _close_session(self, session, reason, drain=False):
+        """
+        세션 정리
+
+        Args:
+            drain (bool): 처리 중인 발화를 끝까지 처리한 뒤 종료 (수신 스레드를 막지 않도록 별도 스레드에서 대기)
+        """
+        if self.sessions.get(session.address) is session:
+            del self.sessions[session.address]
+        self.log(f"클라이언트 종료 ({reason}): {session.describe()}")
+        if drain:
+            threading.Thread(target=self._drain, args=(session,), daemon=True).start()
+        else:
+            session.pipeline.stop()
+
+    def _drain(self, session, timeout_sec=30.0):
+        deadline = time.monotonic() + timeout_sec
+        while session.pipeline.busy and time.monotonic() < deadline:
+            time.sleep(0.05)
+        session.pipeline.stop()
+
+    def _submit(self, session, audio):
+        session.utterances += 1
+        session.pipeline.submit(audio)
+
+    def _infer(self, session, audio, cancel_event):
+        """
+        클라이언트 파이프라인의 작업 스레드에서 실행
+
+        모델 잠금은 inference 의 단계별 잠금이 잡으며, 기다리는 동안 같은 클라이언트의 새 발화가 들어오면 취소되고
+        처리 시간 예산을 넘기면 발화를 버립니다.
+        """
+        session.record = {"source": "cancelled", "dispatched": False}
+        return self.inference.run(audio, cancel_event, session.record)
+
+    def _send_result(self, session):
+        """발화 처리가 끝나면 (명령 전송 후) 결과를 클라이언트에 알림"""
+        record, session.record = session.record, None
+        if record is not None:
+            self.send(session.address, RESULT, {key: record.get(key) for key in
+                                                ("transcript", "command", "source", "dispatched", "latency_ms")})
+
+
+class SerialLink:
+    """SerialPortManager 대신 시리얼 포트 하나의 드론 연결을 들고 있는 객체 (UI 없는 서버용)"""
+
+    def __init__(self, port):
+        from CodingDrone.drone import Drone  # 필요할 때만 임포트
+
+        self.port = port
+        self.drone = Drone()
+        self.drone.open(port)
+
+    def is_connected(self):
+        return self.drone is not None
+
+    def get_drone(self):
+        return self.drone
+
+    def close(self):
+        if self.drone is not None:
+            self.drone.close()
+            self.drone = None
+
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Network audio ingestion server for remote voice-control stations")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Bind address (use 0.0.0.0 to accept stations on other machines)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--token", default=None, help="Shared token stations must send in HELLO (overrides the --drones config)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--drones", default=None,
+                        help="JSON file mapping drone ids to serial ports (and clients to drones); needs a token or allow list")
+    target.add_argument("--simulate", nargs="+", default=None, metavar="DRONE_ID",
+                        help="Use simulated drones with these ids (loopback testing)")
+    parser.add_argument("--stt_model", default="openai/whisper-large-v3-turbo")
+    parser.add_argument("--llm_model", default="google/gemma-3-1b-it")
+    parser.add_argument("--draft_llm_model", default=None)
+    parser.add_argument("--prompt_file", default="prompt_mission.txt")
+    parser.add_argument("--cache_dir", default="../model_cache")
+    parser.add_argument("--latency_budget_sec", type=float, default=5.0)
+    parser.add_argument("--intent_model", default="intent_model.npz", help="Intent classifier run before the LLM if present")
+    parser.add_argument("--intent_threshold", type=float, default=0.9)
+    parser.add_argument("--end_silence_ms", type=int, default=700, help="Silence that ends an utterance")
+    parser.add_argument("--idle_timeout_sec", type=float, default=30.0)
+    args = parser.parse_args()
+
+    # 인증 설정 (실제 드론은 토큰 또는 주소 허용 목록 없이 받지 않음)
+    token = args.token
+    allow = None
+    client_drones = {}
+    config = None
+    if args.drones:
+        with open(args.drones, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        client_drones = config.get("clients", {})
+        token = token or config.get("token")
+        allow = config.get("allow")
+        if not token and not allow:
+            raise SystemExit(f"{args.drones} 에 token 또는 allow 가 없습니다: 인증 없이 드론 조종 연결을 받지 않습니다.")
+    elif not token and not _is_loopback(args.host):
+        raise SystemExit(f"--host {args.host} 로 외부 연결을 받으려면 --token 을 지정하세요.")
+
+    from drone_control_manager import DroneControlManager
+    from inference import CommandInference
+    from llm import LLMChat
+    from resource_plan import load_resource_plan
+    from stt import SpeechToText
+
+    log = print
+    plan = load_resource_plan()
+    log(f"CPU 자원 계획: {plan.describe()}")
+
+    # 드론 연결
+    links = {}
+    if args.simulate:
+        from replay import SimulatedDrone, SimulatedLink
+        links = {drone_id: SimulatedLink(SimulatedDrone(realtime=True)) for drone_id in args.simulate}
+    else:
+        for drone_id, port in config["drones"].items():
+            links[drone_id] = SerialLink(port)
+            log(f"드론 {drone_id}: {port} 연결")
+    controllers = {drone_id: DroneControlManager(None, lambda message, d=drone_id: log(f"<{d}> {message}"), link)
+                   for drone_id, link in links.items()}
+
+    stt = SpeechToText(model_id=args.stt_model, cache_dir=args.cache_dir, language="korean", resource_plan=plan)
+    llm = LLMChat(model_name=args.llm_model, cache_dir=args.cache_dir, prompt_file=args.prompt_file,
+                  draft_model_name=args.draft_llm_model, resource_plan=plan)
+    classifier = None
+    if args.intent_model and os.path.exists(args.intent_model):
+        from intent_classifier import IntentClassifier
+        classifier = IntentClassifier.load(args.intent_model)
+    inference = CommandInference(stt, llm, log, args.latency_budget_sec, classifier=classifier,
+                                 classifier_threshold=args.intent_threshold)
+
+    server = AudioIngestServer(inference, {drone_id: c.execute_mission for drone_id, c in controllers.items()}, log,
+                               args.host, args.port, client_drones, args.idle_timeout_sec,
+                               {"end_silence_ms": args.end_silence_ms}, plan, token, allow)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        for controller in controllers.values():
+            controller.mission_runner.abort()
+        for link in links.values():
+            if isinstance(link, SerialLink):
+                link.close()
+
+
+if __name__ == "__main__":
+    main()
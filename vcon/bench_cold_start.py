@@ -0,0 +1,569 @@
+"""
+콜드 스타트 / 모델 로딩 벤치마크
+
+측정마다 새 파이썬 프로세스를 띄워(이미 import 된 모듈이나 로딩된 가중치의 영향 없이) 다음을 측정하고 JSON 으로 저장합니다.
+    imports   vcon 모듈별 import 시간, import 후 RSS, 가장 오래 걸린 하위 패키지 (-X importtime)
+    loads     모델 x 프로파일별 로딩 단계 시간과 단계별 최대 RSS
+                  import        torch / transformers import
+                  disk_read     from_pretrained (체크포인트 dtype 그대로, export 아티팩트가 있으면 대상 dtype 으로 memory-map)
+                  dtype_cast    대상 dtype 으로 변환
+                  device_move   대상 디바이스로 이동
+                  quantize      int8 동적 양자화 (+int8 프로파일만)
+                  pipeline      프로세서/토크나이저 로드와 파이프라인 생성
+                  first_inference  첫 추론 (STT: 오디오 1개, LLM: 짧은 생성)
+              app 프로파일은 앱과 같은 경로(SpeechToText / LLMChat 생성자, 머신 프로파일 설정)로 init 단계만 측정합니다.
+              app+compile 은 STT 디코더 컴파일(stt_compile)을 켠 앱 경로로, 컴파일 워밍업이 로딩 시간에 더하는 비용을 봅니다.
+    download  hf_model_downloader.download_model 시간 (--download, 캐시가 있으면 캐시 확인 + 로딩 시간)
+
+프로파일 이름은 export 아티팩트와 같은 "<디바이스>-<dtype>" 형식이고 "+int8" 을 붙이면 동적 양자화를 적용합니다.
+    app, app+compile, cpu-float32, cpu-bfloat16, cpu-float32+int8, cuda-float16 ...
+
+같은 명령을 커밋/머신별로 실행해 저장한 JSON 을 --compare 로 비교할 수 있습니다.
+디스크 캐시는 비우지 않으므로 반복 실행(--repeats)의 첫 회만 디스크 콜드 상태일 수 있습니다 (runs 에 회차별 값이 남음).
+
+사용법:
+    python bench_cold_start.py --output cold_start.json
+    python bench_cold_start.py --stt_model openai/whisper-small --llm_model google/gemma-3-1b-it \\
+        --profiles app cpu-float32 cpu-bfloat16 cpu-float32+int8 --repeats 3 --output cold_start.json
+    python bench_cold_start.py --compare cold_start_main.json cold_start.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RESULT_PREFIX = "@@BENCH_COLD_START@@"
+IMPORT_MARKER = "@@BENCH_COLD_START_IMPORT@@"
+FORMAT_VERSION = 1
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PROFILES = ("app", "app+compile")  # 앱과 같은 생성자 경로로 측정하는 프로파일
+
+
+# ---------------------------------------------------------------- 측정 프로세스 (자식)
+
+def _rss_bytes():
+    """현재 프로세스 RSS (psutil 이 없으면 /proc/self/statm, 둘 다 없으면 None)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_bytes():
+    """프로세스 시작 이후 최대 RSS"""
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        if hasattr(info, "peak_wset"):  # Windows
+            return info.peak_wset
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _mb(value):
+    return round(value / 2 ** 20, 1) if value is not None else None
+
+
+class PhaseTimer:
+    """단계별 시간과 최대 RSS 기록 (RSS 는 백그라운드 스레드가 주기적으로 샘플링)"""
+
+    def __init__(self, interval_sec=0.01):
+        self.interval_sec = interval_sec
+        self.phases = {}
+        self.start = time.perf_counter()
+        self._peak = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval_sec):
+            rss = _rss_bytes()
+            if rss is not None and (self._peak is None or rss > self._peak):
+                self._peak = rss
+
+    def run(self, name, fn, *args, sync=None, **kwargs):
+        """
+        fn 을 실행하고 name 단계로 기록
+
+        Args:
+            sync (callable, optional): 시간 측정 전에 호출 (CUDA 비동기 작업 대기)
+        """
+        self._peak = _rss_bytes()
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        if sync is not None:
+            sync()
+        sec = time.perf_counter() - start
+        rss = _rss_bytes()
+        peak = max(p for p in (self._peak, rss) if p is not None) if rss is not None else None
+        self.phases[name] = {"sec": round(sec, 4), "rss_mb": _mb(rss), "peak_rss_mb": _mb(peak)}
+        return result
+
+    def finish(self):
+        self._stop.set()
+        self._thread.join()
+        return {"phases": self.phases, "elapsed_sec": round(time.perf_counter() - self.start, 4),
+                "peak_rss_mb": _mb(_peak_rss_bytes())}
+
+
+def parse_profile(profile):
+    """
+    "cpu-float32+int8" -> ("cpu", "float32", "dynamic_int8")
+
+    Returns:
+        tuple: (디바이스, dtype 이름, 양자화 또는 None)
+    """
+    name, _, quant = profile.partition("+")
+    device, _, dtype = name.rpartition("-")
+    if not device or dtype not in ("float32", "float16", "bfloat16") or quant not in ("", "int8"):
+        raise ValueError(f"알 수 없는 프로파일: {profile} (예: cpu-float32, cuda-float16, cpu-float32+int8)")
+    if device == "cuda":
+        device = "cuda:0"
+    return device, dtype, "dynamic_int8" if quant else None
+
+
+def _first_input(task):
+    import numpy as np
+
+    if task["component"] == "stt":
+        if task.get("audio"):
+            from audio_input import load_audio_file
+            return load_audio_file(task["audio"])
+        return np.zeros(16000, dtype=np.float32)
+    return task.get("text") or "앞으로 1미터 이동해"
+
+
+def _run_first_inference(component, pipe, data):
+    if component == "stt":
+        return pipe({"raw": data, "sampling_rate": 16000}, generate_kwargs={"language": "korean"})
+    return pipe([{"role": "user", "content": data}], max_new_tokens=16, do_sample=False)
+
+
+def child_import(task):
+    """모듈 하나 import"""
+    import importlib
+
+    timer = PhaseTimer()
+    # 이 스크립트가 먼저 import 한 모듈은 -X importtime 집계에서 빼도록 표시
+    sys.stderr.write(IMPORT_MARKER + "\n")
+    sys.stderr.flush()
+    timer.run("import", importlib.import_module, task["module"])
+    return timer.finish()
+
+
+def child_load(task):
+    """프로파일을 지정한 모델 로딩 (단계별)"""
+    timer = PhaseTimer()
+    component, model_id, cache_dir = task["component"], task["model"], task["cache_dir"]
+
+    def import_libs():
+        import torch
+        import transformers
+        return torch, transformers
+
+    torch, transformers = timer.run("import", import_libs)
+    from machine_profile import DTYPES, InferenceConfig, quantize_model
+    from model_artifacts import find_exported_model
+
+    device, dtype_name, quantization = parse_profile(task["profile"])
+    dtype = DTYPES[dtype_name]
+    sync = torch.cuda.synchronize if device.startswith("cuda") else None
+    model_class = transformers.AutoModelForSpeechSeq2Seq if component == "stt" else transformers.AutoModelForCausalLM
+
+    export_dir = find_exported_model(cache_dir, model_id, device, dtype)
+    if export_dir:
+        model = timer.run("disk_read", model_class.from_pretrained, export_dir, torch_dtype=dtype,
+                          low_cpu_mem_usage=True, use_safetensors=True)
+    else:
+        model = timer.run("disk_read", model_class.from_pretrained, model_id, torch_dtype="auto",
+                          low_cpu_mem_usage=True, cache_dir=cache_dir)
+    stored_dtype = str(model.dtype).replace("torch.", "")
+    model = timer.run("dtype_cast", model.to, dtype)
+    model = timer.run("device_move", model.to, device, sync=sync)
+    model.eval()
+    if quantization:
+        model = timer.run("quantize", quantize_model, model, InferenceConfig(device, dtype, quantization=quantization))
+
+    def build_pipeline():
+        source = export_dir or model_id
+        kwargs = {} if export_dir else {"cache_dir": cache_dir}
+        if component == "stt":
+            processor = transformers.AutoProcessor.from_pretrained(source, **kwargs)
+            return transformers.pipeline("automatic-speech-recognition", model=model, tokenizer=processor.tokenizer,
+                                         feature_extractor=processor.feature_extractor, torch_dtype=dtype,
+                                         device=device)
+        tokenizer = transformers.AutoTokenizer.from_pretrained(source, **kwargs)
+        return transformers.pipeline("text-generation", model=model, tokenizer=tokenizer, device=device)
+
+    pipe = timer.run("pipeline", build_pipeline)
+    data = _first_input(task)
+    timer.run("first_inference", _run_first_inference, component, pipe, data, sync=sync)
+
+    result = timer.finish()
+    result.update({"source": "exported" if export_dir else "hub", "stored_dtype": stored_dtype,
+                   "parameters": sum(p.numel() for p in model.parameters())})
+    return result
+
+
+def child_app_load(task):
+    """앱과 같은 경로(SpeechToText / LLMChat)로 로딩 (머신 프로파일이 정한 설정)"""
+    timer = PhaseTimer()
+
+    def import_libs():
+        import torch
+        import transformers
+        return torch
+
+    timer.run("import", import_libs)
+    cache_dir = task["cache_dir"]
+    if task["component"] == "stt":
+        from stt import SpeechToText
+        stt = timer.run("init", SpeechToText, model_id=task["model"], cache_dir=cache_dir, language="korean",
+                        compile_decoder=task["profile"] == "app+compile")
+        timer.run("first_inference", stt.transcribe, _first_input(task))
+        config = stt.config
+    else:
+        from llm import LLMChat
+        llm = timer.run("init", LLMChat, model_name=task["model"], cache_dir=cache_dir,
+                        prompt_file=task.get("prompt_file") or "prompt.txt")
+        timer.run("first_inference", llm.chat, _first_input(task), use_draft=False)
+        config = llm.config
+
+    result = timer.finish()
+    result["config"] = repr(config)
+    return result
+
+
+def child_download(task):
+    """hf_model_downloader.download_model (리포지토리 루트 스크립트)"""
+    sys.path.insert(0, os.path.dirname(BENCH_DIR))
+    timer = PhaseTimer()
+    from hf_model_downloader import download_model
+
+    timer.run("download", download_model, task["model"], cache_dir=task["cache_dir"])
+    return timer.finish()
+
+
+def child_environment(task):
+    """비교용 라이브러리 버전과 GPU 정보"""
+    info = {}
+    for name in ("numpy", "torch", "transformers"):
+        try:
+            info[name] = __import__(name).__version__
+        except ImportError:
+            info[name] = None
+    try:
+        import torch
+        info["gpus"] = [torch.cuda.get_device_name(i) for i in range(torch.cuda.device_count())] \
+            if torch.cuda.is_available() else []
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        info["gpus"] = []
+    return info
+
+
+CHILD_TASKS = {
+    "import": child_import,
+    "load": child_load,
+    "app_load": child_app_load,
+    "download": child_download,
+    "environment": child_environment,
+}
+
+
+def child_main(task_json):
+    task = json.loads(task_json)
+    try:
+        result = CHILD_TASKS[task["kind"]](task)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    # 로더가 stdout 에 로그를 찍으므로 결과는 구분자를 붙여 마지막 줄에 출력
+    sys.stdout.flush()
+    print(RESULT_PREFIX + json.dumps(result, ensure_ascii=False), flush=True)
+
+
+# ---------------------------------------------------------------- 실행/집계 (부모)
+
+def parse_importtime(stderr, limit=5):
+    """
+    -X importtime 출력에서 누적 시간이 긴 최상위 import 목록 (대상 모듈 import 시작 이후만)
+
+    Returns:
+        list: [{"module", "cumulative_ms"}] (긴 순서)
+    """
+    entries = []
+    lines = stderr.splitlines()
+    if IMPORT_MARKER in lines:
+        lines = lines[lines.index(IMPORT_MARKER) + 1:]
+    for line in lines:
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)", line)
+        if match and len(match.group(3)) == 1:  # 들여쓰기 1칸 = 최상위
+            entries.append({"module": match.group(4), "cumulative_ms": round(int(match.group(2)) / 1000, 1)})
+    entries.sort(key=lambda e: -e["cumulative_ms"])
+    return entries[:limit]
+
+
+def run_child(task, timeout_sec, importtime=False):
+    """
+    새 프로세스에서 측정 하나 실행
+
+    Returns:
+        dict: 자식 결과 + process_sec (프로세스 시작부터 종료까지, 인터프리터 시작 포함)
+    """
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + \
+        [os.path.abspath(__file__), "--child", json.dumps(task, ensure_ascii=False)]
+    env = dict(os.environ, PYTHONIOENCODING="utf-8", PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(command, cwd=BENCH_DIR, capture_output=True, text=True, encoding="utf-8",
+                              errors="replace", timeout=timeout_sec, env=env)
+    except subprocess.TimeoutExpired:
+        return {"error": f"시간 초과 ({timeout_sec:g}초)"}
+    process_sec = time.perf_counter() - start
+
+    result = None
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+            break
+    if result is None:
+        tail = (proc.stderr.strip().splitlines() or ["출력 없음"])[-1]
+        return {"error": f"종료 코드 {proc.returncode}: {tail}"}
+    result["process_sec"] = round(process_sec, 4)
+    if importtime:
+        result["slowest_imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def _median(values):
+    values = sorted(values)
+    if not values:
+        return None
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def summarize_runs(runs):
+    """
+    반복 측정 결과 요약 (시간은 중앙값, RSS 는 최댓값)
+
+    Returns:
+        dict: phases, process_sec, peak_rss_mb, runs (실패한 회차는 error 만 남음)
+    """
+    ok = [run for run in runs if "error" not in run]
+    summary = {"runs": runs}
+    if not ok:
+        summary["error"] = runs[-1]["error"]
+        return summary
+
+    phases = {}
+    for name in ok[0]["phases"]:
+        values = [run["phases"][name] for run in ok if name in run["phases"]]
+        peaks = [v["peak_rss_mb"] for v in values if v.get("peak_rss_mb") is not None]
+        phases[name] = {"sec": round(_median([v["sec"] for v in values]), 4),
+                        "peak_rss_mb": max(peaks) if peaks else None}
+    summary["phases"] = phases
+    summary["process_sec"] = round(_median([run["process_sec"] for run in ok]), 4)
+    peaks = [run["peak_rss_mb"] for run in ok if run.get("peak_rss_mb") is not None]
+    summary["peak_rss_mb"] = max(peaks) if peaks else None
+    for key in ("source", "stored_dtype", "parameters", "config", "slowest_imports"):
+        if key in ok[-1]:
+            summary[key] = ok[-1][key]
+    return summary
+
+
+def vcon_modules():
+    """측정 대상 vcon 모듈 (이 스크립트 제외)"""
+    this = os.path.splitext(os.path.basename(__file__))[0]
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(BENCH_DIR)
+                  if name.endswith(".py") and os.path.splitext(name)[0] != this)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def collect_meta(timeout_sec):
+    environment = run_child({"kind": "environment"}, timeout_sec)
+    return {
+        "format_version": FORMAT_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": git_commit(),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "environment": environment,
+    }
+
+
+def run_benchmark(args):
+    results = {"meta": collect_meta(args.timeout_sec), "imports": {}, "loads": [], "downloads": []}
+    print(f"커밋 {results['meta']['commit']}, {results['meta']['platform']}, python {results['meta']['python']}")
+
+    modules = args.modules or vcon_modules()
+    for module in modules:
+        runs = [run_child({"kind": "import", "module": module}, args.timeout_sec, importtime=True)
+                for _ in range(args.repeats)]
+        summary = summarize_runs(runs)
+        results["imports"][module] = summary
+        if "error" in summary:
+            print(f"import {module:>22}: 실패 ({summary['error']})")
+        else:
+            slowest = ", ".join(f"{e['module']} {e['cumulative_ms']:.0f}ms" for e in summary.get("slowest_imports", [])[:3])
+            print(f"import {module:>22}: {summary['phases']['import']['sec'] * 1000:7.0f}ms, "
+                  f"RSS {summary['peak_rss_mb']}MB ({slowest})")
+
+    models = [("stt", m) for m in args.stt_model] + [("llm", m) for m in args.llm_model]
+    for component, model in models:
+        if args.download:
+            runs = [run_child({"kind": "download", "model": model, "cache_dir": args.cache_dir}, args.timeout_sec)
+                    for _ in range(args.repeats)]
+            summary = summarize_runs(runs)
+            summary.update({"component": component, "model": model})
+            results["downloads"].append(summary)
+            _print_load(summary, "download")
+
+        for profile in args.profiles:
+            task = {"component": component, "model": model, "profile": profile, "cache_dir": args.cache_dir,
+                    "audio": args.audio, "text": args.text, "prompt_file": args.prompt_file}
+            task["kind"] = "app_load" if profile in APP_PROFILES else "load"
+            runs = [run_child(task, args.timeout_sec) for _ in range(args.repeats)]
+            summary = summarize_runs(runs)
+            summary.update({"component": component, "model": model, "profile": profile})
+            results["loads"].append(summary)
+            _print_load(summary, profile)
+    return results
+
+
+def _print_load(summary, profile):
+    label = f"{summary['component']} {summary['model']} [{profile}]"
+    if "error" in summary:
+        print(f"{label}: 실패 ({summary['error']})")
+        return
+    parts = ", ".join(f"{name} {phase['sec']:.2f}s" for name, phase in summary["phases"].items())
+    print(f"{label}: 프로세스 {summary['process_sec']:.1f}s, 최대 RSS {summary['peak_rss_mb']}MB\n    {parts}")
+
+
+# ---------------------------------------------------------------- 비교
+
+def _flatten(results):
+    """비교용 {지표 이름: 값} (초 단위 시간과 MB 단위 RSS)"""
+    metrics = {}
+    for module, summary in results.get("imports", {}).items():
+        if "error" not in summary:
+            metrics[f"import {module}"] = (summary["phases"]["import"]["sec"], summary.get("peak_rss_mb"))
+    for summary in results.get("loads", []) + results.get("downloads", []):
+        if "error" in summary:
+            continue
+        label = f"{summary['component']} {summary['model']} [{summary.get('profile', 'download')}]"
+        metrics[label] = (summary["process_sec"], summary.get("peak_rss_mb"))
+        for name, phase in summary["phases"].items():
+            metrics[f"{label} {name}"] = (phase["sec"], phase.get("peak_rss_mb"))
+    return metrics
+
+
+def compare(base, new, min_change=0.05):
+    """
+    두 결과의 시간/RSS 비교 출력 (변화가 min_change 미만인 지표는 생략)
+    """
+    for results, name in ((base, "기준"), (new, "비교")):
+        meta = results.get("meta", {})
+        print(f"{name}: 커밋 {meta.get('commit')}, {meta.get('host')}, {meta.get('platform')}, "
+              f"torch {meta.get('environment', {}).get('torch')}")
+    base_metrics, new_metrics = _flatten(base), _flatten(new)
+    print(f"{'metric':<60} {'sec':>17} {'change':>8} {'peak RSS MB':>19}")
+    shown = 0
+    for key in sorted(set(base_metrics) & set(new_metrics)):
+        (base_sec, base_rss), (new_sec, new_rss) = base_metrics[key], new_metrics[key]
+        change = new_sec / base_sec - 1 if base_sec else 0.0
+        rss_change = (new_rss / base_rss - 1) if base_rss and new_rss else 0.0
+        if abs(change) < min_change and abs(rss_change) < min_change:
+            continue
+        shown += 1
+        print(f"{key:<60} {base_sec:>7.3f} -> {new_sec:>7.3f} {change * 100:>+7.0f}% {base_rss!s:>8} -> {new_rss!s:>8}")
+    print(f"{min_change * 100:.0f}% 이상 바뀐 지표 {shown}개")
+    for key in sorted(set(base_metrics) ^ set(new_metrics)):
+        print(f"{'기준에만' if key in base_metrics else '비교에만'} 있음: {key}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and model load phases in fresh processes")
+    parser.add_argument("--stt_model", nargs="*", default=[], help="STT models to load (none by default)")
+    parser.add_argument("--llm_model", nargs="*", default=[], help="LLM models to load (none by default)")
+    parser.add_argument("--profiles", nargs="+", default=["app"],
+                        help="app (same path as the app), app+compile (app with STT decoder compilation) "
+                             "or <device>-<dtype>[+int8], e.g. cpu-float32 cpu-float32+int8")
+    parser.add_argument("--modules", nargs="*", default=None, help="vcon modules to import (default: all)")
+    parser.add_argument("--download", action="store_true", help="Also time hf_model_downloader.download_model")
+    parser.add_argument("--cache_dir", default="../model_cache")
+    parser.add_argument("--audio", default=None, help="WAV for the first STT inference (default: 1 s of silence)")
+    parser.add_argument("--text", default=None, help="Utterance for the first LLM inference")
+    parser.add_argument("--prompt_file", default="prompt.txt", help="Prompt file for the app profile LLM")
+    parser.add_argument("--repeats", type=int, default=1, help="Fresh processes per measurement")
+    parser.add_argument("--timeout_sec", type=float, default=1800)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--compare", nargs="+", metavar="JSON",
+                        help="BASE [NEW]: compare NEW (or this run) against BASE")
+    parser.add_argument("--min_change", type=float, default=0.05, help="Hide metrics that changed less than this")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child_main(args.child)
+        return
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare 는 BASE 또는 BASE NEW 만 받습니다.")
+    for profile in args.profiles:
+        if profile not in APP_PROFILES:
+            try:
+                parse_profile(profile)
+            except ValueError as e:
+                parser.error(str(e))
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.compare[1], 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        compare(base, new, args.min_change)
+        return
+
+    results = run_benchmark(args)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            compare(json.load(f), results, args.min_change)
+
+
+if __name__ == "__main__":
+    main()
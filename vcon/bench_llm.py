@@ -0,0 +1,99 @@
+"""
+LLM 명령 생성 벤치마크 (추측 디코딩)
+
+같은 명령 문장들을 드래프트 모델 없이/있이 그리디 디코딩으로 생성하여
+tokens/sec, 드래프트 토큰 채택률을 비교하고 두 출력이 같은지 확인합니다.
+
+사용법:
+    python bench_llm.py --model google/gemma-3-1b-it --draft google/gemma-3-270m-it --repeat 3
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from llm import LLMChat
+
+DEFAULT_COMMANDS = [
+    "드론을 이륙 시켜주세요",
+    "앞으로 1미터 가줘",
+    "오른쪽으로 돌아",
+    "고도를 조금 높여줘",
+    "착륙해",
+]
+
+
+def run(chat_bot, commands, use_draft, repeat):
+    """명령별로 repeat 번 생성하여 (출력 목록, 통계 목록) 반환 (첫 회는 워밍업으로 제외)"""
+    outputs = []
+    stats = []
+    chat_bot.chat(commands[0], use_draft=use_draft)
+    for command in commands:
+        for _ in range(repeat):
+            call_stats = {}
+            response = chat_bot.chat(command, use_draft=use_draft, stats=call_stats)
+            stats.append(call_stats)
+        outputs.append(chat_bot.parse_output(response))
+    return outputs, stats
+
+
+def summarize(stats):
+    tokens = sum(s["new_tokens"] for s in stats)
+    sec = sum(s["sec"] for s in stats)
+    rates = [s["acceptance_rate"] for s in stats if s["acceptance_rate"] is not None]
+    return {
+        "tokens_per_sec": tokens / sec if sec else 0.0,
+        "latency_ms_mean": float(np.mean([s["sec"] for s in stats]) * 1000),
+        "acceptance_rate": float(np.mean(rates)) if rates else None,
+        "tokens_per_main_forward": tokens / max(1, sum(s["main_forwards"] for s in stats)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speculative decoding benchmark")
+    parser.add_argument("--model", default="google/gemma-3-1b-it")
+    parser.add_argument("--draft", required=True, help="Draft model sharing the main model's tokenizer")
+    parser.add_argument("--cache_dir", default="../model_cache")
+    parser.add_argument("--prompt_file", default="prompt.txt")
+    parser.add_argument("--commands", default=None, help="Text file with one command per line")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    commands = DEFAULT_COMMANDS
+    if args.commands:
+        with open(args.commands, 'r', encoding='utf-8') as f:
+            commands = [line.strip() for line in f if line.strip()]
+
+    chat_bot = LLMChat(model_name=args.model, cache_dir=args.cache_dir, prompt_file=args.prompt_file,
+                       draft_model_name=args.draft)
+    if chat_bot.draft_model is None:
+        raise SystemExit("드래프트 모델을 사용할 수 없습니다.")
+
+    plain_out, plain_stats = run(chat_bot, commands, False, args.repeat)
+    draft_out, draft_stats = run(chat_bot, commands, True, args.repeat)
+    plain = summarize(plain_stats)
+    assisted = summarize(draft_stats)
+    mismatches = [c for c, a, b in zip(commands, plain_out, draft_out) if a != b]
+
+    print(f"{'mode':>8} {'tok/s':>8} {'lat ms':>8} {'accept':>7} {'tok/fwd':>8}")
+    for name, r in (("plain", plain), ("draft", assisted)):
+        accept = "-" if r["acceptance_rate"] is None else f"{r['acceptance_rate']:.1%}"
+        print(f"{name:>8} {r['tokens_per_sec']:>8.1f} {r['latency_ms_mean']:>8.0f} {accept:>7} "
+              f"{r['tokens_per_main_forward']:>8.2f}")
+    print(f"속도 향상: x{assisted['tokens_per_sec'] / plain['tokens_per_sec']:.2f}")
+    print(f"출력 일치: {len(commands) - len(mismatches)}/{len(commands)}")
+    for command in mismatches:
+        print(f"  불일치: {command}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"plain": plain, "draft": assisted, "mismatches": mismatches}, f, ensure_ascii=False, indent=2)
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+입력 정규화/리샘플링 마이크로 벤치마크
+
+기존 경로(np.mean 다운믹스 후 파이프라인 내부 리샘플링)와
+새 경로(청크 단위 스트리밍 polyphase 리샘플링)의 처리 시간을 비교합니다.
+스트리밍 경로는 녹음 중에 계산되므로, 녹음 종료 후 지연(tail)은 마지막 flush 시간뿐입니다.
+
+사용법:
+    python bench_resample.py --seconds 10 --repeat 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy import signal
+
+from audio_input import TARGET_SAMPLE_RATE, PolyphaseResampler, to_float32_mono
+
+
+def _legacy_resample():
+    """기존 파이프라인이 사용하는 리샘플러 (torchaudio 가 없으면 scipy FFT 리샘플로 대체)"""
+    try:
+        import torch
+        from torchaudio import functional as F
+
+        def run(audio, rate):
+            return F.resample(torch.from_numpy(audio), rate, TARGET_SAMPLE_RATE).numpy()
+        return "torchaudio.functional.resample", run
+    except ImportError:
+        def run(audio, rate):
+            return signal.resample(audio, int(len(audio) * TARGET_SAMPLE_RATE / rate)).astype(np.float32)
+        return "scipy.signal.resample (FFT)", run
+
+
+def legacy_path(pcm, rate, resample_fn):
+    """기존 경로: int16 -> float32 변환, np.mean 다운믹스, 일괄 리샘플링"""
+    audio = pcm.astype(np.float32) / 32768.0
+    if len(audio.shape) > 1 and audio.shape[1] > 1:
+        audio = np.mean(audio, axis=1)
+    return resample_fn(audio, rate)
+
+
+def streaming_path(pcm, rate, chunk_frames=1024):
+    """새 경로: 캡처 청크(bytes) 단위로 모노 변환 + 스트리밍 polyphase 리샘플링"""
+    channels = pcm.shape[1]
+    resampler = PolyphaseResampler(rate, TARGET_SAMPLE_RATE)
+    raw = pcm.tobytes()
+    step = chunk_frames * channels * 2
+    out = [resampler.process(to_float32_mono(raw[i:i + step], channels)) for i in range(0, len(raw), step)]
+    out.append(resampler.flush())
+    return np.concatenate(out)
+
+
+def streaming_tail(pcm, rate, chunk_frames=1024):
+    """녹음 종료 시점에 남는 작업(flush)만 측정"""
+    resampler = PolyphaseResampler(rate, TARGET_SAMPLE_RATE)
+    resampler.process(to_float32_mono(pcm[:-chunk_frames]))
+    start = time.perf_counter()
+    resampler.process(to_float32_mono(pcm[-chunk_frames:]))
+    resampler.flush()
+    return time.perf_counter() - start
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resampling micro-benchmark")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the test signal")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions (best time is reported)")
+    parser.add_argument("--rates", type=int, nargs="+", default=[48000, 44100, 16000])
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+
+    legacy_name, legacy_fn = _legacy_resample()
+    print(f"기존 경로 리샘플러: {legacy_name}")
+    print(f"{'rate':>7} {'ch':>3} {'legacy ms':>10} {'stream ms':>10} {'x realtime':>11} {'tail ms':>8}")
+
+    rng = np.random.default_rng(0)
+    for rate in args.rates:
+        for channels in args.channels:
+            frames = int(rate * args.seconds)
+            pcm = rng.integers(-8000, 8000, size=(frames, channels), dtype=np.int16)
+            legacy = _time(lambda: legacy_path(pcm, rate, legacy_fn), args.repeat)
+            stream = _time(lambda: streaming_path(pcm, rate), args.repeat)
+            tail = min(streaming_tail(pcm, rate) for _ in range(args.repeat))
+            # legacy 는 녹음 종료 후 전체를 처리하므로 legacy ms 가 곧 종료 후 지연
+            print(f"{rate:>7} {channels:>3} {legacy * 1e3:>10.2f} {stream * 1e3:>10.2f} "
+                  f"{args.seconds / stream:>11.0f} {tail * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+CPU 자원 계획 벤치마크 (동시 부하에서의 지연과 제어 주기 지터)
+
+STT 작업과 LLM 작업을 서로 다른 스레드에서 동시에 반복 실행하면서(모델 로딩 중 추론, 리플레이 등 겹치는 상황),
+50 Hz 제어 루프(시리얼/텔레메트리 스레드 역할)와 60 Hz UI 루프의 깨어나는 시각 지연을 측정합니다.
+자원 계획 없이(torch 기본 스레드) 한 번, ResourcePlan 을 적용하여 한 번 실행하고 비교합니다.
+
+모델을 지정하지 않으면 Whisper 인코더/Gemma 디코딩과 비슷한 모양의 합성 부하(행렬곱)를 사용합니다.
+
+사용법:
+    python bench_resources.py --rounds 20 --pin
+    python bench_resources.py --stt_model openai/whisper-small --audio sample.wav --llm_model google/gemma-3-1b-it
+"""
+
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from resource_plan import ResourcePlan
+
+
+class SyntheticWorkload:
+    """Whisper 인코더(큰 행렬곱)와 LLM 토큰 생성(행렬-벡터 곱 반복)을 흉내내는 부하"""
+
+    def __init__(self, scale=1.0):
+        import torch
+
+        self.torch = torch
+        self.encoder = torch.nn.Sequential(
+            torch.nn.Linear(1280, 1280), torch.nn.GELU(), torch.nn.Linear(1280, 1280)).eval()
+        self.frames = torch.randn(max(1, int(750 * scale)), 1280)
+        self.decoder = torch.nn.Sequential(
+            torch.nn.Linear(2048, 2048), torch.nn.GELU(), torch.nn.Linear(2048, 2048)).eval()
+        self.tokens = max(1, int(32 * scale))
+
+    def stt(self, plan):
+        if plan is not None:
+            plan.apply("stt")
+        with self.torch.inference_mode():
+            self.encoder(self.frames)
+
+    def llm(self, plan):
+        if plan is not None:
+            plan.apply("llm")
+        x = self.torch.randn(1, 2048)
+        with self.torch.inference_mode():
+            for _ in range(self.tokens):
+                x = self.decoder(x)
+
+
+class ModelWorkload:
+    """실제 SpeechToText / LLMChat 으로 한 발화씩 처리하는 부하"""
+
+    def __init__(self, stt, llm, audio, text):
+        self.stt_model = stt
+        self.llm_model = llm
+        self.audio = audio
+        self.text = text
+
+    def stt(self, plan):
+        self.stt_model.resource_plan = plan
+        self.stt_model.transcribe(self.audio)
+
+    def llm(self, plan):
+        self.llm_model.resource_plan = plan
+        self.llm_model.chat(self.text, use_draft=False)
+
+
+class PeriodicLoop:
+    """주기적으로 깨어나 예정 시각 대비 지연(ms)을 기록하는 루프 (제어/UI 스레드 역할)"""
+
+    def __init__(self, period_sec, plan, component, work=None):
+        self.period_sec = period_sec
+        self.plan = plan
+        self.component = component
+        self.work = work
+        self.lateness_ms = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        if self.plan is not None:
+            self.plan.apply(self.component)
+        next_time = time.perf_counter() + self.period_sec
+        while not self._stop.is_set():
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.lateness_ms.append(max(0.0, time.perf_counter() - next_time) * 1000)
+            if self.work is not None:
+                self.work()
+            next_time += self.period_sec
+            # 크게 밀렸으면 밀린 주기를 몰아서 실행하지 않음
+            next_time = max(next_time, time.perf_counter())
+
+
+def _ui_work():
+    # Tk 이벤트 처리 정도의 짧은 파이썬 작업
+    sum(range(2000))
+
+
+def run_config(workload, plan, rounds):
+    """
+    STT/LLM 작업을 라운드마다 동시에 시작하여 지연과 루프 지터를 측정
+
+    Returns:
+        dict: 단계별 지연(ms) 목록과 루프 지연(ms) 목록
+    """
+    latencies = {"stt": [], "llm": []}
+    start_barrier = threading.Barrier(3)
+    done_barrier = threading.Barrier(3)
+
+    def worker(name, job):
+        for i in range(rounds + 1):
+            start_barrier.wait()
+            start = time.perf_counter()
+            job(plan)
+            if i > 0:  # 첫 라운드는 워밍업
+                latencies[name].append((time.perf_counter() - start) * 1000)
+            done_barrier.wait()
+
+    io_loop = PeriodicLoop(0.02, plan, "io")
+    ui_loop = PeriodicLoop(1 / 60, plan, "ui", _ui_work)
+    workers = [threading.Thread(target=worker, args=("stt", workload.stt), daemon=True),
+               threading.Thread(target=worker, args=("llm", workload.llm), daemon=True)]
+    for thread in workers:
+        thread.start()
+
+    e2e = []
+    for i in range(rounds + 1):
+        start = time.perf_counter()
+        start_barrier.wait()
+        done_barrier.wait()
+        if i > 0:
+            e2e.append((time.perf_counter() - start) * 1000)
+
+    for thread in workers:
+        thread.join()
+    io_loop.stop()
+    ui_loop.stop()
+    return {"stt": latencies["stt"], "llm": latencies["llm"], "e2e": e2e,
+            "io_jitter": io_loop.lateness_ms, "ui_jitter": ui_loop.lateness_ms}
+
+
+def summarize(result):
+    summary = {}
+    for key in ("stt", "llm", "e2e"):
+        values = result[key]
+        summary[key] = {"p50": float(np.percentile(values, 50)), "p95": float(np.percentile(values, 95))}
+    for key in ("io_jitter", "ui_jitter"):
+        values = result[key] or [0.0]
+        summary[key] = {"p50": float(np.percentile(values, 50)), "p99": float(np.percentile(values, 99)),
+                        "max": float(np.max(values)), "samples": len(result[key])}
+    return summary
+
+
+def print_summary(results):
+    print(f"{'config':>8} {'stt p50/p95':>15} {'llm p50/p95':>15} {'e2e p50/p95':>15} "
+          f"{'io jitter p50/p99/max':>23} {'ui jitter p99/max':>19}")
+    for name, s in results.items():
+        print(f"{name:>8} {s['stt']['p50']:>7.0f}/{s['stt']['p95']:<7.0f} {s['llm']['p50']:>7.0f}/{s['llm']['p95']:<7.0f} "
+              f"{s['e2e']['p50']:>7.0f}/{s['e2e']['p95']:<7.0f} "
+              f"{s['io_jitter']['p50']:>7.2f}/{s['io_jitter']['p99']:.2f}/{s['io_jitter']['max']:<7.2f} "
+              f"{s['ui_jitter']['p99']:>9.2f}/{s['ui_jitter']['max']:<9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU resource plan benchmark (latency and control-loop jitter)")
+    parser.add_argument("--rounds", type=int, default=20, help="Concurrent STT+LLM rounds per configuration")
+    parser.add_argument("--pin", action="store_true", help="Also pin components to CPU sets")
+    parser.add_argument("--scale", type=float, default=1.0, help="Synthetic workload size")
+    parser.add_argument("--stt_model", default=None, help="Use a real STT model (requires --audio)")
+    parser.add_argument("--audio", default=None, help="WAV file for the STT model")
+    parser.add_argument("--llm_model", default=None, help="Use a real LLM")
+    parser.add_argument("--text", default="앞으로 1미터 가줘")
+    parser.add_argument("--prompt_file", default="prompt.txt")
+    parser.add_argument("--cache_dir", default="../model_cache")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    plan = ResourcePlan.auto(pin=args.pin)
+    print(f"자원 계획: {plan.describe()}")
+
+    if args.stt_model or args.llm_model:
+        if not (args.stt_model and args.llm_model and args.audio):
+            raise SystemExit("--stt_model, --llm_model, --audio 를 함께 지정하세요.")
+        from audio_input import load_audio_file
+        from stt import SpeechToText
+        from llm import LLMChat
+
+        stt = SpeechToText(model_id=args.stt_model, cache_dir=args.cache_dir, language="korean")
+        llm = LLMChat(model_name=args.llm_model, cache_dir=args.cache_dir, prompt_file=args.prompt_file)
+        workload = ModelWorkload(stt, llm, load_audio_file(args.audio), args.text)
+    else:
+        workload = SyntheticWorkload(args.scale)
+
+    results = {}
+    # 계획 없이 먼저 실행 (plan.apply 가 바꾼 스레드 설정이 기준 측정에 남지 않도록)
+    for name, config_plan in (("default", None), ("plan", plan)):
+        print(f"{name} 실행 중... ({args.rounds}라운드)")
+        results[name] = summarize(run_config(workload, config_plan, args.rounds))
+    print_summary(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"plan": plan.describe(), "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
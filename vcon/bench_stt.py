@@ -0,0 +1,164 @@
+"""
+STT 디코딩 프로파일 벤치마크 (발화당 지연과 단어/글자 오류율)
+
+같은 모델로 디코딩 설정만 바꿔 가며 명령 발화 녹음을 인식하고 기존 설정과 비교합니다.
+    default          기존 설정 (파이프라인 기본 디코딩, language 만 지정)
+    command          greedy, 타임스탬프 없음, 짧은 max_new_tokens, 명령 어휘 프롬프트
+    command+compile  command + static KV 캐시 + torch.compile
+
+한국어는 띄어쓰기가 일정하지 않으므로 WER 과 함께 공백을 뺀 글자 단위 오류율(CER)도 보고합니다.
+
+픽스처 디렉토리 구성:
+    fixtures/*.wav   명령 발화 녹음
+    fixtures/*.txt   정답 문장 (같은 이름)
+
+사용법:
+    python bench_stt.py --fixtures stt_fixtures --model openai/whisper-small --repeats 3 --output bench_stt.json
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from audio_input import TARGET_SAMPLE_RATE, load_audio_file
+
+CONFIGS = ("default", "command", "command+compile")
+
+
+def load_fixtures(directory):
+    """(이름, 오디오, 정답 문장) 목록 (정답 파일이 없는 녹음은 건너뜀)"""
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(".wav"):
+            continue
+        label_path = os.path.join(directory, os.path.splitext(name)[0] + ".txt")
+        if not os.path.exists(label_path):
+            continue
+        with open(label_path, 'r', encoding='utf-8') as f:
+            reference = f.read().strip()
+        fixtures.append((name, load_audio_file(os.path.join(directory, name)), reference))
+    return fixtures
+
+
+def normalize(text):
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def edit_distance(reference, hypothesis):
+    """두 토큰 목록의 편집 거리 (치환/삽입/삭제)"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp))
+        previous = current
+    return previous[-1]
+
+
+def error_counts(reference, hypothesis):
+    """
+    Returns:
+        tuple: (단어 오류 수, 정답 단어 수, 글자 오류 수, 정답 글자 수)
+    """
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    ref_words, hyp_words = reference.split(), hypothesis.split()
+    ref_chars, hyp_chars = list(reference.replace(" ", "")), list(hypothesis.replace(" ", ""))
+    return (edit_distance(ref_words, hyp_words), len(ref_words),
+            edit_distance(ref_chars, hyp_chars), len(ref_chars))
+
+
+def run_config(stt, fixtures, repeats):
+    """
+    모든 픽스처를 repeats 번 인식하여 지연과 오류율 측정 (첫 발화는 워밍업으로 한 번 더 실행)
+
+    Returns:
+        dict: 지연(ms) 통계, WER, CER, 발화별 결과
+    """
+    stt.transcribe(fixtures[0][1])
+    latencies = []
+    totals = np.zeros(4)
+    rows = []
+    for name, audio, reference in fixtures:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            hypothesis = stt.transcribe(audio)
+            times.append((time.perf_counter() - start) * 1000)
+        counts = error_counts(reference, hypothesis)
+        totals += counts
+        latencies.extend(times)
+        rows.append({"name": name, "reference": reference, "hypothesis": hypothesis,
+                     "audio_sec": len(audio) / TARGET_SAMPLE_RATE, "latency_ms": float(np.median(times)),
+                     "word_errors": counts[0], "char_errors": counts[2]})
+
+    audio_sec = sum(len(audio) for _, audio, _ in fixtures) / TARGET_SAMPLE_RATE
+    return {
+        "latency_ms": {"mean": float(np.mean(latencies)), "p50": float(np.percentile(latencies, 50)),
+                       "p95": float(np.percentile(latencies, 95))},
+        "rtf": float(np.sum([row["latency_ms"] for row in rows]) / 1000 / audio_sec),
+        "wer": float(totals[0] / max(totals[1], 1)),
+        "cer": float(totals[2] / max(totals[3], 1)),
+        "utterances": rows,
+    }
+
+
+def print_summary(results):
+    print(f"{'config':>16} {'p50 ms':>8} {'p95 ms':>8} {'RTF':>6} {'WER':>7} {'CER':>7}")
+    for name, r in results.items():
+        print(f"{name:>16} {r['latency_ms']['p50']:>8.0f} {r['latency_ms']['p95']:>8.0f} {r['rtf']:>6.2f} "
+              f"{r['wer'] * 100:>6.1f}% {r['cer'] * 100:>6.1f}%")
+    if "default" in results:
+        base = results["default"]["latency_ms"]["p50"]
+        for name, r in results.items():
+            if name != "default" and base:
+                print(f"{name}: p50 {(r['latency_ms']['p50'] / base - 1) * 100:+.1f}% (default 대비)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STT decoding profiles (latency and word error rate)")
+    parser.add_argument("--fixtures", required=True, help="Directory of .wav recordings with .txt references")
+    parser.add_argument("--model", default="openai/whisper-large-v3-turbo")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--cache_dir", default="../model_cache")
+    parser.add_argument("--configs", nargs="+", choices=CONFIGS, default=list(CONFIGS))
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per utterance")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    from stt import SpeechToText
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        raise SystemExit(f"픽스처가 없습니다: {args.fixtures} (*.wav 와 같은 이름의 *.txt)")
+    print(f"픽스처 {len(fixtures)}개, 모델 {args.model} ({args.device})")
+
+    # 모델은 한 번만 로드하고 프로파일만 바꿈 (컴파일은 되돌리지 않으므로 마지막에 실행)
+    stt = SpeechToText(model_id=args.model, device=args.device, cache_dir=args.cache_dir, language="korean",
+                       decode_profile="default", compile_decoder=False)
+    results = {}
+    for name in CONFIGS:
+        if name not in args.configs:
+            continue
+        stt.decode_profile = "default" if name == "default" else "command"
+        if name == "command+compile":
+            start = time.perf_counter()
+            if not stt.compile_decoder():
+                print("이 환경에서는 디코더 컴파일을 사용할 수 없어 command+compile 을 건너뜁니다.")
+                continue
+            print(f"컴파일 {time.perf_counter() - start:.1f}초")
+        print(f"{name} 실행 중...")
+        results[name] = run_config(stt, fixtures, args.repeats)
+    print_summary(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"model": args.model, "device": args.device, "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
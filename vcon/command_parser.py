@@ -0,0 +1,220 @@
+"""
+LLM 출력 명령 파싱
+
+LLM 응답을 드론 명령 단계(MissionStep)의 목록으로 변환합니다.
+한 번의 LLM 호출로 여러 단계를 받을 수 있도록 단계는 ';' 또는 줄바꿈으로 구분합니다.
+
+    takeoff; move forward; move forward; landing
+    takeoff; wait 2; move up; hovering; landing
+
+각 단계에는 다음 단계로 넘어가기 전의 완료 조건(비행 상태 텔레메트리 또는 타이머)이 붙습니다.
+"""
+
+import math
+
+MAX_MISSION_STEPS = 20
+
+# 한 단어 명령: (완료 대기 시간(초), 텔레메트리로 기다릴 비행 상태)
+SIMPLE_COMMANDS = {
+    "takeoff": (4.0, ("flight",)),
+    "landing": (5.0, ("ready",)),
+    "hovering": (0.0, None),  # sendControlWhile 이 1초 동안 블록됨
+    "stop": (0.0, None),
+}
+
+# 이동 명령: DroneControlManager.execute_drone_command 의 (거리 m, 속도 m/s)
+MOVE_COMMANDS = {
+    "up": (0.5, 1.0),
+    "down": (0.5, 1.0),
+    "left": (1.0, 0.5),
+    "right": (1.0, 0.5),
+    "forward": (1.0, 0.5),
+    "backward": (1.0, 0.5),
+}
+
+SETTLE_SEC = 1.0  # 이동 후 자세 안정화 여유
+MAX_WAIT_SEC = 30.0
+
+
+class MissionStep:
+    """미션의 한 단계"""
+
+    def __init__(self, command, duration=0.0, wait_states=None, timeout=None):
+        """
+        Args:
+            command (str): execute_drone_command 로 보낼 명령 ("wait" 단계는 전송하지 않음)
+            duration (float): 명령 전송 후 기다릴 시간 (초, 텔레메트리가 없을 때의 대기 시간)
+            wait_states (tuple or None): 이 비행 상태가 될 때까지 기다림 (텔레메트리 사용 시)
+            timeout (float or None): 텔레메트리 대기의 최대 시간 (초)
+        """
+        self.command = command
+        self.duration = duration
+        self.wait_states = wait_states
+        self.timeout = timeout if timeout is not None else duration * 2 + 2.0
+
+    @property
+    def is_wait(self):
+        return self.command.startswith("wait")
+
+    def __repr__(self):
+        return f"MissionStep({self.command!r}, duration={self.duration})"
+
+
+def _floats(parts, count, command):
+    if len(parts) != count + 1:
+        raise ValueError(f"잘못된 명령 형식: {command}")
+    try:
+        return [float(p) for p in parts[1:]]
+    except ValueError:
+        raise ValueError(f"잘못된 숫자 인자: {command}")
+
+
+def parse_command(command):
+    """
+    단일 명령을 검증하고 MissionStep 으로 변환
+
+    Raises:
+        ValueError: 알 수 없는 명령이거나 인자가 잘못된 경우
+    """
+    command = " ".join(command.strip().lower().split())
+    parts = command.split()
+    if not parts:
+        raise ValueError("빈 명령")
+    name = parts[0]
+
+    if command in SIMPLE_COMMANDS:
+        duration, states = SIMPLE_COMMANDS[command]
+        return MissionStep(command, duration, states)
+
+    if name == "move" and len(parts) == 2 and parts[1] in MOVE_COMMANDS:
+        distance, velocity = MOVE_COMMANDS[parts[1]]
+        return MissionStep(command, distance / velocity + SETTLE_SEC)
+
+    if name == "wait":
+        seconds, = _floats(parts, 1, command)
+        if not 0 <= seconds <= MAX_WAIT_SEC:
+            raise ValueError(f"대기 시간은 0~{MAX_WAIT_SEC:.0f}초: {command}")
+        return MissionStep(command, seconds)
+
+    if name == "position":
+        x, y, z, velocity, _ = _floats(parts, 5, command)
+        distance = math.sqrt(x * x + y * y + z * z)
+        return MissionStep(command, distance / max(velocity, 0.1) + SETTLE_SEC)
+
+    if name == "heading":
+        _floats(parts, 2, command)
+        return MissionStep(command, 2.0)
+
+    if name == "control":
+        _floats(parts, 4, command)
+        return MissionStep(command, 0.0)  # sendControl 이 1초 동안 블록됨
+
+    raise ValueError(f"알 수 없는 명령: {command}")
+
+
+def parse_mission(text):
+    """
+    LLM 응답을 미션 단계 목록으로 변환
+
+    Args:
+        text (str): ';' 또는 줄바꿈으로 구분된 명령들
+
+    Returns:
+        list[MissionStep]: 실행 순서대로의 단계
+
+    Raises:
+        ValueError: 하나라도 잘못된 단계가 있거나 단계가 너무 많은 경우 (부분 실행하지 않음)
+    """
+    # 모델이 코드 블록(```text ... ```)으로 감싸서 답하는 경우 제거
+    lines = [line.replace("`", "") for line in text.splitlines() if not line.strip().startswith("```")]
+    raw_steps = [s.strip() for line in lines for s in line.split(";")]
+    raw_steps = [s for s in raw_steps if s]
+    if not raw_steps:
+        raise ValueError("명령이 없습니다")
+    if len(raw_steps) > MAX_MISSION_STEPS:
+        raise ValueError(f"단계가 너무 많습니다 ({len(raw_steps)} > {MAX_MISSION_STEPS})")
+    return [parse_command(step) for step in raw_steps]
+
+
+class IncrementalCommandParser:
+    """
+    스트리밍되는 LLM 출력에서 완성된 명령을 찾는 파서
+
+    줄바꿈으로 끝난 줄을 parse_mission 으로 검증해 유효한 명령 줄을 모으고, 모델이 명령을 다 말했다고
+    확실할 때만 일찍 확정합니다: 명령 줄 뒤에 코드 블록 닫기(```)나 명령이 될 수 없는 설명 문장이 시작된 경우.
+    다음 줄이 또 명령일 수 있으면 계속 모으고, 스트림이 끝나면(finish) 모은 줄 전체를 미션으로 확정하므로
+    여러 줄로 나뉜 미션도 잘리지 않습니다. 명령 줄 앞의 코드 블록 열기, 빈 줄, 설명 문장은 건너뜁니다.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.command = None
+        self._steps = []
+        self._line_start = 0
+
+    def feed(self, chunk):
+        """
+        새로 생성된 텍스트 추가
+
+        Returns:
+            str or None: 이번에 확정된 명령 (아직 없으면 None, 여러 줄이면 ';' 로 이어 붙임)
+        """
+        self.text += chunk
+        while self.command is None:
+            end = self.text.find("\n", self._line_start)
+            if end < 0:
+                # 명령 줄 뒤에 명령이 될 수 없는 줄이 시작되면 줄이 끝날 때까지 기다리지 않음
+                partial = self.text[self._line_start:]
+                if self._steps and partial.strip() and not _may_be_command(partial):
+                    self._commit()
+                break
+            line = self.text[self._line_start:end]
+            self._line_start = end + 1
+            self._accept(line)
+        return self.command
+
+    def finish(self):
+        """
+        스트림이 끝났을 때 마지막 줄까지 확인
+
+        Returns:
+            str: 확정된 명령 (유효한 줄이 없으면 전체 출력, 실행 단계에서 오류 처리됨)
+        """
+        if self.command is None:
+            self._accept(self.text[self._line_start:])
+        if self.command is None and self._steps:
+            self._commit()
+        return self.command if self.command is not None else self.text.strip()
+
+    def _accept(self, line):
+        line = line.strip()
+        if not line:
+            return
+        if not line.startswith("```"):
+            try:
+                parse_mission(line)
+            except ValueError:
+                pass
+            else:
+                self._steps.append(line.replace("`", "").strip())
+                return
+        # 코드 블록 닫기나 설명 문장: 명령 줄 뒤라면 모델이 명령을 다 말한 것
+        if self._steps:
+            self._commit()
+
+    def _commit(self):
+        self.command = "; ".join(self._steps)
+
+
+_COMMAND_WORDS = {command.split()[0] for command in SIMPLE_COMMANDS} | {"move", "wait", "position", "heading", "control"}
+
+
+def _may_be_command(partial):
+    """아직 끝나지 않은 줄이 명령 줄이 될 수 있는지 (첫 단어로 판단, 코드 블록 표시는 명령이 아님)"""
+    if partial.lstrip().startswith("`"):
+        return not partial.lstrip().startswith("```")
+    words = partial.lower().split()
+    first = words[0]
+    if len(words) > 1 or partial[-1].isspace():
+        return first in _COMMAND_WORDS
+    return any(word.startswith(first) for word in _COMMAND_WORDS)
@@ -0,0 +1,102 @@
+"""
+발화 단위 처리 시간 예산(deadline)과 협조적 취소
+
+한 발화의 STT + LLM 처리 전체에 하나의 Deadline 을 적용합니다.
+generate 에는 DeadlineStoppingCriteria 를 넘겨서, 예산을 넘기거나 취소되면 다음 토큰에서 생성을 멈춥니다.
+"""
+
+import threading
+import time
+
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList
+
+
+class InferenceCancelled(Exception):
+    """처리가 취소됨 (결과를 사용하지 않음)"""
+
+    def __init__(self, stage=""):
+        super().__init__(f"{stage} 처리 취소" if stage else "처리 취소")
+        self.stage = stage
+
+
+class DeadlineExceeded(InferenceCancelled):
+    """처리 시간 예산 초과 (대체 명령 사용)"""
+
+    def __init__(self, stage="", budget_sec=None):
+        InferenceCancelled.__init__(self, stage)
+        self.budget_sec = budget_sec
+        self.args = (f"{stage} 처리 시간 예산 초과 ({budget_sec}초)",)
+
+
+class Deadline:
+    """발화 하나의 처리 시간 예산"""
+
+    def __init__(self, budget_sec, cancel_event=None):
+        """
+        Args:
+            budget_sec (float or None): 처리 시간 예산 (초, None 이면 무제한)
+            cancel_event (threading.Event, optional): 외부에서 set 하면 처리 취소
+        """
+        self.budget_sec = budget_sec
+        self.start = time.monotonic()
+        self.expires_at = self.start + budget_sec if budget_sec else None
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def remaining(self):
+        """남은 시간 (초, 무제한이면 None)"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self, stage=""):
+        """
+        취소되었거나 예산을 넘겼으면 예외 발생
+
+        Raises:
+            InferenceCancelled: 외부에서 취소된 경우
+            DeadlineExceeded: 예산을 넘긴 경우
+        """
+        if self.cancelled:
+            raise InferenceCancelled(stage)
+        if self.expired:
+            raise DeadlineExceeded(stage, self.budget_sec)
+
+    def stopping_criteria(self):
+        """generate(stopping_criteria=...) 에 넘길 기준 목록"""
+        return StoppingCriteriaList([DeadlineStoppingCriteria(self)])
+
+
+class DeadlineStoppingCriteria(StoppingCriteria):
+    """예산 초과 또는 취소 시 다음 토큰에서 생성을 멈추는 기준"""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def __call__(self, input_ids, scores, **kwargs):
+        stop = self.deadline.cancelled or self.deadline.expired
+        return torch.full((input_ids.shape[0],), stop, dtype=torch.bool, device=input_ids.device)
+
+
+class EventStoppingCriteria(StoppingCriteria):
+    """이벤트가 set 되면 다음 토큰에서 생성을 멈추는 기준 (스트리밍 중 필요한 결과를 얻은 경우 등)"""
+
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
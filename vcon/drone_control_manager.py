@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from command_parser import parse_mission
+from mission_runner import MissionRunner
+
 class DroneControlManager:
     def __init__(self, parent, log_callback, serial_manager):
         """드론 제어 관리자 초기화"""
@@ -8,6 +11,14 @@ class DroneControlManager:
         self.log = log_callback
         self.serial_manager = serial_manager
         
+        # 다단계 미션 실행기 (미션 단계는 execute_drone_command 로 전송)
+        self.mission_runner = MissionRunner(
+            lambda command: self.execute_drone_command(command, from_mission=True),
+            self.log,
+            self.get_flight_state,
+            resource_plan=getattr(parent, "resource_plan", None)
+        )
+        
     def create_widgets(self, frame):
         """드론 제어 위젯 생성"""
         # 기본 명령 버튼들
@@ -44,6 +55,43 @@ class DroneControlManager:
         """드론 객체 반환"""
         return self.serial_manager.get_drone()
     
+    def _request_state(self):
+        """드론 상태(State)를 요청하고 마지막으로 수신된 값을 반환 (받을 수 없으면 None)"""
+        drone = self.get_drone()
+        if not drone or not hasattr(drone, "getData"):
+            return None
+        from CodingDrone.protocol import DataType, DeviceType  # 필요할 때만 임포트
+        drone.sendRequest(DeviceType.Drone, DataType.State)
+        return drone.getData(DataType.State)
+    
+    def get_flight_state(self):
+        """
+        드론의 현재 비행 모드 이름 (소문자, 예: "ready", "flight") 반환
+        
+        상태를 요청하고 마지막으로 수신된 값을 읽으므로 최대 한 주기 늦을 수 있습니다.
+        텔레메트리를 받을 수 없으면 None 을 반환합니다.
+        """
+        state = self._request_state()
+        if state is None:
+            return None
+        return state.modeFlight.name.lower()
+    
+    def get_telemetry(self):
+        """
+        비행 기록용 텔레메트리 샘플
+        
+        Returns:
+            dict or None: 비행/시스템 모드와 배터리 잔량 (받을 수 없으면 None)
+        """
+        state = self._request_state()
+        if state is None:
+            return None
+        return {
+            "mode_flight": state.modeFlight.name.lower(),
+            "mode_system": state.modeSystem.name.lower(),
+            "battery": int(state.battery),
+        }
+    
     def check_drone_connected(self):
         """드론 연결 상태 확인 및 메시지 표시"""
         if not self.is_drone_connected():
@@ -51,8 +99,32 @@ class DroneControlManager:
             return False
         return True
     
-    def execute_drone_command(self, command):
+    def execute_mission(self, text):
+        """
+        LLM 응답을 미션으로 실행 (단일 명령이면 바로 실행, 여러 단계면 미션 실행기로 순차 실행)
+        
+        잘못된 단계가 하나라도 있으면 아무 단계도 실행하지 않고 호버링합니다.
+        """
+        try:
+            steps = parse_mission(text)
+        except ValueError as e:
+            self.log(f"명령 해석 실패: {str(e)}, 호버링으로 대체")
+            self.execute_drone_command("hovering")
+            return
+        
+        if len(steps) == 1 and not steps[0].is_wait:
+            self.execute_drone_command(steps[0].command)
+        else:
+            if not self.check_drone_connected():
+                return
+            self.mission_runner.start(steps)
+    
+    def execute_drone_command(self, command, from_mission=False):
         """드론 명령 실행"""
+        # 미션 밖에서 들어온 명령(특히 stop)은 진행 중인 미션을 즉시 중단시킴
+        if not from_mission:
+            self.mission_runner.abort()
+        
         if not self.check_drone_connected():
             return
             
@@ -152,6 +224,7 @@ class DroneControlManager:
         """드론 이륙"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 이륙")
             self.get_drone().sendTakeOff()
@@ -162,6 +235,7 @@ class DroneControlManager:
         """드론 착륙"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 착륙")
             self.get_drone().sendLanding()
@@ -172,6 +246,7 @@ class DroneControlManager:
         """드론 상승"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 상승")
             self.get_drone().sendControlPosition(0, 0, 0.5, 1, 0, 0)
@@ -182,6 +257,7 @@ class DroneControlManager:
         """드론 하강"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 하강")
             self.get_drone().sendControlPosition(0, 0, -0.5, 1, 0, 0)
@@ -192,6 +268,7 @@ class DroneControlManager:
         """드론 왼쪽 이동"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 왼쪽으로 이동")
             self.get_drone().sendControlPosition(0, -1.0, 0, 0.5, 0, 0)
@@ -202,6 +279,7 @@ class DroneControlManager:
         """드론 오른쪽 이동"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 오른쪽으로 이동")
             self.get_drone().sendControlPosition(0, 1.0, 0, 0.5, 0, 0)
@@ -212,6 +290,7 @@ class DroneControlManager:
         """드론 앞으로 이동"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 앞으로 이동")
             self.get_drone().sendControlPosition(1.0, 0, 0, 0.5, 0, 0)
@@ -222,6 +301,7 @@ class DroneControlManager:
         """드론 뒤로 이동"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 뒤로 이동")
             self.get_drone().sendControlPosition(-1.0, 0, 0, 0.5, 0, 0)
@@ -232,6 +312,7 @@ class DroneControlManager:
         """드론 호버링"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 호버링")
             self.get_drone().sendControlWhile(0, 0, 0, 0, 1000)
@@ -242,6 +323,7 @@ class DroneControlManager:
         """드론 긴급 정지"""
         if not self.check_drone_connected():
             return
+        self.mission_runner.abort()
         try:
             self.log("명령 실행: 긴급 정지")
             self.get_drone().sendStop()
@@ -0,0 +1,137 @@
+"""
+호출어 검출기 오프라인 평가
+
+WAV 픽스처로 검출률, 검출 지연, 오검출(false accept) 비율과 CPU 사용량을 측정하고,
+상시 Whisper 를 돌리는 경우와 비교해 절약되는 CPU 를 추정합니다.
+
+픽스처 디렉토리 구성:
+    fixtures/positive/*.wav   호출어가 포함된 녹음
+    fixtures/positive/*.json  (선택) {"keyword_end": 1.23}  호출어가 끝나는 시각(초), 지연 측정용
+    fixtures/negative/*.wav   호출어가 없는 주변 대화/소음
+
+사용법:
+    python eval_kws.py --templates kws_templates --fixtures kws_fixtures --thresholds 0.1 0.15 0.2
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from audio_input import TARGET_SAMPLE_RATE, load_audio_file
+from keyword_spotter import KeywordSpotter
+
+
+def _wav_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.lower().endswith(".wav")]
+
+
+def _keyword_end(wav_path):
+    """라벨 파일의 호출어 종료 시각 (없으면 None)"""
+    label_path = os.path.splitext(wav_path)[0] + ".json"
+    if not os.path.exists(label_path):
+        return None
+    with open(label_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("keyword_end")
+
+
+def run_stream(spotter, audio, chunk_ms=50):
+    """캡처 게이트와 같은 크기의 청크로 스트리밍 처리하여 (검출 목록, CPU 초) 반환"""
+    spotter.reset()
+    chunk = int(TARGET_SAMPLE_RATE * chunk_ms / 1000)
+    detections = []
+    start = time.thread_time()
+    for i in range(0, len(audio), chunk):
+        detections += spotter.process(audio[i:i + chunk])
+    return detections, time.thread_time() - start
+
+
+def evaluate(spotter, positives, negatives, stt_rtf, utterance_sec):
+    """한 임계값에 대한 평가 결과 dict"""
+    detected = 0
+    latencies = []
+    cpu_sec = 0.0
+    audio_sec = 0.0
+    forwarded = 0
+
+    for path, audio in positives:
+        detections, cpu = run_stream(spotter, audio)
+        cpu_sec += cpu
+        audio_sec += len(audio) / TARGET_SAMPLE_RATE
+        forwarded += len(detections)
+        if detections:
+            detected += 1
+            keyword_end = _keyword_end(path)
+            if keyword_end is None:
+                latencies.append(detections[0].latency_sec)
+            else:
+                latencies.append(detections[0].detected_sample / TARGET_SAMPLE_RATE - keyword_end)
+
+    false_accepts = 0
+    negative_sec = 0.0
+    for path, audio in negatives:
+        detections, cpu = run_stream(spotter, audio)
+        cpu_sec += cpu
+        negative_sec += len(audio) / TARGET_SAMPLE_RATE
+        false_accepts += len(detections)
+        forwarded += len(detections)
+    audio_sec += negative_sec
+
+    # 상시 STT 대비 절약되는 CPU: 모든 오디오를 Whisper 로 돌리는 경우 vs 검출기 + 검출 뒤 발화만 Whisper
+    always_on_cpu = stt_rtf * audio_sec
+    gated_cpu = cpu_sec + stt_rtf * forwarded * utterance_sec
+    return {
+        "threshold": spotter.threshold,
+        "detection_rate": detected / len(positives) if positives else None,
+        "latency_ms_mean": float(np.mean(latencies) * 1000) if latencies else None,
+        "latency_ms_p95": float(np.percentile(latencies, 95) * 1000) if latencies else None,
+        "false_accepts": false_accepts,
+        "false_accepts_per_hour": false_accepts / (negative_sec / 3600) if negative_sec else None,
+        "kws_cpu_per_audio_sec": cpu_sec / audio_sec if audio_sec else 0.0,
+        "cpu_saved_sec": always_on_cpu - gated_cpu,
+        "cpu_saved_fraction": 1.0 - gated_cpu / always_on_cpu if always_on_cpu else None,
+    }
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline keyword spotter evaluation")
+    parser.add_argument("--templates", default="kws_templates", help="Keyword template WAV directory")
+    parser.add_argument("--fixtures", default="kws_fixtures", help="Directory with positive/ and negative/ WAVs")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.1, 0.15, 0.2, 0.25])
+    parser.add_argument("--stt_rtf", type=float, default=0.5,
+                        help="Whisper CPU seconds per audio second on this machine (always-on baseline)")
+    parser.add_argument("--utterance_sec", type=float, default=3.0,
+                        help="Audio forwarded to Whisper per detection")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    positives = [(p, load_audio_file(p)) for p in _wav_files(os.path.join(args.fixtures, "positive"))]
+    negatives = [(p, load_audio_file(p)) for p in _wav_files(os.path.join(args.fixtures, "negative"))]
+    total_sec = sum(len(a) for _, a in positives + negatives) / TARGET_SAMPLE_RATE
+    print(f"positive {len(positives)}개, negative {len(negatives)}개, 총 {total_sec / 60:.1f}분")
+
+    results = []
+    print(f"{'thr':>5} {'detect':>7} {'lat ms':>7} {'p95 ms':>7} {'FA':>4} {'FA/h':>7} {'core %':>7} {'saved %':>8}")
+    for threshold in args.thresholds:
+        spotter = KeywordSpotter.from_directory(args.templates, threshold=threshold)
+        r = evaluate(spotter, positives, negatives, args.stt_rtf, args.utterance_sec)
+        results.append(r)
+        print(f"{threshold:>5.2f} {_fmt(r['detection_rate'], '>7.2%')} {_fmt(r['latency_ms_mean'], '>7.0f')} "
+              f"{_fmt(r['latency_ms_p95'], '>7.0f')} {r['false_accepts']:>4} {_fmt(r['false_accepts_per_hour'], '>7.1f')} "
+              f"{r['kws_cpu_per_audio_sec'] * 100:>7.2f} {_fmt(r['cpu_saved_fraction'], '>8.1%')}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+비행 기록기 (flight recorder)
+
+세션마다 발화 오디오, 인식 텍스트, LLM 원본 출력, 해석된 명령, 전송 시각, 텔레메트리를
+추가 전용(append-only) 바이너리 로그에 기록합니다.
+
+파일 구성 (<dir>/<세션>.vfr, <dir>/<세션>.vfr.idx):
+    .vfr      b"VFR\\x01" + 레코드들
+              레코드 = 헤더(<IBdI: 페이로드 길이, 종류, 시각(epoch), 발화 id) + 페이로드
+    .vfr.idx  b"VFI\\x01" + 레코드마다 고정 길이 항목(<QdIB: 오프셋, 시각, 발화 id, 종류)
+
+오디오 페이로드는 16 kHz int16 PCM, 나머지는 UTF-8 JSON 입니다.
+직렬화와 쓰기는 백그라운드 스레드에서 하므로, 명령 경로에서는 큐에 넣는 비용만 듭니다.
+읽을 때는 FlightLog 가 로그를 memory-map 하고 인덱스의 오프셋으로 임의 위치의 레코드를 바로 읽습니다.
+"""
+
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from audio_input import TARGET_SAMPLE_RATE
+
+LOG_MAGIC = b"VFR\x01"
+INDEX_MAGIC = b"VFI\x01"
+LOG_SUFFIX = ".vfr"
+INDEX_SUFFIX = ".vfr.idx"
+
+RECORD_HEADER = struct.Struct("<IBdI")
+INDEX_ENTRY = struct.Struct("<QdIB")
+
+# 레코드 종류
+SESSION = 1     # 세션/모델 설정
+AUDIO = 2       # 발화 오디오 (16 kHz int16)
+UTTERANCE = 3   # 인식 텍스트, LLM 원본 출력, 명령, 단계별 지연
+DISPATCH = 4    # 드론으로 명령 전송
+TELEMETRY = 5   # 텔레메트리 샘플
+
+RECORD_NAMES = {SESSION: "session", AUDIO: "audio", UTTERANCE: "utterance", DISPATCH: "dispatch", TELEMETRY: "telemetry"}
+
+_STOP = object()
+
+
+class FlightRecorder:
+    """백그라운드 스레드로 기록하는 세션 로그 작성기"""
+
+    def __init__(self, directory, session_name=None, flush_sec=1.0, resource_plan=None):
+        """
+        Args:
+            directory (str): 로그 디렉토리
+            session_name (str, optional): 세션 이름 (None 이면 시작 시각)
+            flush_sec (float): 디스크로 flush 하는 최대 간격 (초)
+            resource_plan (ResourcePlan, optional): 기록 스레드에 "io" 자원을 적용할 계획
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.session_name = session_name or time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, self.session_name + LOG_SUFFIX)
+        self.flush_sec = flush_sec
+        self.resource_plan = resource_plan
+        self.records_written = 0
+        self.bytes_written = 0
+
+        self._queue = queue.SimpleQueue()
+        self._log = open(self.path, "ab")
+        self._index = open(self.path[:-len(LOG_SUFFIX)] + INDEX_SUFFIX, "ab")
+        if self._log.tell() == 0:
+            self._log.write(LOG_MAGIC)
+            self._index.write(INDEX_MAGIC)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def record_audio(self, utterance_id, audio):
+        """발화 오디오 기록 (float32 16 kHz 배열, 변환은 기록 스레드에서)"""
+        self._queue.put((AUDIO, time.time(), utterance_id, audio))
+
+    def record_event(self, kind, utterance_id=0, **fields):
+        """JSON 레코드 기록 (SESSION, UTTERANCE, DISPATCH, TELEMETRY)"""
+        self._queue.put((kind, time.time(), utterance_id, fields))
+
+    def close(self):
+        """남은 레코드를 모두 쓰고 파일 닫기"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _encode(self, kind, payload):
+        if kind == AUDIO:
+            audio = np.clip(np.asarray(payload, dtype=np.float32), -1.0, 1.0)
+            return (audio * 32767.0).astype("<i2").tobytes()
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _run(self):
+        if self.resource_plan is not None:
+            self.resource_plan.apply("io")
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_sec)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                kind, timestamp, utterance_id, payload = item
+                data = self._encode(kind, payload)
+                offset = self._log.tell()
+                self._log.write(RECORD_HEADER.pack(len(data), kind, timestamp, utterance_id))
+                self._log.write(data)
+                self._index.write(INDEX_ENTRY.pack(offset, timestamp, utterance_id, kind))
+                self.records_written += 1
+                self.bytes_written += RECORD_HEADER.size + len(data)
+            if time.monotonic() - last_flush >= self.flush_sec:
+                # 로그를 먼저 flush 해야 인덱스가 쓰이지 않은 레코드를 가리키지 않음
+                self._log.flush()
+                self._index.flush()
+                last_flush = time.monotonic()
+        self._log.close()
+        self._index.close()
+
+
+class TelemetrySampler:
+    """주기적으로 텔레메트리를 읽어 비행 기록기에 남기는 스레드"""
+
+    def __init__(self, recorder, read_telemetry, interval_sec=1.0, resource_plan=None):
+        """
+        Args:
+            recorder (FlightRecorder): 기록기
+            read_telemetry (callable): 텔레메트리 dict 또는 None 을 반환하는 함수
+            interval_sec (float): 샘플링 간격 (초)
+            resource_plan (ResourcePlan, optional): 샘플링 스레드에 "io" 자원을 적용할 계획
+        """
+        self.recorder = recorder
+        self.read_telemetry = read_telemetry
+        self.interval_sec = interval_sec
+        self.resource_plan = resource_plan
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        if self.resource_plan is not None:
+            self.resource_plan.apply("io")
+        while not self._stop.wait(self.interval_sec):
+            try:
+                sample = self.read_telemetry()
+            except Exception:
+                sample = None
+            if sample:
+                self.recorder.record_event(TELEMETRY, **sample)
+
+
+class Record:
+    """로그에서 읽은 레코드"""
+
+    def __init__(self, kind, timestamp, utterance_id, payload):
+        self.kind = kind
+        self.timestamp = timestamp
+        self.utterance_id = utterance_id
+        self.payload = payload
+
+    @property
+    def name(self):
+        return RECORD_NAMES.get(self.kind, str(self.kind))
+
+    def __repr__(self):
+        return f"Record({self.name}, t={self.timestamp:.3f}, utterance={self.utterance_id})"
+
+
+class FlightLog:
+    """memory-map 으로 세션 로그를 읽는 리더 (임의 접근)"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): .vfr 파일 경로
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(LOG_MAGIC)] != LOG_MAGIC:
+            raise ValueError(f"비행 기록 파일이 아닙니다: {path}")
+        self._entries = self._load_index(path[:-len(LOG_SUFFIX)] + INDEX_SUFFIX)
+
+    def _load_index(self, index_path):
+        """인덱스를 읽어 (오프셋, 시각, 발화 id, 종류) 배열 반환 (없거나 손상되면 로그를 훑어 재구성)"""
+        dtype = np.dtype([("offset", "<u8"), ("timestamp", "<f8"), ("utterance_id", "<u4"), ("kind", "u1")])
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                raw = f.read()
+            if raw[:len(INDEX_MAGIC)] == INDEX_MAGIC:
+                body = raw[len(INDEX_MAGIC):]
+                entries = np.frombuffer(body[:len(body) - len(body) % INDEX_ENTRY.size], dtype=dtype)
+                # 기록 중 중단된 경우 로그 끝을 넘는 (불완전한) 레코드의 항목은 버림
+                count = len(entries)
+                while count and not self._complete(int(entries["offset"][count - 1])):
+                    count -= 1
+                return entries[:count]
+
+        entries = []
+        offset = len(LOG_MAGIC)
+        while self._complete(offset):
+            length, kind, timestamp, utterance_id = RECORD_HEADER.unpack_from(self._data, offset)
+            entries.append((offset, timestamp, utterance_id, kind))
+            offset += RECORD_HEADER.size + length
+        return np.array(entries, dtype=dtype)
+
+    def _complete(self, offset):
+        if offset + RECORD_HEADER.size > len(self._data):
+            return False
+        length = RECORD_HEADER.unpack_from(self._data, offset)[0]
+        return offset + RECORD_HEADER.size + length <= len(self._data)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, i):
+        offset = int(self._entries["offset"][i])
+        length, kind, timestamp, utterance_id = RECORD_HEADER.unpack_from(self._data, offset)
+        start = offset + RECORD_HEADER.size
+        if kind == AUDIO:
+            # 복사 없이 mmap 위의 int16 배열로 읽은 뒤 float32 로 변환
+            pcm = np.frombuffer(self._data, dtype="<i2", count=length // 2, offset=start)
+            payload = pcm.astype(np.float32) / 32767.0
+        else:
+            payload = json.loads(bytes(self._data[start:start + length]).decode("utf-8"))
+        return Record(kind, timestamp, utterance_id, payload)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def records(self, kind=None, utterance_id=None):
+        """조건에 맞는 레코드들 (인덱스만으로 걸러낸 뒤 해당 레코드만 읽음)"""
+        mask = np.ones(len(self._entries), dtype=bool)
+        if kind is not None:
+            mask &= self._entries["kind"] == kind
+        if utterance_id is not None:
+            mask &= self._entries["utterance_id"] == utterance_id
+        return [self[int(i)] for i in np.flatnonzero(mask)]
+
+    def session(self):
+        """세션 설정 레코드들을 합친 dict"""
+        info = {}
+        for record in self.records(SESSION):
+            info.update(record.payload)
+        return info
+
+    def utterances(self):
+        """
+        발화별 (오디오, 발화 레코드, 전송 레코드 목록) 을 시간 순으로 반환
+
+        Returns:
+            list[dict]: {"id", "timestamp", "audio", "utterance", "dispatches"}
+        """
+        result = {}
+        for i in np.flatnonzero(np.isin(self._entries["kind"], (AUDIO, UTTERANCE, DISPATCH))):
+            record = self[int(i)]
+            item = result.setdefault(record.utterance_id, {
+                "id": record.utterance_id, "timestamp": record.timestamp,
+                "audio": None, "utterance": None, "dispatches": [],
+            })
+            if record.kind == AUDIO:
+                item["audio"] = record.payload
+            elif record.kind == UTTERANCE:
+                item["utterance"] = record.payload
+            else:
+                item["dispatches"].append(record)
+        return sorted(result.values(), key=lambda item: item["timestamp"])
+
+    @property
+    def audio_sample_rate(self):
+        return TARGET_SAMPLE_RATE
+
+    def close(self):
+        self._data.close()
+
+
+def main():
+    """세션 로그 요약 출력"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Flight recorder log summary")
+    parser.add_argument("path", help=".vfr session file")
+    args = parser.parse_args()
+
+    log = FlightLog(args.path)
+    print(f"{args.path}: 레코드 {len(log)}개, {os.path.getsize(args.path) / 1024:.1f} KiB")
+    print(f"세션: {log.session()}")
+    for item in log.utterances():
+        utterance = item["utterance"] or {}
+        audio_sec = len(item["audio"]) / TARGET_SAMPLE_RATE if item["audio"] is not None else 0.0
+        sent = ", ".join(d.payload.get("command", "") for d in item["dispatches"]) or "-"
+        print(f"[{time.strftime('%H:%M:%S', time.localtime(item['timestamp']))}] #{item['id']} "
+              f"{audio_sec:.1f}초 '{utterance.get('transcript', '')}' -> {utterance.get('command', '-')} (전송: {sent})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+발화 -> 드론 명령 변환 단계 (무음 제거 -> STT -> 의도 분류기 -> LLM)
+
+VoiceCommandManager 와 세션 리플레이(replay.py)가 같은 코드로 명령을 만들도록 UI 와 분리한 처리 단계입니다.
+발화마다 하나의 처리 시간 예산(Deadline)을 적용하고, 예산을 넘기면 빠른 의도 매칭 또는 호버링으로 대체합니다.
+스트리밍 모드에서는 LLM 이 명령을 다 출력한 것이 확실해지면(명령 뒤 코드 블록 닫기나 설명 문장) 바로 확정하고 남은 생성은 취소합니다.
+의도 분류기가 있으면 LLM 전에 실행하여, 확신도가 임계값 이상인 단순 명령은 LLM 없이 바로 확정합니다.
+모델 관리자(ModelManager)를 쓰면 단계마다 현재 모델을 빌려 쓰므로, 처리 중에는 교체/해제되지 않습니다.
+여러 클라이언트가 모델을 공유할 때(audio_server.py)는 stage_locks 로 STT/LLM 단계를 각각 직렬화합니다.
+잠금 대기 시간도 처리 시간 예산에 포함되고, 정지 명령 판정은 잠금 밖에서 하므로 다른 발화의 LLM 생성을 기다리지 않습니다.
+"""
+
+import time
+from contextlib import contextmanager
+
+from vad import trim_silence
+from deadline import Deadline, DeadlineExceeded, InferenceCancelled
+from intent_matcher import match_intent, is_stop_command
+from command_parser import IncrementalCommandParser
+
+
+class CommandInference:
+    """오디오를 드론 명령 문자열로 변환"""
+
+    def __init__(self, stt, llm, log, latency_budget_sec=5.0, stream=True, classifier=None,
+                 classifier_threshold=0.9, models=None, stage_locks=None):
+        """
+        Args:
+            stt (SpeechToText): 음성 인식기 (models 를 쓰면 None)
+            llm (LLMChat): 언어 모델 (models 를 쓰면 None)
+            log (callable): 로그 함수
+            latency_budget_sec (float or None): 발화당 STT + LLM 처리 시간 예산 (초)
+            stream (bool): LLM 출력을 스트리밍으로 받아 명령이 확정되는 즉시 생성을 멈출지 여부
+            classifier (IntentClassifier, optional): LLM 앞 단계의 의도 분류기
+            classifier_threshold (float): 분류기 결과를 쓸 최소 확신도 (미만이면 LLM 사용)
+            models (ModelManager, optional): 발화마다 "stt", "llm" 슬롯의 현재 모델을 빌려 씀
+            stage_locks (dict, optional): {"stt": Lock, "llm": Lock} 단계별로 한 번에 하나의 발화만 모델을 쓰게 함
+        """
+        self.stt = stt
+        self.llm = llm
+        self.log = log
+        self.latency_budget_sec = latency_budget_sec
+        self.stream = stream
+        self.classifier = classifier
+        self.classifier_threshold = classifier_threshold
+        self.models = models
+        self.stage_locks = stage_locks if stage_locks is not None else {}
+
+        # 예산 초과 통계
+        self.utterance_count = 0
+        self.deadline_misses = {"STT": 0, "LLM": 0}
+
+    def run(self, audio, cancel_event=None, record=None):
+        """
+        무음 제거 -> STT -> (의도 분류기) -> LLM 순서로 명령 생성
+
+        Args:
+            audio (np.ndarray): 16 kHz float32 모노 발화
+            cancel_event (threading.Event, optional): set 되면 처리 취소
+            record (dict, optional): 단계별 결과(transcript, llm_raw, command, source)와 지연(latency_ms)을 채울 dict
+
+        Returns:
+            str or None: 전송할 명령 (발화가 무시되면 None)
+
+        Raises:
+            InferenceCancelled: cancel_event 로 취소된 경우
+        """
+        if record is None:
+            record = {}
+        record.setdefault("transcript", "")
+        record.setdefault("llm_raw", None)
+        record.setdefault("command", None)
+        record.setdefault("source", None)
+        latency = record.setdefault("latency_ms", {})
+        start = time.perf_counter()
+
+        # 앞뒤 무음 제거 및 긴 휴지 압축
+        trimmed = trim_silence(audio)
+        latency["trim"] = (time.perf_counter() - start) * 1000
+        if trimmed.rejected:
+            record["source"] = "rejected"
+            self.log(f"발화 무시 ({trimmed.reason}, {trimmed.original_sec:.1f}초): 모델을 호출하지 않습니다.")
+            return None
+
+        # 모델 대기 + STT + LLM 전체에 하나의 처리 시간 예산 적용 (새 발화가 오면 cancel_event 로 취소)
+        deadline = Deadline(self.latency_budget_sec, cancel_event)
+        self.utterance_count += 1
+        text = ""
+        try:
+            # 음성을 텍스트로 변환
+            with self._borrow("stt", deadline, latency) as stt:
+                saved_sec = stt.estimate_time(trimmed.removed_sec)
+                self.log(f"무음 제거: {trimmed.removed_fraction * 100:.0f}% ({trimmed.original_sec:.1f}초 -> "
+                         f"{trimmed.kept_sec:.1f}초), 예상 STT 절감 {saved_sec:.2f}초")
+                stage_start = time.perf_counter()
+                text = stt.transcribe(trimmed.audio, deadline=deadline)
+                latency["stt"] = (time.perf_counter() - stage_start) * 1000
+            record["transcript"] = text
+            self.log(f"인식된 음성: {text}")
+            if not text.strip():
+                # STT 가 프롬프트 반복 등으로 결과를 버린 경우
+                record["source"] = "rejected"
+                self.log("인식된 문장이 없어 발화를 무시합니다.")
+                return None
+
+            if is_stop_command(text):
+                # 발화 전체가 짧은 정지 구문일 때만 LLM 을 거치지 않고 바로 긴급 정지 (나머지는 분류기/LLM)
+                command = "stop"
+                record["source"] = "urgent"
+                self.log("긴급 정지 명령 감지: LLM 을 건너뜁니다.")
+            else:
+                # 의도 분류기로 확정하지 못한 발화만 LLM 사용
+                command = self._classify(text, record) if self.classifier is not None else None
+                if command is not None:
+                    record["source"] = "classifier"
+                else:
+                    # LLM으로 명령어 처리
+                    with self._borrow("llm", deadline, latency) as llm:
+                        stage_start = time.perf_counter()
+                        stats = {}
+                        if self.stream:
+                            command = self._stream_command(llm, text, deadline, record, stats)
+                        else:
+                            response = llm.chat(text, deadline=deadline, stats=stats)
+                            command = self.parse_llm_response(response, llm)
+                            record["llm_raw"] = response if isinstance(response, str) else command
+                        latency["llm"] = (time.perf_counter() - stage_start) * 1000
+                        record["source"] = "llm"
+                        if stats:
+                            rate = f", 드래프트 채택률 {stats['acceptance_rate'] * 100:.0f}%" if stats['acceptance_rate'] is not None else ""
+                            if stats.get("first_token_sec") is not None:
+                                latency["llm_first_token"] = stats["first_token_sec"] * 1000
+                                rate += f", 첫 토큰 {stats['first_token_sec'] * 1000:.0f}ms"
+                            if stats.get("stopped_early"):
+                                rate += ", 명령 확정 후 생성 중단"
+                            self.log(f"LLM 생성: {stats['new_tokens']}토큰, {stats['sec']:.2f}초 ({stats['tokens_per_sec']:.1f} tok/s{rate})")
+        except DeadlineExceeded as e:
+            if "stt" in self.stage_locks and "stt_wait" not in latency:
+                # STT 모델을 기다리다 예산을 다 쓴 발화는 처리하지 않음 (늦은 명령을 보내지 않음)
+                self.deadline_misses[e.stage] += 1
+                record["source"] = "expired"
+                self.log(f"처리 시간 초과: 모델 대기 중 {deadline.elapsed():.1f}초가 지나 발화를 버립니다.")
+                return None
+            command = self._fallback_command(e.stage, text, deadline)
+            record["source"] = f"fallback:{e.stage}"
+        except InferenceCancelled:
+            record["source"] = "cancelled"
+            raise
+        finally:
+            latency["total"] = (time.perf_counter() - start) * 1000
+
+        record["command"] = command
+        return command
+
+    def _classify(self, text, record):
+        """의도 분류기로 명령 확정 시도 (확신도가 낮거나 복합 명령이면 None)"""
+        stage_start = time.perf_counter()
+        prediction = self.classifier.classify(text, self.classifier_threshold)
+        record["latency_ms"]["classifier"] = (time.perf_counter() - stage_start) * 1000
+        record["classifier"] = {"label": prediction.label, "confidence": prediction.confidence}
+        if prediction.command is None:
+            self.log(f"의도 분류기: {prediction.label} ({prediction.confidence:.2f}), {prediction.reason} -> LLM 사용")
+            return None
+        self.log(f"의도 분류기: {prediction.command} ({prediction.confidence:.2f}), LLM 을 건너뜁니다.")
+        return prediction.command
+
+    @contextmanager
+    def _borrow(self, slot, deadline=None, latency=None):
+        """
+        슬롯의 모델 사용 (모델 관리자가 없으면 생성자에서 받은 모델)
+
+        단계 잠금이 있으면 잡을 때까지 기다리며, 기다리는 동안 예산을 넘기거나 취소되면 예외가 발생합니다.
+        """
+        lock = self.stage_locks.get(slot)
+        if lock is not None:
+            wait_start = time.perf_counter()
+            while not lock.acquire(timeout=0.05):
+                if deadline is not None:
+                    deadline.check(slot.upper())
+            if latency is not None:
+                latency[f"{slot}_wait"] = (time.perf_counter() - wait_start) * 1000
+        try:
+            if self.models is None:
+                yield getattr(self, slot)
+            else:
+                with self.models.use(slot) as (model,):
+                    yield model
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def _stream_command(self, llm, text, deadline, record, stats):
+        """
+        LLM 출력을 스트리밍으로 받아 명령(여러 줄 미션 포함)이 확정되면 바로 반환 (남은 생성은 취소)
+
+        record["llm_raw"] 에는 확정된 줄이 아니라 그때까지 받은 LLM 출력 전체를 남깁니다 (예산 초과로 끊긴 경우 포함).
+        """
+        parser = IncrementalCommandParser()
+        stream = llm.stream_chat(text, deadline=deadline, stats=stats)
+        try:
+            for chunk in stream:
+                command = parser.feed(chunk)
+                if command is not None:
+                    return command
+            return parser.finish()
+        finally:
+            stream.close()
+            record["llm_raw"] = parser.text
+
+    def _fallback_command(self, stage, text, deadline):
+        """처리 시간 예산 초과 시 대체 명령 (빠른 의도 매칭, 실패하면 호버링)"""
+        self.deadline_misses[stage] += 1
+        misses = sum(self.deadline_misses.values())
+        command = match_intent(text)
+        source = "빠른 의도 매칭"
+        if command is None:
+            command = "hovering"
+            source = "안전 호버링"
+        self.log(f"처리 시간 초과 ({stage}, {deadline.elapsed():.1f}초 / 예산 {deadline.budget_sec:.1f}초): "
+                 f"{source}으로 대체 -> {command} (예산 초과 {misses}/{self.utterance_count}회, "
+                 f"STT {self.deadline_misses['STT']} / LLM {self.deadline_misses['LLM']})")
+        return command
+
+    def parse_llm_response(self, response, llm=None):
+        """LLM 응답 파싱"""
+        try:
+            # LLM 출력 구조가 문자열이라면 그대로 반환
+            if isinstance(response, str):
+                return response.strip()
+
+            # LLM 클래스의 parse_output 메서드를 사용
+            return (llm or self.llm).parse_output(response)
+
+        except Exception as e:
+            self.log(f"LLM 응답 파싱 오류: {str(e)}")
+            return "알 수 없는 명령"
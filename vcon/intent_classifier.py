@@ -0,0 +1,277 @@
+"""
+경량 의도 분류기 (LLM 앞 단계)
+
+명령 어휘가 닫혀 있으므로 대부분의 발화는 Gemma 없이 분류할 수 있습니다.
+인식 문장의 문자 n-gram 을 해싱한 특징에 다항 로지스틱 회귀(NumPy)를 학습하고,
+"wait 3" 처럼 숫자 인자가 있는 명령은 "wait <n>" 템플릿으로 분류한 뒤 문장에서 숫자를 찾아 채웁니다.
+
+여러 단계로 된 미션이나 학습 데이터가 부족한 명령은 "__complex__" 로 분류되어 LLM 으로 넘어가고,
+확신도가 임계값보다 낮거나, 숫자 인자를 채울 수 없거나, 슬롯이 없는 명령인데 문장에 숫자가 있을 때
+("두 번 앞으로" 처럼 분류기가 표현할 수 없는 횟수/거리)도 LLM 을 사용합니다.
+CPU 에서 발화당 수십 마이크로초 안에 끝납니다.
+
+학습은 비행 기록에서 (인식 문장, LLM 명령) 쌍을 모아서 합니다: python train_intent.py flight_logs/*.vfr
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+from command_parser import parse_mission
+
+COMPLEX = "__complex__"
+SLOT = "<n>"
+DEFAULT_DIM = 2 ** 14
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_NUMERIC_TOKEN = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+# 단위 앞에 오는 한글 수사 (예: "세 번", "삼 초", "두 미터")
+_KOREAN_NUMBERS = {
+    "하나": 1, "한": 1, "둘": 2, "두": 2, "셋": 3, "세": 3, "넷": 4, "네": 4, "다섯": 5, "여섯": 6,
+    "일곱": 7, "여덟": 8, "아홉": 9, "열": 10,
+    "일": 1, "이": 2, "삼": 3, "사": 4, "오": 5, "육": 6, "칠": 7, "팔": 8, "구": 9, "십": 10,
+}
+_NUMBER_WITH_UNIT = re.compile(
+    r"(\d+(?:\.\d+)?|" + "|".join(sorted(_KOREAN_NUMBERS, key=len, reverse=True)) + r")\s*(?=초|미터|번|도|m\b)"
+)
+
+
+def normalize_text(text):
+    """소문자화, 문장부호 제거, 숫자는 '0' 으로 통일 (숫자 값은 특징에 쓰지 않음)"""
+    text = re.sub(r"[^\w\s.]", " ", text.lower())
+    text = _NUMBER.sub("0", text)
+    return " ".join(text.split())
+
+
+def command_template(command):
+    """
+    명령을 분류 라벨로 변환 (숫자 인자는 <n> 슬롯, 여러 단계는 __complex__)
+
+    Returns:
+        str or None: 라벨 (유효한 명령이 아니면 None)
+    """
+    try:
+        steps = parse_mission(command)
+    except ValueError:
+        return None
+    if len(steps) != 1:
+        return COMPLEX
+    return " ".join(SLOT if _NUMERIC_TOKEN.match(token) else token for token in steps[0].command.split())
+
+
+def extract_numbers(text):
+    """
+    문장에 나온 숫자들 (아라비아 숫자, 단위 앞의 한글 수사)
+
+    Returns:
+        list[float]: 나온 순서대로의 숫자
+    """
+    numbers = []
+    for match in _NUMBER_WITH_UNIT.finditer(text):
+        token = match.group(1)
+        numbers.append((match.start(), float(_KOREAN_NUMBERS.get(token, token))))
+    # 단위 없이 쓴 아라비아 숫자도 포함
+    seen = {start for start, _ in numbers}
+    for match in _NUMBER.finditer(text):
+        if match.start() not in seen:
+            numbers.append((match.start(), float(match.group())))
+    return [value for _, value in sorted(numbers)]
+
+
+def fill_slots(template, numbers):
+    """
+    템플릿의 <n> 슬롯을 숫자로 채움
+
+    Returns:
+        str or None: 명령 (슬롯 수와 숫자 수가 맞지 않거나 명령이 유효하지 않으면 None,
+            슬롯이 없는 템플릿에 숫자가 주어진 경우도 None)
+    """
+    if len(numbers) != template.count(SLOT):
+        return None
+    parts = []
+    values = iter(numbers)
+    for token in template.split():
+        if token == SLOT:
+            value = next(values)
+            token = str(int(value)) if value == int(value) else f"{value:g}"
+        parts.append(token)
+    command = " ".join(parts)
+    try:
+        parse_mission(command)
+    except ValueError:
+        return None
+    return command
+
+
+class IntentPrediction:
+    """분류 결과"""
+
+    def __init__(self, label, confidence, command=None, reason=""):
+        """
+        Args:
+            label (str): 예측 라벨
+            confidence (float): 확률
+            command (str or None): 바로 보낼 명령 (None 이면 LLM 으로 넘김)
+            reason (str): LLM 으로 넘긴 이유
+        """
+        self.label = label
+        self.confidence = confidence
+        self.command = command
+        self.reason = reason
+
+    def __repr__(self):
+        return f"IntentPrediction({self.label!r}, {self.confidence:.2f}, command={self.command!r})"
+
+
+class IntentClassifier:
+    """해싱 문자 n-gram + 다항 로지스틱 회귀 분류기"""
+
+    def __init__(self, labels, weights, bias, dim=DEFAULT_DIM, ngram_range=(1, 3)):
+        """
+        Args:
+            labels (list[str]): 라벨 목록
+            weights (np.ndarray): (dim, 라벨 수) 가중치
+            bias (np.ndarray): (라벨 수,) 편향
+            dim (int): 해싱 특징 차원
+            ngram_range (tuple): 문자 n-gram 길이 범위 (최소, 최대)
+        """
+        self.labels = list(labels)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+
+    def features(self, text):
+        """
+        해싱된 특징의 (인덱스, 값) - L2 정규화된 이진 특징
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: 인덱스 (int64), 값 (float32)
+        """
+        return hash_features(text, self.dim, self.ngram_range)
+
+    def predict(self, text):
+        """
+        Returns:
+            tuple[str, float]: (라벨, 확률)
+        """
+        index, value = self.features(text)
+        logits = value @ self.weights[index] + self.bias
+        logits -= logits.max()
+        probs = np.exp(logits)
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.labels[best], float(probs[best])
+
+    def classify(self, text, threshold=0.9):
+        """
+        문장을 분류하고 바로 보낼 수 있으면 명령을 채워서 반환
+
+        Args:
+            text (str): 인식된 문장
+            threshold (float): 이 확률 이상일 때만 명령으로 사용
+
+        Returns:
+            IntentPrediction: command 가 None 이면 LLM 사용
+        """
+        label, confidence = self.predict(text)
+        if label == COMPLEX:
+            return IntentPrediction(label, confidence, reason="복합 명령")
+        if confidence < threshold:
+            return IntentPrediction(label, confidence, reason="낮은 확신도")
+        command = fill_slots(label, extract_numbers(text))
+        if command is None:
+            return IntentPrediction(label, confidence, reason="인자 추출 실패")
+        return IntentPrediction(label, confidence, command)
+
+    @classmethod
+    def train(cls, texts, labels, dim=DEFAULT_DIM, ngram_range=(1, 3), epochs=300, learning_rate=0.1,
+              l2=1e-4, min_count=2):
+        """
+        Adam 으로 소프트맥스 교차 엔트로피를 최소화하여 학습
+
+        Args:
+            texts (list[str]): 인식 문장
+            labels (list[str]): command_template 로 만든 라벨
+            min_count (int): 이보다 적게 나온 라벨은 __complex__ 로 합침 (LLM 이 처리)
+
+        Returns:
+            IntentClassifier: 학습된 분류기
+        """
+        counts = {}
+        for label in labels:
+            counts[label] = counts.get(label, 0) + 1
+        labels = [label if counts[label] >= min_count else COMPLEX for label in labels]
+        label_names = sorted(set(labels) | {COMPLEX})
+        label_index = {label: i for i, label in enumerate(label_names)}
+        y = np.array([label_index[label] for label in labels])
+
+        # 희소 특징 (행, 열, 값)
+        rows, cols, vals = [], [], []
+        for i, text in enumerate(texts):
+            index, value = hash_features(text, dim, ngram_range)
+            rows.append(np.full(len(index), i))
+            cols.append(index)
+            vals.append(value)
+        rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+        n, k = len(texts), len(label_names)
+        onehot = np.zeros((n, k), dtype=np.float32)
+        onehot[np.arange(n), y] = 1.0
+
+        weights = np.zeros((dim, k), dtype=np.float32)
+        bias = np.zeros(k, dtype=np.float32)
+        moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, epochs + 1):
+            logits = np.zeros((n, k), dtype=np.float32)
+            np.add.at(logits, rows, vals[:, None] * weights[cols])
+            logits += bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            error = (probs - onehot) / n
+
+            grad_w = np.zeros_like(weights)
+            np.add.at(grad_w, cols, vals[:, None] * error[rows])
+            grad_w += l2 * weights
+            grad_b = error.sum(axis=0)
+
+            for param, grad, m, v in ((weights, grad_w, moments[0], moments[1]), (bias, grad_b, moments[2], moments[3])):
+                m *= beta1
+                m += (1 - beta1) * grad
+                v *= beta2
+                v += (1 - beta2) * grad * grad
+                param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+        return cls(label_names, weights, bias, dim, ngram_range)
+
+    def save(self, path):
+        np.savez_compressed(path, labels=np.array(self.labels), weights=self.weights, bias=self.bias,
+                            dim=self.dim, ngram_range=np.array(self.ngram_range))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls([str(label) for label in data["labels"]], data["weights"], data["bias"],
+                       int(data["dim"]), tuple(int(n) for n in data["ngram_range"]))
+
+
+def hash_features(text, dim=DEFAULT_DIM, ngram_range=(1, 3)):
+    """
+    문자 n-gram 해싱 특징 (crc32 로 해싱하므로 프로세스가 달라도 같은 인덱스)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: 인덱스, L2 정규화된 값
+    """
+    padded = f" {normalize_text(text)} "
+    index = set()
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        for i in range(len(padded) - n + 1):
+            index.add(zlib.crc32(padded[i:i + n].encode("utf-8")) % dim)
+    if not index:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    index = np.fromiter(index, dtype=np.int64, count=len(index))
+    value = np.full(len(index), 1.0 / np.sqrt(len(index)), dtype=np.float32)
+    return index, value
@@ -0,0 +1,69 @@
+"""
+빠른 키워드 기반 의도 매칭
+
+인식된 한국어 문장에서 명령 키워드를 찾아 드론 명령으로 바꿉니다.
+LLM 이 처리 시간 예산을 넘겼을 때의 대체 경로로, 수 마이크로초 안에 끝납니다.
+
+stop 은 모터를 바로 끄는 긴급 정지이므로, 발화 전체가 짧은 정지 구문일 때만 stop 으로 봅니다.
+("멈추지 말고 계속 앞으로 가", "그만큼 더 앞으로 가", "앞으로 가다가 멈춰" 는 stop 이 아님)
+"""
+
+import re
+
+# (명령, 키워드 정규식 목록)
+INTENT_RULES = [
+    ("stop", ["정지", "멈춰", "멈추", "스톱", "그만"]),
+    ("landing", ["착륙", "내려앉"]),
+    ("takeoff", ["이륙", "날아올라", "떠올라"]),
+    ("hovering", ["호버링", "제자리"]),
+    ("move up", ["위로", "(?<!날아)(?<!떠)올라", "상승"]),
+    ("move down", ["아래로", "내려(?!앉)", "하강"]),
+    ("move left", ["왼쪽", "좌측"]),
+    ("move right", ["오른쪽", "우측"]),
+    ("move forward", ["앞으로", "전진"]),
+    ("move backward", ["뒤로", "후진"]),
+]
+
+_PATTERNS = [(command, re.compile("|".join(words))) for command, words in INTENT_RULES]
+
+# 발화 전체가 이 구문(최대 3번 반복)일 때만 긴급 정지
+_STOP_PHRASE = (r"(?:드론)?(?:긴급|비상)?(?:정지(?:해|해요|해라|해줘|해주세요|하세요|시켜)?"
+                r"|멈춰(?:요|라|줘|주세요)?|멈추세요|스톱|스탑|그만(?:해|해요|해라|하세요)?|stop)")
+_STOP_COMMAND = re.compile(f"{_STOP_PHRASE}{{1,3}}")
+_IGNORED_CHARS = re.compile(r"[\s.,!?~…]+")
+
+
+def is_stop_command(text):
+    """
+    발화 전체가 짧은 정지 구문인지 여부 (공백/문장부호 무시)
+
+    Args:
+        text (str): 인식된 문장
+
+    Returns:
+        bool: "정지", "멈춰!", "긴급 정지", "그만해", "스톱 스톱" 등이면 True
+    """
+    if not text:
+        return False
+    return _STOP_COMMAND.fullmatch(_IGNORED_CHARS.sub("", text.lower())) is not None
+
+
+def match_intent(text):
+    """
+    문장에서 단일 명령을 찾음
+
+    Args:
+        text (str): 인식된 문장
+
+    Returns:
+        str or None: 명령 (키워드가 없거나, 서로 다른 명령이 섞였거나, 정지 구문이 아닌데 정지 키워드가
+            들어 있어 애매하면 None)
+    """
+    if not text:
+        return None
+    if is_stop_command(text):
+        return "stop"
+    matched = [command for command, pattern in _PATTERNS if pattern.search(text)]
+    if len(matched) != 1 or matched[0] == "stop":
+        return None
+    return matched[0]
@@ -0,0 +1,351 @@
+"""
+호출어(키워드) 검출기
+
+"드론", "drone" 같은 호출어를 상시 감시하여, 호출어 뒤의 발화만 Whisper/LLM 으로 전달합니다.
+별도 학습 모델 없이 등록된 호출어 녹음(템플릿)과 MFCC 특징을 subsequence DTW 로 비교하므로
+한 코어에서 실시간보다 훨씬 빠르게 동작합니다. 음성 에너지가 있는 구간에서만 DTW 를 계산합니다.
+
+템플릿 디렉토리 구성:
+    kws_templates/드론_1.wav, kws_templates/드론_2.wav, kws_templates/drone_1.wav ...
+    (파일 이름의 '_' 앞부분이 호출어 이름, 호출어만 짧게 녹음한 16 kHz 이상 WAV 3~5개 권장)
+"""
+
+import os
+import time
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from audio_input import TARGET_SAMPLE_RATE, PolyphaseResampler, to_float32_mono, load_audio_file
+from vad import voiced_frames
+
+
+def _mel_filterbank(sample_rate, n_fft, n_mels):
+    """삼각 mel 필터뱅크 (n_mels, n_fft // 2 + 1)"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(20.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fb[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fb[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fb
+
+
+class MfccExtractor:
+    """스트리밍 MFCC 특징 추출기 (25 ms 창, 10 ms 간격)"""
+
+    def __init__(self, sample_rate=TARGET_SAMPLE_RATE, win_ms=25, hop_ms=10, n_mels=26, n_mfcc=13):
+        self.win = int(sample_rate * win_ms / 1000)
+        self.hop = int(sample_rate * hop_ms / 1000)
+        self.n_fft = 1 << (self.win - 1).bit_length()
+        self.window = np.hamming(self.win).astype(np.float32)
+        self.fb = _mel_filterbank(sample_rate, self.n_fft, n_mels)
+        # DCT-II (orthonormal) 행렬
+        n = np.arange(n_mels)
+        k = np.arange(n_mfcc)[:, None]
+        dct = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+        dct[0] /= np.sqrt(2.0)
+        self.dct = dct.astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        """스트림 상태 초기화"""
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def compute(self, audio):
+        """
+        오디오 전체의 특징 계산
+
+        Returns:
+            tuple: (mfcc (frames, n_mfcc), 프레임 에너지 dB (frames,))
+        """
+        if len(audio) < self.win:
+            return np.zeros((0, len(self.dct)), dtype=np.float32), np.zeros(0, dtype=np.float32)
+        frames = sliding_window_view(audio, self.win)[::self.hop] * self.window
+        energy_db = 10.0 * np.log10(np.einsum('ij,ij->i', frames, frames) / self.win + 1e-10)
+        power = np.abs(np.fft.rfft(frames, n=self.n_fft)) ** 2
+        log_mel = np.log(power.astype(np.float32) @ self.fb.T + 1e-6)
+        return log_mel @ self.dct.T, energy_db.astype(np.float32)
+
+    def process(self, chunk):
+        """청크를 이어 붙여 새로 완성된 프레임의 특징만 반환"""
+        audio = np.concatenate((self._pending, chunk))
+        n_frames = 0 if len(audio) < self.win else (len(audio) - self.win) // self.hop + 1
+        self._pending = audio[n_frames * self.hop:]
+        return self.compute(audio[:(n_frames - 1) * self.hop + self.win] if n_frames else audio[:0])
+
+
+def _normalize(features):
+    """c0(에너지)를 제외하고 프레임별 L2 정규화 (마이크 이득 차이에 둔감하도록)"""
+    cep = features[:, 1:]
+    return cep / (np.linalg.norm(cep, axis=1, keepdims=True) + 1e-8)
+
+
+def subsequence_dtw(template, sequence):
+    """
+    템플릿이 시퀀스의 어느 부분과 가장 잘 맞는지 찾는 subsequence DTW
+
+    시작 위치는 자유이고, 경로 기울기는 1/2 ~ 2 로 제한합니다 (스텝 (1,1), (1,2), (2,1)).
+    모든 스텝이 시퀀스를 한 칸 이상 전진시키므로 행 단위로 벡터화됩니다.
+    비용은 1 - cosine 유사도이며 템플릿의 모든 프레임이 한 번씩 비용에 포함됩니다.
+
+    Returns:
+        np.ndarray: 시퀀스의 각 끝 프레임별 정규화 거리 (템플릿 길이로 나눔)
+    """
+    cost = 1.0 - template @ sequence.T  # (T, N)
+    n = cost.shape[1]
+    inf = np.full(2, np.inf, dtype=cost.dtype)
+    prev2 = np.full(n + 2, np.inf, dtype=cost.dtype)  # D[i-2] (앞에 inf 2칸)
+    prev = np.concatenate((inf, cost[0]))  # D[i-1]
+    for i in range(1, len(template)):
+        # (i-1, j-1), (i-1, j-2), (i-2, j-1) + cost[i-1, j]
+        best = np.minimum(prev[1:-1], prev[:-2])
+        if i >= 2:
+            best = np.minimum(best, prev2[1:-1] + cost[i - 1])
+        prev2, prev = prev, np.concatenate((inf, cost[i] + best))
+    return prev[2:] / len(template)
+
+
+class Detection:
+    """호출어 검출 결과"""
+
+    def __init__(self, label, distance, end_sample, detected_sample):
+        self.label = label
+        self.distance = distance
+        self.end_sample = end_sample  # 호출어가 끝난 위치 (스트림 시작 기준 16 kHz 샘플)
+        self.detected_sample = detected_sample  # 검출 시점까지 처리된 샘플 수
+
+    @property
+    def latency_sec(self):
+        """호출어가 끝난 뒤 검출되기까지의 오디오 지연"""
+        return (self.detected_sample - self.end_sample) / TARGET_SAMPLE_RATE
+
+
+class KeywordSpotter:
+    """등록된 템플릿 기반 스트리밍 호출어 검출기"""
+
+    def __init__(self, templates, threshold=0.15, window_sec=1.5, eval_ms=100, settle_ms=100, refractory_sec=1.0):
+        """
+        Args:
+            templates (dict): 호출어 이름 -> 템플릿 특징 배열 목록
+            threshold (float): 검출 기준 정규화 DTW 거리 (작을수록 엄격)
+            window_sec (float): 탐색할 최근 오디오 길이
+            eval_ms (int): DTW 평가 간격
+            settle_ms (int): 최적 정합의 끝이 이만큼 지나도 바뀌지 않아야 검출로 확정 (호출어가 끝나기 전 조기 검출 방지)
+            refractory_sec (float): 검출 후 같은 호출어를 다시 검출하지 않는 시간
+        """
+        self.extractor = MfccExtractor()
+        self.templates = {label: [_normalize(t) for t in ts] for label, ts in templates.items()}
+        self.threshold = threshold
+        self.window_frames = int(window_sec * 1000 / 10)
+        self.eval_frames = max(1, int(eval_ms / 10))
+        self.settle_frames = int(settle_ms / 10)
+        self.refractory_samples = int(refractory_sec * TARGET_SAMPLE_RATE)
+        self.hop = self.extractor.hop
+        self.reset()
+
+    @classmethod
+    def from_directory(cls, template_dir, **kwargs):
+        """템플릿 디렉토리의 WAV 파일로 검출기 생성"""
+        extractor = MfccExtractor()
+        templates = {}
+        for name in sorted(os.listdir(template_dir)):
+            if not name.lower().endswith(".wav"):
+                continue
+            label = os.path.splitext(name)[0].rsplit("_", 1)[0]
+            features, energy = extractor.compute(load_audio_file(os.path.join(template_dir, name)))
+            # 템플릿 앞뒤 무음 프레임 제거
+            voiced = np.flatnonzero(voiced_frames(energy))
+            if len(voiced) == 0:
+                print(f"호출어 템플릿에 음성이 없습니다: {name}")
+                continue
+            templates.setdefault(label, []).append(features[voiced[0]:voiced[-1] + 1])
+        if not templates:
+            raise ValueError(f"호출어 템플릿이 없습니다: {template_dir}")
+        return cls(templates, **kwargs)
+
+    def reset(self):
+        """스트림 상태 초기화"""
+        self.extractor.reset()
+        self._features = np.zeros((0, self.extractor.dct.shape[0] - 1), dtype=np.float32)
+        self._energy = np.zeros(0, dtype=np.float32)
+        self._frames_total = 0  # 지금까지 계산된 프레임 수
+        self._since_eval = 0
+        self._last_detection_sample = -self.refractory_samples
+        self.samples_processed = 0
+        self.dtw_evaluations = 0
+
+    def process(self, chunk):
+        """
+        16 kHz float32 청크 처리
+
+        Returns:
+            list: 이번 청크에서 검출된 Detection 목록
+        """
+        self.samples_processed += len(chunk)
+        features, energy = self.extractor.process(chunk)
+        if len(features) == 0:
+            return []
+        self._features = np.concatenate((self._features, _normalize(features)))[-self.window_frames:]
+        self._energy = np.concatenate((self._energy, energy))[-self.window_frames:]
+        self._frames_total += len(features)
+        self._since_eval += len(features)
+        if self._since_eval < self.eval_frames:
+            return []
+        self._since_eval = 0
+
+        # 최근 구간에 음성이 없으면 DTW 생략
+        if not voiced_frames(self._energy)[-(self.eval_frames + self.settle_frames):].any():
+            return []
+
+        best = None
+        for label, templates in self.templates.items():
+            for template in templates:
+                if len(template) > len(self._features) * 2:
+                    continue
+                distances = subsequence_dtw(template, self._features)
+                end = int(np.argmin(distances))
+                if best is None or distances[end] < best[1]:
+                    best = (label, float(distances[end]), end)
+        self.dtw_evaluations += 1
+        if best is None or best[1] > self.threshold:
+            return []
+
+        label, distance, end = best
+        if len(self._features) - 1 - end < self.settle_frames:
+            # 호출어가 아직 이어지는 중일 수 있으므로 다음 평가까지 보류
+            return []
+        first_frame = self._frames_total - len(self._features)
+        end_sample = (first_frame + end) * self.hop + self.extractor.win
+        if end_sample - self._last_detection_sample < self.refractory_samples:
+            return []
+        self._last_detection_sample = end_sample
+        return [Detection(label, distance, end_sample, self.samples_processed)]
+
+    def recent_speech(self, n_samples):
+        """최근 n_samples 구간에 음성 프레임이 있는지 여부"""
+        n_frames = max(1, n_samples // self.hop)
+        return bool(voiced_frames(self._energy)[-n_frames:].any())
+
+
+class KeywordGate:
+    """
+    캡처 스트림에서 호출어를 상시 감시하고, 호출어 뒤의 발화만 콜백으로 전달하는 게이트
+
+    AudioRecorder 의 링 버퍼를 주기적으로 읽으므로 푸시투토크 녹음과 같은 스트림을 공유합니다.
+    """
+
+    def __init__(self, recorder, spotter, on_utterance, on_detection=None, poll_ms=50,
+                 end_silence_ms=700, max_utterance_sec=8.0, no_speech_timeout_sec=3.0):
+        """
+        Args:
+            recorder (AudioRecorder): 항상 열려 있는 캡처 스트림
+            spotter (KeywordSpotter): 호출어 검출기
+            on_utterance (callable): on_utterance(audio) - 호출어 뒤 발화 (16 kHz float32)
+            on_detection (callable, optional): on_detection(Detection)
+            poll_ms (int): 링 버퍼를 읽는 간격
+            end_silence_ms (int): 발화 종료로 판단할 무음 길이
+            max_utterance_sec (float): 발화 최대 길이
+            no_speech_timeout_sec (float): 호출어 뒤 발화가 없을 때 대기 시간
+        """
+        self.recorder = recorder
+        self.spotter = spotter
+        self.on_utterance = on_utterance
+        self.on_detection = on_detection
+        self.poll_sec = poll_ms / 1000.0
+        self.end_silence_samples = int(end_silence_ms * TARGET_SAMPLE_RATE / 1000)
+        self.max_utterance_samples = int(max_utterance_sec * TARGET_SAMPLE_RATE)
+        self.no_speech_timeout_samples = int(no_speech_timeout_sec * TARGET_SAMPLE_RATE)
+        self.resampler = PolyphaseResampler(recorder.rate, TARGET_SAMPLE_RATE)
+
+        self.running = False
+        self.thread = None
+        self.detections = 0
+        self.forwarded_sec = 0.0
+        self.listened_sec = 0.0
+        self.cpu_sec = 0.0
+
+    def start(self):
+        """감시 시작"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """감시 중지"""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    @property
+    def cpu_load(self):
+        """게이트가 사용한 CPU 시간 / 감시한 오디오 시간 (한 코어 기준 점유율)"""
+        return self.cpu_sec / self.listened_sec if self.listened_sec else 0.0
+
+    def _run(self):
+        self.spotter.reset()
+        self.resampler.reset()
+        read_index = self.recorder.frames_written
+        history = []  # 최근 16 kHz 청크 (호출어 직후 구간을 잘라내기 위해 보관)
+        history_start = 0  # history[0] 의 스트림 기준 샘플 위치
+        capture = None  # 발화 수집 중이면 [시작 샘플, 청크 목록, 마지막 음성 샘플]
+
+        while self.running:
+            time.sleep(self.poll_sec)
+            cpu_start = time.thread_time()
+            end_index = self.recorder.frames_written
+            frames = self.recorder.read_frames(read_index, end_index)
+            read_index = end_index
+            chunk = self.resampler.process(to_float32_mono(frames))
+            if len(chunk) == 0:
+                continue
+            chunk_start = self.spotter.samples_processed
+            self.listened_sec += len(chunk) / TARGET_SAMPLE_RATE
+
+            detections = self.spotter.process(chunk)
+            history.append(chunk)
+            while len(history) > 1 and chunk_start - history_start > TARGET_SAMPLE_RATE * 2:
+                history_start += len(history.pop(0))
+
+            if capture is None and detections:
+                detection = detections[-1]
+                self.detections += 1
+                if self.on_detection:
+                    self.on_detection(detection)
+                # 호출어가 끝난 지점부터 수집
+                audio = np.concatenate(history)[max(0, detection.end_sample - history_start):]
+                capture = [detection.end_sample, [audio], detection.end_sample]
+            elif capture is not None:
+                capture[1].append(chunk)
+                capture = self._update_capture(capture, len(chunk))
+            self.cpu_sec += time.thread_time() - cpu_start
+
+    def _update_capture(self, capture, chunk_len):
+        """수집 중인 발화의 종료 여부 판단. 종료되면 콜백 호출 후 None 반환"""
+        start, chunks, last_voiced = capture
+        now = self.spotter.samples_processed
+        if self.spotter.recent_speech(chunk_len):
+            capture[2] = last_voiced = now
+
+        spoke = last_voiced > start
+        if (spoke and now - last_voiced >= self.end_silence_samples) or now - start >= self.max_utterance_samples:
+            audio = np.concatenate(chunks)
+            self.forwarded_sec += len(audio) / TARGET_SAMPLE_RATE
+            self.on_utterance(audio)
+            return None
+        if not spoke and now - start >= self.no_speech_timeout_samples:
+            return None
+        return capture
@@ -9,11 +9,18 @@ please do not modify this comment block. you can modify other than this block.
 """
 
 import os
-import torch
-from transformers import pipeline
+import time
+import threading
+from contextlib import contextmanager
+from transformers import pipeline, AutoModelForCausalLM, StoppingCriteriaList, TextIteratorStreamer
+
+from model_artifacts import find_exported_model
+from deadline import EventStoppingCriteria
+from machine_profile import select_inference_config, apply_threads, quantize_model
 
 class LLMChat:
-    def __init__(self, model_name="google/gemma-3-1b-it", cache_dir="../model_cache", prompt_file="prompt.txt"):
+    def __init__(self, model_name="google/gemma-3-1b-it", cache_dir="../model_cache", prompt_file="prompt.txt",
+                 draft_model_name=None, resource_plan=None):
         """
         LLM 채팅 모델을 초기화합니다.
         
@@ -21,29 +28,113 @@ class LLMChat:
             model_name (str): 사용할 모델 이름
             cache_dir (str): 모델 캐시 디렉토리 경로
             prompt_file (str): 프롬프트 파일 경로
+            draft_model_name (str): 추측 디코딩(assisted generation)용 소형 드래프트 모델 이름
+                (같은 토크나이저를 쓰는 모델, 예: google/gemma-3-270m-it). None 이면 사용 안 함
+            resource_plan (ResourcePlan): CPU 자원 계획 (스레드 수/affinity, None 이면 머신 프로파일의 스레드 수)
         """
         # 캐시 디렉토리 생성
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir)
             
-        # GPU 사용 여부 확인 및 출력
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"Prepare to use {device}")
-            
-        # 모델 로드
-        self.pipe = pipeline(
-            "text-generation",
-            model=model_name,
-            device=device,
-            torch_dtype=torch.bfloat16,
-            model_kwargs={"cache_dir": cache_dir}
-        )
+        # 디바이스, dtype, 스레드 수, 양자화 설정 (gpu_check.py 가 만든 머신 프로파일이 있으면 그 추천값)
+        self.config = select_inference_config(cache_dir, "llm")
+        device = self.config.device
+        torch_dtype = self.config.torch_dtype
+        self.resource_plan = resource_plan
+        if resource_plan is not None:
+            resource_plan.apply("llm")
+        else:
+            apply_threads(self.config)
+        print(f"Prepare to use {device} ({self.config})")
+        
+        # 모델 로드 (사전 변환된 아티팩트가 있으면 dtype 변환 없이 memory-map)
+        export_dir = find_exported_model(cache_dir, model_name, device, torch_dtype)
+        if export_dir:
+            print(f"사전 변환된 모델 사용: {export_dir}")
+            self.pipe = pipeline(
+                "text-generation",
+                model=export_dir,
+                device=device,
+                torch_dtype=torch_dtype,
+                model_kwargs={"low_cpu_mem_usage": True, "use_safetensors": True}
+            )
+        else:
+            self.pipe = pipeline(
+                "text-generation",
+                model=model_name,
+                device=device,
+                torch_dtype=torch_dtype,
+                model_kwargs={"cache_dir": cache_dir}
+            )
+        
+        self.pipe.model = quantize_model(self.pipe.model, self.config)
+        
+        # 드래프트 모델 로드 (선택)
+        self.draft_model = None
+        if draft_model_name:
+            self.draft_model = self._load_draft_model(draft_model_name, cache_dir, device, torch_dtype)
+        
+        # 생성 통계 (forward 호출 수로 드래프트 토큰 채택률 계산)
+        # 같은 인스턴스를 여러 호출이 빌려 쓸 수 있으므로 카운터는 생성 스레드별로 둠 (호출마다 stats dict 로 돌려줌)
+        self._forward_counts = threading.local()
+        self.pipe.model.register_forward_hook(self._count_main_forward)
+        if self.draft_model is not None:
+            self.draft_model.register_forward_hook(self._count_draft_forward)
         
         # 프롬프트 파일 로드
         self.system_prompt = self._load_prompt(prompt_file)
         
         print(f"모델 '{model_name}'이(가) 로드되었습니다. 캐시 디렉토리: {cache_dir}")
         
+    def _load_draft_model(self, draft_model_name, cache_dir, device, torch_dtype):
+        """
+        드래프트 모델을 로드합니다. 메인 모델과 어휘가 다르면 사용하지 않습니다.
+        
+        Returns:
+            PreTrainedModel or None: 드래프트 모델
+        """
+        export_dir = find_exported_model(cache_dir, draft_model_name, device, torch_dtype)
+        if export_dir:
+            draft = AutoModelForCausalLM.from_pretrained(
+                export_dir, torch_dtype=torch_dtype, low_cpu_mem_usage=True, use_safetensors=True
+            )
+        else:
+            draft = AutoModelForCausalLM.from_pretrained(
+                draft_model_name, torch_dtype=torch_dtype, cache_dir=cache_dir
+            )
+        draft.to(device).eval()
+        draft = quantize_model(draft, self.config)
+        
+        # 드래프트가 제안한 토큰 id 를 메인 모델이 그대로 검증하므로 어휘가 같아야 함
+        main_vocab = self.pipe.model.get_input_embeddings().num_embeddings
+        draft_vocab = draft.get_input_embeddings().num_embeddings
+        if len(self.pipe.tokenizer) > min(main_vocab, draft_vocab):
+            print(f"경고: 드래프트 모델 '{draft_model_name}'의 어휘가 메인 모델과 맞지 않아 사용하지 않습니다.")
+            return None
+        
+        print(f"드래프트 모델 '{draft_model_name}'이(가) 로드되었습니다. (추측 디코딩 사용)")
+        return draft
+    
+    def _count_main_forward(self, module, inputs, output):
+        counts = getattr(self._forward_counts, "counts", None)
+        if counts is not None:
+            counts["main_forwards"] += 1
+    
+    def _count_draft_forward(self, module, inputs, output):
+        counts = getattr(self._forward_counts, "counts", None)
+        if counts is not None:
+            counts["draft_forwards"] += 1
+    
+    @contextmanager
+    def _counting_forwards(self, counts):
+        """이 스레드에서 실행되는 forward 호출 수를 counts 에 셈"""
+        counts.update(main_forwards=0, draft_forwards=0)
+        self._forward_counts.counts = counts
+        try:
+            yield
+        finally:
+            self._forward_counts.counts = None
+    
     def _load_prompt(self, prompt_file):
         """
         프롬프트 파일을 로드합니다.
@@ -61,37 +152,173 @@ class LLMChat:
             print(f"경고: 프롬프트 파일 '{prompt_file}'을 찾을 수 없습니다. 빈 프롬프트를 사용합니다.")
             return ""
     
-    def chat(self, user_message):
+    def chat(self, user_message, use_draft=True, deadline=None, stats=None):
         """
         사용자 메시지에 대한 응답을 생성합니다. 대화 누적 없이 단일 메시지만 처리합니다.
         
+        그리디 디코딩을 사용하므로 같은 입력에는 항상 같은 명령이 나오며,
+        드래프트 모델을 써도 출력은 드래프트 없이 생성한 것과 같습니다.
+        
         Args:
             user_message (str): 사용자 메시지
+            use_draft (bool): 드래프트 모델이 로드되어 있을 때 추측 디코딩 사용 여부
+            deadline (Deadline, optional): 처리 시간 예산 (넘기거나 취소되면 다음 토큰에서 생성을 멈춤)
+            stats (dict, optional): 이 호출의 생성 통계(속도, 드래프트 채택률)를 채울 dict
             
         Returns:
             str: 모델의 응답
+            
+        Raises:
+            InferenceCancelled: deadline 이 취소되었거나 예산을 넘긴 경우 (DeadlineExceeded)
         """
         # 매번 새로운 메시지 구성 (대화 기록 유지 없음)
-        messages = [
-            [
-                {
-                    "role": "system",
-                    "content": [{"type": "text", "text": self.system_prompt}]
-                },
-                {
-                    "role": "user",
-                    "content": [{"type": "text", "text": user_message}]
-                }
-            ]
-        ]
+        messages = [self._build_messages(user_message)]
+        
+        if self.resource_plan is not None:
+            self.resource_plan.apply("llm")
+        
+        generate_kwargs = {"max_new_tokens": 512, "do_sample": False}
+        assisted = use_draft and self.draft_model is not None
+        if assisted:
+            generate_kwargs["assistant_model"] = self.draft_model
+        if deadline is not None:
+            deadline.check("LLM")
+            generate_kwargs["stopping_criteria"] = deadline.stopping_criteria()
         
         # 응답 생성
-        output = self.pipe(messages, max_new_tokens=512)
+        counts = {}
+        start = time.perf_counter()
+        with self._counting_forwards(counts):
+            output = self.pipe(messages, **generate_kwargs)
+        elapsed = time.perf_counter() - start
         
         # 응답 텍스트 추출 (출력 형식에 맞게 수정)
         response_text = output[0]
         
+        if stats is not None:
+            self._record_stats(stats, self.parse_output([response_text]), elapsed, assisted, counts)
+        
+        # 중간에 멈춘(잘린) 응답은 명령으로 사용하지 않음
+        if deadline is not None:
+            deadline.check("LLM")
         return response_text
+    
+    def _build_messages(self, user_message):
+        """시스템 프롬프트 + 사용자 메시지로 된 한 번의 대화"""
+        return [
+            {
+                "role": "system",
+                "content": [{"type": "text", "text": self.system_prompt}]
+            },
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": user_message}]
+            }
+        ]
+    
+    def stream_chat(self, user_message, use_draft=True, deadline=None, stats=None):
+        """
+        응답을 생성되는 대로 텍스트 조각 단위로 돌려주는 제너레이터 (chat 과 같은 그리디 디코딩)
+        
+        생성은 작업 스레드에서 실행됩니다. 필요한 결과를 얻어 제너레이터를 닫으면(close, break)
+        다음 토큰에서 생성을 멈추므로 남은 토큰을 만드느라 시간을 쓰지 않습니다.
+        
+        Args:
+            user_message (str): 사용자 메시지
+            use_draft (bool): 드래프트 모델이 로드되어 있을 때 추측 디코딩 사용 여부
+            deadline (Deadline, optional): 처리 시간 예산
+            stats (dict, optional): 생성이 끝나거나 제너레이터를 닫을 때 이 호출의 생성 통계를 채울 dict
+            
+        Yields:
+            str: 새로 생성된 텍스트 조각
+            
+        Raises:
+            InferenceCancelled: 끝까지 생성하기 전에 deadline 이 취소되었거나 예산을 넘긴 경우 (DeadlineExceeded)
+        """
+        if deadline is not None:
+            deadline.check("LLM")
+        tokenizer = self.pipe.tokenizer
+        inputs = tokenizer.apply_chat_template(
+            self._build_messages(user_message), add_generation_prompt=True, tokenize=True,
+            return_dict=True, return_tensors="pt"
+        ).to(self.pipe.model.device)
+        
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        stop_event = threading.Event()
+        stopping_criteria = StoppingCriteriaList([EventStoppingCriteria(stop_event)])
+        if deadline is not None:
+            stopping_criteria.extend(deadline.stopping_criteria())
+        generate_kwargs = dict(inputs, streamer=streamer, max_new_tokens=512, do_sample=False,
+                               stopping_criteria=stopping_criteria)
+        assisted = use_draft and self.draft_model is not None
+        if assisted:
+            generate_kwargs["assistant_model"] = self.draft_model
+        
+        errors = []
+        counts = {}
+        
+        def generate():
+            if self.resource_plan is not None:
+                self.resource_plan.apply("llm")
+            with self._counting_forwards(counts):
+                try:
+                    self.pipe.model.generate(**generate_kwargs)
+                except Exception as e:
+                    errors.append(e)
+                    streamer.end()  # 소비하는 쪽이 다음 조각을 영원히 기다리지 않도록
+        
+        parts = []
+        first_token_sec = None
+        completed = False
+        start = time.perf_counter()
+        thread = threading.Thread(target=generate, daemon=True)
+        thread.start()
+        try:
+            for chunk in streamer:
+                if first_token_sec is None:
+                    first_token_sec = time.perf_counter() - start
+                parts.append(chunk)
+                yield chunk
+            completed = True
+        finally:
+            # 소비하는 쪽이 먼저 닫았으면 남은 생성 취소
+            stop_event.set()
+            thread.join()
+            if stats is not None:
+                self._record_stats(stats, "".join(parts), time.perf_counter() - start, assisted, counts,
+                                   first_token_sec=first_token_sec, stopped_early=not completed)
+        
+        if errors:
+            raise errors[0]
+        # 중간에 멈춘(잘린) 응답은 명령으로 사용하지 않음
+        if deadline is not None:
+            deadline.check("LLM")
+    
+    def _record_stats(self, stats, content, elapsed, assisted, counts, first_token_sec=None, stopped_early=False):
+        """
+        한 번의 생성의 속도와 드래프트 채택률을 stats 에 기록합니다.
+        
+        추측 디코딩에서 메인 모델의 forward 한 번은 드래프트 제안을 검증하고 토큰 하나를 직접 추가하므로,
+        채택된 드래프트 토큰 수 = 생성 토큰 수 - 메인 forward 수 입니다.
+        """
+        new_tokens = len(self.pipe.tokenizer(content, add_special_tokens=False)["input_ids"]) if isinstance(content, str) else 0
+        main_forwards = counts.get("main_forwards", 0)
+        draft_forwards = counts.get("draft_forwards", 0)
+        stats.update({
+            "assisted": assisted,
+            "new_tokens": new_tokens,
+            "sec": elapsed,
+            "tokens_per_sec": new_tokens / elapsed if elapsed > 0 else 0.0,
+            "main_forwards": main_forwards,
+            "draft_forwards": draft_forwards,
+            "acceptance_rate": None,
+            "first_token_sec": first_token_sec,
+            "stopped_early": stopped_early,
+        })
+        if assisted and draft_forwards:
+            accepted = max(0, new_tokens - main_forwards)
+            stats["acceptance_rate"] = min(1.0, accepted / draft_forwards)
+    
     def parse_output(self, output):
         """
         모델 출력에서 assistant의 content만 추출합니다.
@@ -0,0 +1,126 @@
+"""
+머신 프로파일로 추론 설정 선택
+
+gpu_check.py 가 벤치마크 후 <cache_dir>/machine_profile.json 에 저장한 추천 설정을 읽어
+STT/LLM 로더가 쓸 디바이스, dtype, 스레드 수, 양자화 방식을 정합니다.
+
+    python gpu_check.py --cache_dir ./model_cache
+
+프로파일이 없거나 다른 환경(torch 버전, GPU 구성)에서 만들어졌으면 기존 기본값을 사용합니다.
+    STT: cuda:0 float16 / cpu float32,  LLM: bfloat16
+"""
+
+import os
+import json
+
+import torch
+
+MACHINE_PROFILE_FILE = "machine_profile.json"
+
+DTYPES = {"float32": torch.float32, "float16": torch.float16, "bfloat16": torch.bfloat16}
+
+_DEFAULT_DTYPES = {
+    "stt": {"cuda": torch.float16, "cpu": torch.float32},
+    "llm": {"cuda": torch.bfloat16, "cpu": torch.bfloat16},
+}
+
+
+class InferenceConfig:
+    """로더에 적용할 추론 설정"""
+
+    def __init__(self, device, torch_dtype, threads=None, quantization=None, source="default"):
+        """
+        Args:
+            device (str): "cuda:0", "cpu" 등
+            torch_dtype (torch.dtype): 가중치 dtype
+            threads (int, optional): torch CPU 스레드 수 (None 이면 변경하지 않음)
+            quantization (str, optional): "dynamic_int8" 또는 None
+            source (str): "profile" (머신 프로파일) 또는 "default" (기본값)
+        """
+        self.device = device
+        self.torch_dtype = torch_dtype
+        self.threads = threads
+        self.quantization = quantization
+        self.source = source
+
+    def __repr__(self):
+        dtype = str(self.torch_dtype).replace("torch.", "")
+        return (f"{self.device} {dtype}, 스레드 {self.threads or '기본'}, "
+                f"양자화 {self.quantization or '없음'} ({self.source})")
+
+
+def load_machine_profile(cache_dir):
+    """
+    <cache_dir>/machine_profile.json 읽기
+
+    Returns:
+        dict or None: 현재 환경에서 만든 프로파일 (없거나 환경이 다르면 None)
+    """
+    path = os.path.join(cache_dir, MACHINE_PROFILE_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # 다른 torch 버전이나 GPU 구성에서 측정한 결과는 맞지 않을 수 있음
+    gpu_names = [torch.cuda.get_device_name(i) for i in range(torch.cuda.device_count())] \
+        if torch.cuda.is_available() else []
+    if profile.get("torch_version") != torch.__version__ \
+            or [gpu.get("name") for gpu in profile.get("gpus", [])] != gpu_names:
+        print(f"머신 프로파일이 현재 환경과 다릅니다. 기본 설정을 사용합니다. (gpu_check.py 로 다시 생성하세요: {path})")
+        return None
+    return profile
+
+
+def select_inference_config(cache_dir, component, device=None):
+    """
+    구성 요소("stt" 또는 "llm")의 추론 설정 선택
+
+    Args:
+        cache_dir (str): 모델 캐시 디렉토리 (machine_profile.json 위치)
+        component (str): "stt" 또는 "llm"
+        device (str, optional): 사용자가 지정한 디바이스 (프로파일과 다르면 해당 디바이스의 기본 dtype 사용)
+
+    Returns:
+        InferenceConfig: 추론 설정
+    """
+    profile = load_machine_profile(cache_dir)
+    recommended = (profile or {}).get("recommended", {}).get(component)
+    if recommended and recommended.get("torch_dtype") in DTYPES \
+            and (device is None or device.split(":")[0] == recommended["device"].split(":")[0]):
+        return InferenceConfig(
+            device or recommended["device"],
+            DTYPES[recommended["torch_dtype"]],
+            recommended.get("threads"),
+            recommended.get("quantization"),
+            source="profile",
+        )
+
+    if device is None:
+        device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    device_type = "cuda" if device.startswith("cuda") else "cpu"
+    return InferenceConfig(device, _DEFAULT_DTYPES[component][device_type])
+
+
+def apply_threads(config):
+    """설정의 스레드 수를 torch 에 적용"""
+    if config.threads and torch.get_num_threads() != config.threads:
+        torch.set_num_threads(config.threads)
+
+
+def quantize_model(model, config):
+    """
+    설정에 양자화가 지정되어 있으면 모델의 Linear 층을 int8 동적 양자화 (CPU float32 모델만 해당)
+
+    Returns:
+        nn.Module: 양자화된 모델 (대상이 아니면 그대로)
+    """
+    if config.quantization != "dynamic_int8":
+        return model
+    if config.device != "cpu" or config.torch_dtype != torch.float32:
+        print(f"int8 동적 양자화는 CPU float32 모델에만 적용됩니다. ({config})")
+        return model
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
@@ -0,0 +1,94 @@
+"""
+다단계 미션 실행기
+
+parse_mission 으로 얻은 단계를 순서대로 보내고, 각 단계가 끝날 때까지(비행 상태 텔레메트리 또는 타이머)
+기다린 뒤 다음 단계를 보냅니다. 대기는 모두 Event.wait 로 하므로 abort() 하면 즉시 멈춥니다.
+abort() 는 전송 중인 단계(호버링 등 최대 약 1초 블록)를 기다리지 않고 바로 반환하므로, 정지 명령은 미션과 관계없이 즉시 전송됩니다.
+중단 확인은 abort() 와 같은 잠금 안에서 하므로, abort() 가 반환된 뒤에는 새 미션 단계가 시작되지 않습니다.
+"""
+
+import threading
+import time
+
+
+class MissionRunner:
+    """백그라운드 스레드에서 미션 단계를 순서대로 실행"""
+
+    def __init__(self, execute, log, get_flight_state=None, poll_sec=0.1, resource_plan=None):
+        """
+        Args:
+            execute (callable): 단일 명령 실행 함수 (execute(command))
+            log (callable): 로그 함수
+            get_flight_state (callable): 현재 비행 상태 이름(소문자) 또는 None 을 반환하는 함수
+            poll_sec (float): 텔레메트리 확인 주기 (초)
+            resource_plan (ResourcePlan, optional): 실행 스레드에 "io" 자원을 적용할 계획
+        """
+        self.execute = execute
+        self.log = log
+        self.get_flight_state = get_flight_state
+        self.poll_sec = poll_sec
+        self.resource_plan = resource_plan
+        self._thread = None
+        self._abort = threading.Event()
+        self._lock = threading.Lock()
+        self._abort_lock = threading.Lock()  # 중단 확인 / abort() 를 직렬화 (단계 전송 중에는 잡지 않음)
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, steps):
+        """진행 중인 미션을 중단하고 새 미션 시작"""
+        with self._lock:
+            self.abort()
+            self._abort = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(steps, self._abort), daemon=True)
+            self._thread.start()
+
+    def abort(self):
+        """진행 중인 미션 중단 (전송 중인 단계를 기다리지 않고 바로 반환, 이후 단계는 보내지 않음)"""
+        with self._abort_lock:
+            if self._abort.is_set():
+                return
+            self._abort.set()
+            if self.is_running:
+                self.log("미션 중단")
+
+    def _run(self, steps, abort):
+        if self.resource_plan is not None:
+            self.resource_plan.apply("io")
+        start = time.perf_counter()
+        self.log(f"미션 시작: {len(steps)}단계 ({'; '.join(s.command for s in steps)})")
+        for i, step in enumerate(steps, 1):
+            with self._abort_lock:
+                if abort.is_set():
+                    return
+            if not step.is_wait:
+                self.log(f"미션 단계 {i}/{len(steps)}: {step.command}")
+                self.execute(step.command)
+            if not self._wait_step(step, abort):
+                return
+        self.log(f"미션 완료: {len(steps)}단계, {time.perf_counter() - start:.1f}초")
+
+    def _wait_step(self, step, abort):
+        """단계 완료까지 대기 (중단되면 False)"""
+        if step.wait_states and self.get_flight_state is not None:
+            deadline = time.monotonic() + step.timeout
+            while time.monotonic() < deadline:
+                state = self._flight_state()
+                if state is None:
+                    break  # 텔레메트리를 받을 수 없으면 타이머로 대체
+                if state in step.wait_states:
+                    return not abort.is_set()
+                if abort.wait(self.poll_sec):
+                    return False
+            else:
+                self.log(f"미션 단계 시간 초과: {step.command} (상태 {self._flight_state()})")
+                return not abort.is_set()
+        return not abort.wait(step.duration)
+
+    def _flight_state(self):
+        try:
+            return self.get_flight_state()
+        except Exception:
+            return None
@@ -0,0 +1,54 @@
+"""
+사전 변환(export)된 모델 아티팩트 조회
+
+hf_model_downloader.py --export 로 생성한 <cache_dir>/exported/<model>/<device>-<dtype>/ 디렉토리를 찾습니다.
+이 디렉토리의 safetensors 는 이미 대상 dtype 으로 저장되어 있어서, 로딩 시 dtype 변환 없이 바로 memory-map 됩니다.
+"""
+
+import os
+import json
+
+EXPORT_DIR_NAME = "exported"
+EXPORT_INFO_FILE = "export_info.json"
+
+
+def profile_name(device, torch_dtype):
+    """
+    디바이스와 dtype 으로 프로파일 이름 생성
+
+    Args:
+        device (str): "cpu", "cuda", "cuda:0" 등
+        torch_dtype (torch.dtype or str): torch.float16, "bfloat16" 등
+
+    Returns:
+        str: "cuda-float16" 형식의 프로파일 이름
+    """
+    device_type = str(device).split(":")[0]
+    dtype_name = str(torch_dtype).replace("torch.", "")
+    return f"{device_type}-{dtype_name}"
+
+
+def exported_model_dir(cache_dir, model_id, profile):
+    """프로파일별 export 디렉토리 경로 (hf_model_downloader.py --export 도 이 함수로 저장 위치를 정함)"""
+    return os.path.join(cache_dir, EXPORT_DIR_NAME, model_id.replace("/", "--"), profile)
+
+
+def find_exported_model(cache_dir, model_id, device, torch_dtype):
+    """
+    현재 디바이스/dtype 에 맞는 export 디렉토리 검색
+
+    Returns:
+        str or None: export 디렉토리 경로 (없거나 불완전하면 None)
+    """
+    export_dir = exported_model_dir(cache_dir, model_id, profile_name(device, torch_dtype))
+    info_path = os.path.join(export_dir, EXPORT_INFO_FILE)
+    if not os.path.exists(info_path):
+        return None
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if info.get("model_id") != model_id:
+        return None
+    return export_dir
@@ -0,0 +1,334 @@
+"""
+모델 관리자 (백그라운드 교체, 메모리 예산, 유휴 해제)
+
+STT/LLM 을 슬롯("stt", "llm")에 올려 두고 발화 처리 중에는 use() 로 빌려 씁니다.
+
+    - 교체: load() 가 새 모델을 백그라운드에서 읽은 뒤, 해당 슬롯을 쓰는 발화가 끝나기를 기다렸다가
+      슬롯을 새 모델로 바꾸고 이전 모델의 메모리를 해제합니다 (keep_previous 면 대기 모델로 남김).
+    - 메모리 예산: 올라간 모델들의 가중치 크기 합이 memory_budget_gb 를 넘으면 가장 오래 쓰지 않은
+      모델부터 내립니다. 슬롯에 연결된 모델이 내려가면 다음에 사용할 때 다시 읽습니다.
+    - 유휴 해제: idle_timeout_sec 동안 쓰지 않은 모델은 내립니다 (노트북에서 메모리 회수).
+
+모델을 내릴 때는 참조를 끊고 gc, CUDA 캐시 비우기, (Linux) malloc_trim 으로 메모리를 운영체제에 돌려줍니다.
+"""
+
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+
+def model_memory_bytes(model):
+    """
+    SpeechToText / LLMChat 의 torch 모듈(model, draft_model) 가중치와 버퍼 크기 합
+
+    Returns:
+        int: 바이트 수 (알 수 없으면 0)
+    """
+    total = 0
+    for name in ("model", "draft_model"):
+        module = getattr(model, name, None)
+        if module is None or not hasattr(module, "parameters"):
+            continue
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def release_memory():
+    """해제된 모델의 메모리를 실제로 돌려줌"""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+    try:
+        # glibc 는 해제된 힙을 바로 돌려주지 않으므로 명시적으로 반환
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class ModelEntry:
+    """관리 중인 모델 하나"""
+
+    def __init__(self, key, loader):
+        """
+        Args:
+            key (str): 모델 식별자 (모델 이름과 로딩 설정)
+            loader (callable): loader() -> 모델 객체
+        """
+        self.key = key
+        self.loader = loader
+        self.model = None
+        self.size_bytes = 0
+        self.load_sec = 0.0
+        self.last_used = 0.0
+        self.busy = 0  # 사용 중인 발화 수
+        self.load_lock = threading.Lock()  # 같은 모델을 두 스레드가 동시에 읽지 않도록
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+
+class ModelManager:
+    """슬롯별 활성 모델과 대기 모델을 관리"""
+
+    def __init__(self, log=print, memory_budget_gb=None, idle_timeout_sec=None, keep_previous=False,
+                 check_interval_sec=5.0):
+        """
+        Args:
+            log (callable): 로그 함수
+            memory_budget_gb (float, optional): 올려 둘 모델 가중치 총량 (None 이면 제한 없음)
+            idle_timeout_sec (float, optional): 이 시간 동안 쓰지 않은 모델은 내림 (None 이면 내리지 않음)
+            keep_previous (bool): 교체된 이전 모델을 대기 모델로 남길지 여부 (A/B 전환을 빠르게, 예산 안에서만)
+            check_interval_sec (float): 유휴 검사 주기
+        """
+        self.log = log
+        self.memory_budget_gb = memory_budget_gb
+        self.idle_timeout_sec = idle_timeout_sec
+        self.keep_previous = keep_previous
+        self.check_interval_sec = check_interval_sec
+
+        self.entries = {}  # {키: ModelEntry}
+        self.slots = {}    # {슬롯: 키}
+        self.loading = {}  # {슬롯: 로딩 중인 키}
+        self.swap_count = 0
+
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def has(self, slot):
+        """슬롯에 모델이 지정되어 있는지 (유휴 해제되어 내려가 있어도 True)"""
+        with self._cond:
+            return slot in self.slots
+
+    def get(self, slot):
+        """슬롯의 현재 모델 (지정되지 않았거나 내려가 있으면 None)"""
+        with self._cond:
+            key = self.slots.get(slot)
+            return self.entries[key].model if key is not None else None
+
+    def active_key(self, slot):
+        with self._cond:
+            return self.slots.get(slot)
+
+    def load(self, slot, key, loader, on_done=None):
+        """
+        백그라운드에서 모델을 읽고 슬롯을 교체
+
+        Args:
+            slot (str): "stt" 또는 "llm"
+            key (str): 모델 식별자 (같은 키의 대기 모델이 있으면 다시 읽지 않음)
+            loader (callable): loader() -> 모델 객체
+            on_done (callable, optional): on_done(model, error) - 작업 스레드에서 호출 (성공 시 error 는 None)
+        """
+        with self._cond:
+            if self.loading.get(slot) is not None:
+                raise RuntimeError(f"{slot} 모델을 이미 로딩 중입니다: {self.loading[slot]}")
+            self.loading[slot] = key
+
+        def run():
+            model, error = None, None
+            try:
+                model = self._swap(slot, key, loader)
+            except Exception as e:
+                error = e
+                self.log(f"{slot} 모델 로딩 실패 ({key}): {e}")
+            finally:
+                with self._cond:
+                    self.loading.pop(slot, None)
+            if on_done is not None:
+                on_done(model, error)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    @contextmanager
+    def use(self, *slots):
+        """
+        발화 처리 동안 슬롯의 모델을 빌림 (이 동안에는 교체/해제되지 않음, 내려가 있으면 다시 읽음)
+
+        Yields:
+            tuple: 슬롯 순서대로의 모델
+        """
+        with self._cond:
+            entries = []
+            for slot in slots:
+                if slot not in self.slots:
+                    raise RuntimeError(f"{slot} 모델이 로딩되지 않았습니다.")
+                entry = self.entries[self.slots[slot]]
+                entry.busy += 1
+                entries.append(entry)
+        try:
+            for entry in entries:
+                self._ensure_loaded(entry)
+            yield tuple(entry.model for entry in entries)
+        finally:
+            with self._cond:
+                now = time.monotonic()
+                for entry in entries:
+                    entry.busy -= 1
+                    entry.last_used = now
+                self._cond.notify_all()
+
+    def unload(self, key):
+        """모델을 내림 (슬롯에 연결되어 있으면 다음 사용 때 다시 읽음)"""
+        with self._cond:
+            entry = self.entries.get(key)
+            if entry is None or not entry.loaded or entry.busy:
+                return False
+            model, entry.model = entry.model, None
+        del model
+        release_memory()
+        return True
+
+    def describe(self):
+        """관리 중인 모델 요약"""
+        with self._cond:
+            active = {key: slot for slot, key in self.slots.items()}
+            parts = []
+            for entry in sorted(self.entries.values(), key=lambda e: -e.last_used):
+                state = f"{active[entry.key]} 사용" if entry.key in active else "대기"
+                size = f"{entry.size_bytes / 2 ** 30:.2f}GB" if entry.loaded else "내려감"
+                parts.append(f"{entry.key} ({state}, {size})")
+            budget = f"{self.memory_budget_gb:g}GB" if self.memory_budget_gb else "제한 없음"
+            return f"모델 {self._resident_bytes() / 2 ** 30:.2f}GB / 예산 {budget}: " + ", ".join(parts)
+
+    def close(self):
+        """관리 스레드 종료 후 모든 모델 해제"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            entries = list(self.entries.values())
+            self.entries.clear()
+            self.slots.clear()
+        self._thread.join()
+        for entry in entries:
+            entry.model = None
+        release_memory()
+
+    def _swap(self, slot, key, loader):
+        with self._cond:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = ModelEntry(key, loader)
+            entry.loader = loader
+            # 로딩 중에 예산 정리로 내려가지 않도록 사용 중으로 표시
+            entry.busy += 1
+        try:
+            if entry.loaded:
+                self.log(f"대기 중인 모델로 전환: {key}")
+            with entry.load_lock:
+                if not entry.loaded:
+                    self._load_entry(entry, replacing=self.active_key(slot))
+
+            # 진행 중인 발화가 끝난 뒤 교체 (발화 사이)
+            with self._cond:
+                previous_key = self.slots.get(slot)
+                previous = self.entries.get(previous_key) if previous_key != key else None
+                while previous is not None and previous.busy:
+                    self._cond.wait()
+                self.slots[slot] = key
+                self.swap_count += 1
+                entry.last_used = time.monotonic()
+                model = entry.model
+        finally:
+            with self._cond:
+                entry.busy -= 1
+                self._cond.notify_all()
+
+        if previous is not None:
+            self.log(f"{slot} 모델 교체: {previous_key} -> {key}")
+            if not self.keep_previous:
+                self._drop(previous_key)
+            else:
+                self._enforce_budget()
+        return model
+
+    def _ensure_loaded(self, entry):
+        """내려가 있는 모델을 다시 읽음 (use() 에서 사용 중으로 표시한 뒤 호출)"""
+        with entry.load_lock:
+            if not entry.loaded:
+                self.log(f"내려가 있던 모델을 다시 로딩합니다: {entry.key}")
+                self._load_entry(entry)
+
+    def _load_entry(self, entry, replacing=None):
+        """
+        모델 읽기 (크기를 이미 알고 예산을 넘길 것 같으면 먼저 다른 모델을 내림)
+
+        Args:
+            entry (ModelEntry): 읽을 모델
+            replacing (str, optional): 이 모델로 교체될 활성 모델 키 (대기 모델처럼 먼저 내릴 후보로 취급)
+        """
+        if entry.size_bytes:
+            self._enforce_budget(incoming_bytes=entry.size_bytes, replacing=replacing)
+        start = time.perf_counter()
+        model = entry.loader()
+        with self._cond:
+            entry.model = model
+            entry.size_bytes = model_memory_bytes(model)
+            entry.load_sec = time.perf_counter() - start
+            entry.last_used = time.monotonic()
+        self.log(f"모델 로딩 완료: {entry.key} ({entry.size_bytes / 2 ** 30:.2f}GB, {entry.load_sec:.1f}초)")
+        self._enforce_budget()
+
+    def _drop(self, key):
+        """슬롯에서 빠진 모델을 목록에서 지우고 메모리 해제"""
+        with self._cond:
+            entry = self.entries.get(key)
+            if entry is None or key in self.slots.values() or entry.busy:
+                return
+            del self.entries[key]
+            model, entry.model = entry.model, None
+        del model
+        release_memory()
+        self.log(f"이전 모델 메모리 해제: {key}")
+
+    def _resident_bytes(self):
+        return sum(entry.size_bytes for entry in self.entries.values() if entry.loaded)
+
+    def _enforce_budget(self, incoming_bytes=0, replacing=None):
+        """예산을 넘으면 사용 중이 아닌 모델을 내림 (대기 모델 먼저, 그 안에서는 오래 쓰지 않은 순서)"""
+        if not self.memory_budget_gb:
+            return
+        budget = self.memory_budget_gb * 2 ** 30
+        while True:
+            with self._cond:
+                if self._resident_bytes() + incoming_bytes <= budget:
+                    return
+                candidates = [e for e in self.entries.values() if e.loaded and not e.busy]
+                if not candidates:
+                    self.log(f"메모리 예산 초과: 내릴 수 있는 모델이 없습니다 "
+                             f"({(self._resident_bytes() + incoming_bytes) / 2 ** 30:.2f}GB > {self.memory_budget_gb:g}GB)")
+                    return
+                active = set(self.slots.values()) - {replacing}
+                victim = min(candidates, key=lambda e: (e.key in active, e.last_used))
+            if self.unload(victim.key):
+                self.log(f"메모리 예산 초과로 모델을 내림: {victim.key}")
+
+    def _run(self):
+        """유휴 모델 해제"""
+        while True:
+            with self._cond:
+                self._cond.wait(self.check_interval_sec)
+                if self._stopped:
+                    return
+                if not self.idle_timeout_sec:
+                    continue
+                now = time.monotonic()
+                idle = [e.key for e in self.entries.values()
+                        if e.loaded and not e.busy and now - e.last_used > self.idle_timeout_sec]
+            for key in idle:
+                if self.unload(key):
+                    self.log(f"{self.idle_timeout_sec:g}초 동안 쓰지 않은 모델을 내림: {key}")
+            # 슬롯에 연결되지 않은 대기 모델은 목록에서도 지움
+            with self._cond:
+                for key in [k for k, e in self.entries.items() if not e.loaded and k not in self.slots.values()
+                            and not e.busy]:
+                    del self.entries[key]
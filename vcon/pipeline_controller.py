@@ -0,0 +1,145 @@
+"""
+단일 처리(single-flight) 음성 명령 파이프라인
+
+발화는 하나의 작업 스레드에서 한 번에 하나씩 처리합니다. 새 발화가 들어오거나 긴급 명령이 오면
+진행 중인 STT/LLM 을 취소하고(세대 번호 증가 + 취소 이벤트) 새 작업이 바로 다음 차례가 됩니다.
+명령은 세대 번호가 최신일 때만 전송하므로, 오래된 명령이 새 명령보다 늦게 드론에 도달하지 않습니다.
+"""
+
+import threading
+import time
+
+from deadline import InferenceCancelled
+
+
+class PipelineController:
+    """발화 처리 작업을 하나씩 실행하고, 최신 세대의 명령만 전송하는 컨트롤러"""
+
+    def __init__(self, infer, dispatch, log, on_done=None, on_dispatched=None):
+        """
+        Args:
+            infer (callable): infer(audio, cancel_event, generation) -> 명령 문자열 또는 None (취소 시 InferenceCancelled)
+            dispatch (callable): dispatch(command) 드론 명령 전송
+            log (callable): 로그 함수
+            on_done (callable, optional): 작업이 끝날 때마다 (작업 스레드에서) 호출
+            on_dispatched (callable, optional): on_dispatched(generation, command) 명령 전송 직후 호출
+        """
+        self.infer = infer
+        self.dispatch = dispatch
+        self.log = log
+        self.on_done = on_done
+        self.on_dispatched = on_dispatched
+
+        self._cond = threading.Condition()
+        self._dispatch_lock = threading.Lock()
+        self._generation = 0
+        self._pending = None   # (세대, 오디오) - 대기 중인 작업은 항상 최신 하나뿐
+        self._current = None   # (세대, 취소 이벤트)
+        self._abort_time = None
+        self._stopped = False
+
+        # 통계
+        self.preemptions = 0
+        self.stale_drops = 0
+        self.abort_to_dispatch = []  # 선점 시각부터 새 명령 전송까지 (초)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._current is not None or self._pending is not None
+
+    def preempt(self, reason="새 발화"):
+        """
+        진행 중/대기 중인 작업을 취소하고 세대 번호를 올림
+
+        Returns:
+            int: 새 세대 번호
+        """
+        with self._cond:
+            self._generation += 1
+            if self._current is not None or self._pending is not None:
+                self.preemptions += 1
+                if self._abort_time is None:
+                    self._abort_time = time.perf_counter()
+                if self._current is not None:
+                    self._current[1].set()
+                self._pending = None
+                self.log(f"처리 중인 명령 취소 ({reason})")
+            return self._generation
+
+    def submit(self, audio):
+        """새 발화 제출 (진행 중인 작업은 취소되고 이 발화가 다음 차례가 됨)"""
+        generation = self.preempt()
+        with self._cond:
+            if generation == self._generation:
+                self._pending = (generation, audio)
+                self._cond.notify()
+        return generation
+
+    def dispatch_urgent(self, command):
+        """진행 중인 처리를 모두 취소하고 명령을 즉시 전송 (예: "정지")"""
+        generation = self.preempt("긴급 명령")
+        return self.dispatch_if_current(generation, command)
+
+    def dispatch_if_current(self, generation, command):
+        """
+        세대 번호가 최신일 때만 명령 전송
+
+        Returns:
+            bool: 전송 여부
+        """
+        with self._dispatch_lock:
+            if generation != self._generation:
+                self.stale_drops += 1
+                self.log(f"이전 발화의 명령 폐기: {command}")
+                return False
+            self.dispatch(command)
+            if self.on_dispatched is not None:
+                self.on_dispatched(generation, command)
+            with self._cond:
+                abort_time, self._abort_time = self._abort_time, None
+            if abort_time is not None:
+                latency = time.perf_counter() - abort_time
+                self.abort_to_dispatch.append(latency)
+                self.log(f"선점 후 명령 전송까지 {latency * 1000:.0f}ms "
+                         f"(평균 {sum(self.abort_to_dispatch) / len(self.abort_to_dispatch) * 1000:.0f}ms, "
+                         f"{len(self.abort_to_dispatch)}회)")
+            return True
+
+    def stop(self):
+        """작업 스레드 종료 (진행 중인 작업은 취소)"""
+        self.preempt("종료")
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                generation, audio = self._pending
+                self._pending = None
+                cancel_event = threading.Event()
+                self._current = (generation, cancel_event)
+
+            command = None
+            try:
+                command = self.infer(audio, cancel_event, generation)
+            except InferenceCancelled:
+                self.log("이전 발화 처리가 취소되었습니다.")
+            except Exception as e:
+                self.log(f"음성 처리 오류: {str(e)}")
+            finally:
+                with self._cond:
+                    self._current = None
+
+            if command is not None:
+                self.dispatch_if_current(generation, command)
+            if self.on_done is not None:
+                self.on_done()
@@ -0,0 +1,114 @@
+"""
+시리얼 포트 감시 (핫플러그 감지)
+
+serial.tools.list_ports.comports() 는 가상 COM 포트가 많은 PC 에서 오래 걸리므로 Tk 스레드에서 부르지 않고
+백그라운드 스레드에서 주기적으로 조회합니다. 이전 조회와 비교해 추가/제거된 포트가 있을 때(또는 즉시 조회를
+요청했을 때)만 콜백으로 알리며, 콜백은 감시 스레드에서 호출되므로 UI 갱신은 after() 로 넘겨야 합니다.
+"""
+
+import threading
+import time
+
+import serial.tools.list_ports
+
+# CodingDrone 조종기/드론의 USB VCP (STMicroelectronics Virtual COM Port)
+DRONE_USB_IDS = ((0x0483, 0x5740),)
+
+
+class PortInfo:
+    """조회된 시리얼 포트 정보"""
+
+    def __init__(self, device, description="", vid=None, pid=None, serial_number=None):
+        self.device = device
+        self.description = description
+        self.vid = vid
+        self.pid = pid
+        self.serial_number = serial_number
+
+    @classmethod
+    def from_list_port(cls, port):
+        return cls(port.device, port.description or "", port.vid, port.pid, port.serial_number)
+
+    @property
+    def is_drone(self):
+        """CodingDrone 의 USB VID/PID 와 일치하는지 여부"""
+        return (self.vid, self.pid) in DRONE_USB_IDS
+
+    def __eq__(self, other):
+        return isinstance(other, PortInfo) and (self.device, self.vid, self.pid, self.serial_number) == \
+            (other.device, other.vid, other.pid, other.serial_number)
+
+    def __hash__(self):
+        return hash((self.device, self.vid, self.pid, self.serial_number))
+
+    def __repr__(self):
+        ids = f" [{self.vid:04X}:{self.pid:04X}]" if self.vid is not None and self.pid is not None else ""
+        return f"{self.device} ({self.description}){ids}"
+
+
+class PortWatcher:
+    """백그라운드에서 포트 목록을 조회하고 변경분을 알리는 감시기"""
+
+    def __init__(self, on_change, interval_sec=1.0, resource_plan=None):
+        """
+        Args:
+            on_change (callable): on_change(ports, arrived, removed) - ports 는 {장치 이름: PortInfo},
+                arrived/removed 는 PortInfo 목록 (감시 스레드에서 호출)
+            interval_sec (float): 조회 주기 (초)
+            resource_plan (ResourcePlan, optional): 감시 스레드에 "io" 자원을 적용할 계획
+        """
+        self.on_change = on_change
+        self.interval_sec = interval_sec
+        self.resource_plan = resource_plan
+        self.ports = {}
+        self.scan_count = 0
+        self.last_scan_sec = 0.0
+
+        self._wake = threading.Event()
+        self._forced = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def scan_now(self):
+        """다음 주기를 기다리지 않고 바로 조회 (변경이 없어도 콜백 호출)"""
+        self._forced = True
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=self.interval_sec + 5)
+
+    def _scan(self):
+        start = time.perf_counter()
+        ports = {}
+        for port in serial.tools.list_ports.comports():
+            info = PortInfo.from_list_port(port)
+            ports[info.device] = info
+        self.last_scan_sec = time.perf_counter() - start
+        self.scan_count += 1
+        return ports
+
+    def _run(self):
+        if self.resource_plan is not None:
+            self.resource_plan.apply("io")
+        # 첫 조회 결과는 항상 알림
+        self._forced = True
+        while not self._stopped:
+            forced, self._forced = self._forced, False
+            try:
+                ports = self._scan()
+            except Exception as e:
+                print(f"포트 조회 오류: {e}")
+                ports = self.ports
+            arrived = [info for device, info in ports.items() if self.ports.get(device) != info]
+            removed = [info for device, info in self.ports.items() if ports.get(device) != info]
+            self.ports = ports
+            if arrived or removed or forced:
+                try:
+                    self.on_change(dict(ports), arrived, removed)
+                except Exception as e:
+                    print(f"포트 변경 처리 오류: {e}")
+            self._wake.wait(self.interval_sec)
+            self._wake.clear()
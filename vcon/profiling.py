@@ -0,0 +1,157 @@
+"""
+선택적 단계별 프로파일링
+
+설정의 profile_dir 또는 환경변수 VCON_PROFILE_DIR 이 지정된 경우에만 켜집니다.
+켜지면 지정한 객체의 메서드(transcribe, chat, execute_drone_command 등)를 인스턴스 단위로 감싸서
+호출마다 샘플링 프로파일(pyinstrument 가 있으면 speedscope JSON, 없으면 cProfile .prof)과
+torch 프로파일러의 연산자별 표(.ops.txt)를 발화 번호별 파일로 남깁니다.
+
+꺼져 있으면 아무것도 감싸지 않으므로 실행 경로에 추가 비용이 없습니다.
+
+    VCON_PROFILE_DIR=profiles python app.py
+    speedscope profiles/utt0003-llm-1.speedscope.json
+"""
+
+import contextlib
+import cProfile
+import functools
+import os
+import threading
+import time
+
+PROFILE_ENV = "VCON_PROFILE_DIR"
+
+
+def create_profiler(profile_dir="", torch_ops=True):
+    """
+    환경변수 또는 설정에 프로파일 디렉토리가 있으면 StageProfiler 생성
+
+    Returns:
+        StageProfiler or None: 꺼져 있으면 None
+    """
+    profile_dir = os.environ.get(PROFILE_ENV) or profile_dir
+    if not profile_dir:
+        return None
+    return StageProfiler(profile_dir, torch_ops=torch_ops)
+
+
+class StageProfiler:
+    """단계(stage) 단위로 호출을 프로파일링하여 파일로 저장"""
+
+    def __init__(self, output_dir, torch_ops=True, interval=0.001):
+        """
+        Args:
+            output_dir (str): 결과 디렉토리
+            torch_ops (bool): torch 프로파일러로 연산자별 표도 저장할지 여부
+            interval (float): 샘플링 간격 (초, pyinstrument 사용 시)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.torch_ops = torch_ops
+        self.interval = interval
+        self._local = threading.local()
+        self._torch_lock = threading.Lock()  # torch 프로파일러는 동시에 하나만
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+        try:
+            import pyinstrument  # noqa: F401
+            self.sampler = "pyinstrument"
+        except ImportError:
+            self.sampler = "cProfile"
+
+    def wrap(self, obj, method_name, stage, torch_ops=None):
+        """
+        객체의 메서드를 인스턴스 속성으로 감싸서 호출마다 프로파일링
+
+        Args:
+            obj: 대상 객체
+            method_name (str): 메서드 이름
+            stage (str): 파일 이름에 쓸 단계 이름
+            torch_ops (bool, optional): 이 단계에서 torch 연산자 표를 남길지 (None 이면 기본값)
+        """
+        method = getattr(obj, method_name)
+        if getattr(method, "_vcon_profiled", False):
+            return
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            return self.call(stage, method, *args, torch_ops=torch_ops, **kwargs)
+
+        wrapper._vcon_profiled = True
+        setattr(obj, method_name, wrapper)
+
+    @contextlib.contextmanager
+    def utterance(self, utterance_id):
+        """이 블록 안(같은 스레드)의 프로파일 파일 이름에 발화 번호를 붙임"""
+        previous = getattr(self._local, "label", None)
+        self._local.label = f"utt{utterance_id:04d}"
+        try:
+            yield
+        finally:
+            self._local.label = previous
+
+    def call(self, stage, fn, *args, torch_ops=None, **kwargs):
+        """fn(*args, **kwargs) 를 프로파일링하며 실행 (같은 스레드에서 중첩되면 바깥 프로파일에 포함)"""
+        if getattr(self._local, "active", False):
+            return fn(*args, **kwargs)
+
+        self._local.active = True
+        try:
+            base = self._output_base(stage)
+            use_torch = self.torch_ops if torch_ops is None else torch_ops
+            with self._sampling(base), self._torch_profile(base, use_torch):
+                return fn(*args, **kwargs)
+        finally:
+            self._local.active = False
+
+    def _output_base(self, stage):
+        with self._counter_lock:
+            self._counter += 1
+            counter = self._counter
+        label = getattr(self._local, "label", None) or time.strftime("%H%M%S")
+        return os.path.join(self.output_dir, f"{label}-{stage}-{counter}")
+
+    @contextlib.contextmanager
+    def _sampling(self, base):
+        """샘플링 프로파일 (pyinstrument -> speedscope, 없으면 cProfile)"""
+        if self.sampler == "pyinstrument":
+            from pyinstrument import Profiler
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            profiler = Profiler(interval=self.interval)
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(base + ".speedscope.json", "w", encoding="utf-8") as f:
+                    f.write(profiler.output(renderer=SpeedscopeRenderer()))
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(base + ".prof")
+
+    @contextlib.contextmanager
+    def _torch_profile(self, base, enabled):
+        """torch 연산자별 시간 표 (다른 스레드가 사용 중이면 건너뜀)"""
+        if not enabled or not self._torch_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            import torch
+            from torch.profiler import ProfilerActivity, profile
+
+            cuda = torch.cuda.is_available()
+            activities = [ProfilerActivity.CPU] + ([ProfilerActivity.CUDA] if cuda else [])
+            with profile(activities=activities) as prof:
+                yield
+            sort_by = "self_cuda_time_total" if cuda else "self_cpu_time_total"
+            with open(base + ".ops.txt", "w", encoding="utf-8") as f:
+                f.write(prof.key_averages().table(sort_by=sort_by, row_limit=40))
+        finally:
+            self._torch_lock.release()
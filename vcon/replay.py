@@ -0,0 +1,324 @@
+"""
+비행 기록 세션 리플레이
+
+기록된 세션(.vfr)의 발화 오디오를 현재의 SpeechToText -> LLMChat -> DroneControlManager 로 다시 실행하고,
+새 명령 스트림을 원래 명령과 비교하며 단계별 지연 변화를 보고합니다. 드론은 시뮬레이터로 대체합니다.
+
+    --fast      발화를 순서대로 최대한 빠르게 실행 (원래 세션에서 취소된 발화는 건너뜀)
+    --realtime  원래 시각에 맞춰 파이프라인에 제출 (선점/취소도 원래처럼 재현됨)
+
+모델이나 프롬프트 변경의 회귀/성능 검사로 쓸 수 있도록 종료 코드를 반환합니다.
+    0: 모든 명령 일치 및 지연 기준 통과, 1: 명령 불일치, 2: 지연 회귀
+
+사용법:
+    python replay.py flight_logs/20250401-101500.vfr --fast --prompt_file prompt_mission.txt --output replay.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from flight_recorder import FlightLog
+
+STAGES = ("trim", "stt", "classifier", "llm", "total")
+
+
+class SimulatedDrone:
+    """CodingDrone.Drone 의 명령 메서드를 흉내내어 호출을 기록하는 시뮬레이터"""
+
+    def __init__(self, realtime=False):
+        """
+        Args:
+            realtime (bool): True 면 sendControlWhile 등 블록되는 명령이 실제처럼 시간을 소모
+        """
+        self.realtime = realtime
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _call(self, name, *args, block_ms=0):
+        with self._lock:
+            self.calls.append((time.time(), name, args))
+        if self.realtime and block_ms:
+            time.sleep(block_ms / 1000)
+
+    def sendTakeOff(self):
+        self._call("sendTakeOff")
+
+    def sendLanding(self):
+        self._call("sendLanding")
+
+    def sendStop(self):
+        self._call("sendStop")
+
+    def sendControlPosition(self, *args):
+        self._call("sendControlPosition", *args)
+
+    def sendControl(self, roll, pitch, yaw, throttle, time_ms):
+        self._call("sendControl", roll, pitch, yaw, throttle, time_ms, block_ms=time_ms)
+
+    def sendControlWhile(self, roll, pitch, yaw, throttle, time_ms):
+        self._call("sendControlWhile", roll, pitch, yaw, throttle, time_ms, block_ms=time_ms)
+
+
+class SimulatedLink:
+    """SerialPortManager 대신 항상 연결된 시뮬레이터를 돌려주는 객체"""
+
+    def __init__(self, drone):
+        self.drone = drone
+
+    def is_connected(self):
+        return True
+
+    def get_drone(self):
+        return self.drone
+
+
+def _load_models(args, session, log):
+    """세션에 기록된(또는 인자로 지정한) 모델과 프롬프트로 STT/LLM 로드"""
+    from stt import SpeechToText
+    from llm import LLMChat
+
+    stt_model = args.stt_model or session.get("stt_model")
+    llm_model = args.llm_model or session.get("llm_model")
+    if not stt_model or not llm_model:
+        raise SystemExit("세션에 모델 정보가 없습니다. --stt_model / --llm_model 을 지정하세요.")
+    draft_model = args.draft_llm_model if args.draft_llm_model is not None else session.get("draft_llm_model")
+
+    prompt_file = args.prompt_file
+    if prompt_file is None:
+        # 세션에 기록된 프롬프트 그대로 사용
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            f.write(session.get("prompt", ""))
+            prompt_file = f.name
+
+    log(f"STT: {stt_model}, LLM: {llm_model}, 드래프트: {draft_model or '-'}, 프롬프트: {args.prompt_file or '(세션 기록)'}")
+    # 예전 세션에는 프로파일 기록이 없음 (당시 동작: 파이프라인 기본 디코딩)
+    decode_profile = args.stt_profile or session.get("stt_decode_profile", "default")
+    compile_decoder = args.stt_compile if args.stt_compile is not None else session.get("stt_compiled", False)
+    log(f"STT 디코딩 프로파일: {decode_profile}, 디코더 컴파일: {'사용' if compile_decoder else '사용 안 함'}")
+    stt = SpeechToText(model_id=stt_model, cache_dir=args.cache_dir, language="korean",
+                       decode_profile=decode_profile, compile_decoder=compile_decoder)
+    llm = LLMChat(model_name=llm_model, cache_dir=args.cache_dir, prompt_file=prompt_file,
+                  draft_model_name=draft_model or None)
+    return stt, llm
+
+
+def _original_command(item):
+    """원래 세션에서 전송된 명령 (전송되지 않았으면 None)"""
+    if item["dispatches"]:
+        return item["dispatches"][-1].payload.get("command")
+    return None
+
+
+def replay_fast(items, inference, dispatch, log):
+    """발화를 순서대로 실행하여 {발화 id: 결과 record} 반환"""
+    results = {}
+    for item in items:
+        record = {}
+        command = inference.run(item["audio"], None, record)
+        if command is not None:
+            dispatch(command)
+        record["dispatched"] = command
+        results[item["id"]] = record
+        log(f"#{item['id']} '{record.get('transcript', '')}' -> {command}")
+    return results
+
+
+def replay_realtime(items, inference, dispatch, log):
+    """원래 시각 간격대로 파이프라인 컨트롤러에 제출하여 {발화 id: 결과 record} 반환"""
+    from pipeline_controller import PipelineController
+
+    results = {}
+    by_audio = {id(item["audio"]): item["id"] for item in items}
+    by_generation = {}
+    done = threading.Semaphore(0)
+
+    def infer(audio, cancel_event, generation):
+        item_id = by_audio[id(audio)]
+        by_generation[generation] = item_id
+        return inference.run(audio, cancel_event, results.setdefault(item_id, {}))
+
+    def on_dispatched(generation, command):
+        if generation in by_generation:
+            results[by_generation[generation]]["dispatched"] = command
+
+    controller = PipelineController(infer, dispatch, log, on_done=done.release, on_dispatched=on_dispatched)
+    start = time.monotonic()
+    t0 = items[0]["timestamp"]
+    for item in items:
+        delay = (item["timestamp"] - t0) - (time.monotonic() - start)
+        if delay > 0:
+            time.sleep(delay)
+        controller.submit(item["audio"])
+
+    # 마지막 작업이 끝날 때까지 대기
+    while controller.busy:
+        done.acquire(timeout=0.5)
+    controller.stop()
+    for record in results.values():
+        record.setdefault("dispatched", None)
+    return results
+
+
+def _percentiles(values):
+    if not values:
+        return None
+    return {"mean": float(np.mean(values)), "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95))}
+
+
+def compare(items, results, skipped):
+    """원래 세션과 리플레이 결과 비교 보고서"""
+    rows = []
+    latencies = {stage: ([], []) for stage in STAGES}
+    mismatches = 0
+    for item in items:
+        if item["id"] in skipped:
+            continue
+        original = item["utterance"] or {}
+        replayed = results.get(item["id"], {})
+        before = _original_command(item)
+        after = replayed.get("dispatched")
+        match = before == after
+        mismatches += not match
+        row = {
+            "id": item["id"],
+            "transcript_before": original.get("transcript", ""),
+            "transcript_after": replayed.get("transcript", ""),
+            "command_before": before,
+            "command_after": after,
+            "match": match,
+            "latency_ms_before": original.get("latency_ms", {}),
+            "latency_ms_after": replayed.get("latency_ms", {}),
+        }
+        rows.append(row)
+        for stage in STAGES:
+            if stage in row["latency_ms_before"] and stage in row["latency_ms_after"]:
+                latencies[stage][0].append(row["latency_ms_before"][stage])
+                latencies[stage][1].append(row["latency_ms_after"][stage])
+
+    stages = {}
+    for stage, (before, after) in latencies.items():
+        if before:
+            b, a = _percentiles(before), _percentiles(after)
+            stages[stage] = {"before": b, "after": a,
+                             "delta_p50_pct": (a["p50"] / b["p50"] - 1) * 100 if b["p50"] else None}
+    return {"utterances": rows, "compared": len(rows), "mismatches": mismatches,
+            "skipped": sorted(skipped), "stages": stages}
+
+
+def print_report(report):
+    for row in report["utterances"]:
+        mark = "  " if row["match"] else "!!"
+        total_before = row["latency_ms_before"].get("total")
+        total_after = row["latency_ms_after"].get("total")
+        timing = f"{total_before:.0f} -> {total_after:.0f}ms" if total_before is not None and total_after is not None else "-"
+        print(f"{mark} #{row['id']:<4} {row['command_before']!s:<32} -> {row['command_after']!s:<32} {timing}")
+        if not row["match"] and row["transcript_before"] != row["transcript_after"]:
+            print(f"       인식: '{row['transcript_before']}' -> '{row['transcript_after']}'")
+
+    print(f"\n명령 일치: {report['compared'] - report['mismatches']}/{report['compared']} (건너뜀 {len(report['skipped'])})")
+    print(f"{'stage':>6} {'p50 before':>11} {'p50 after':>10} {'delta':>8} {'p95 before':>11} {'p95 after':>10}")
+    for stage, s in report["stages"].items():
+        delta = "-" if s["delta_p50_pct"] is None else f"{s['delta_p50_pct']:+.1f}%"
+        print(f"{stage:>6} {s['before']['p50']:>11.0f} {s['after']['p50']:>10.0f} {delta:>8} "
+              f"{s['before']['p95']:>11.0f} {s['after']['p95']:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded flight session through the current pipeline")
+    parser.add_argument("session", help=".vfr session file")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--fast", dest="realtime", action="store_false", help="Run utterances back to back (default)")
+    mode.add_argument("--realtime", dest="realtime", action="store_true", help="Submit at original timing")
+    parser.add_argument("--stt_model", default=None, help="Override the recorded STT model")
+    parser.add_argument("--llm_model", default=None, help="Override the recorded LLM")
+    parser.add_argument("--draft_llm_model", default=None, help="Override the recorded draft model ('' disables)")
+    parser.add_argument("--prompt_file", default=None, help="Prompt to test (default: prompt recorded in the session)")
+    parser.add_argument("--stt_profile", choices=("command", "default"), default=None,
+                        help="STT decoding profile (default: as recorded)")
+    stt_compile = parser.add_mutually_exclusive_group()
+    stt_compile.add_argument("--stt_compile", dest="stt_compile", action="store_true", default=None,
+                             help="Compile the Whisper decoder with a static KV cache (default: as recorded)")
+    stt_compile.add_argument("--no_stt_compile", dest="stt_compile", action="store_false")
+    parser.add_argument("--cache_dir", default="../model_cache")
+    parser.add_argument("--latency_budget_sec", type=float, default=None)
+    stream = parser.add_mutually_exclusive_group()
+    stream.add_argument("--stream", dest="stream_llm", action="store_true", default=None,
+                        help="Commit the first valid streamed command line (default: as recorded)")
+    stream.add_argument("--no_stream", dest="stream_llm", action="store_false", help="Wait for the full LLM response")
+    parser.add_argument("--intent_model", default=None,
+                        help="Intent classifier model run before the LLM (default: as recorded, '' disables)")
+    parser.add_argument("--intent_threshold", type=float, default=None)
+    parser.add_argument("--max_regression_pct", type=float, default=None,
+                        help="Fail (exit 2) if total p50 latency grows by more than this")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    parser.add_argument("--quiet", action="store_true", help="Hide pipeline logs")
+    args = parser.parse_args()
+
+    from inference import CommandInference
+    from drone_control_manager import DroneControlManager
+
+    log = (lambda message: None) if args.quiet else print
+    flight_log = FlightLog(args.session)
+    session = flight_log.session()
+    items = [item for item in flight_log.utterances() if item["audio"] is not None]
+    if not items:
+        raise SystemExit("리플레이할 발화가 없습니다.")
+
+    stt, llm = _load_models(args, session, log)
+    budget = args.latency_budget_sec if args.latency_budget_sec is not None else session.get("latency_budget_sec", 5.0)
+    stream_llm = args.stream_llm if args.stream_llm is not None else session.get("stream_llm", False)
+    intent_model = args.intent_model if args.intent_model is not None else session.get("intent_model_path", "")
+    classifier = None
+    if intent_model and os.path.exists(intent_model):
+        from intent_classifier import IntentClassifier
+        classifier = IntentClassifier.load(intent_model)
+    threshold = args.intent_threshold if args.intent_threshold is not None else session.get("intent_threshold", 0.9)
+    inference = CommandInference(stt, llm, log, budget, stream=stream_llm, classifier=classifier,
+                                 classifier_threshold=threshold)
+
+    drone = SimulatedDrone(realtime=args.realtime)
+    controller = DroneControlManager(None, log, SimulatedLink(drone))
+
+    skipped = set()
+    start = time.perf_counter()
+    if args.realtime:
+        results = replay_realtime(items, inference, controller.execute_mission, log)
+    else:
+        # 원래 세션에서 새 발화에 선점된 발화는 순차 실행에서 비교할 수 없으므로 제외
+        skipped = {item["id"] for item in items if (item["utterance"] or {}).get("source") == "cancelled"}
+        results = replay_fast([item for item in items if item["id"] not in skipped],
+                              inference, controller.execute_mission, log)
+    elapsed = time.perf_counter() - start
+    controller.mission_runner.abort()
+
+    report = compare(items, results, skipped)
+    report["session"] = os.path.basename(args.session)
+    report["mode"] = "realtime" if args.realtime else "fast"
+    report["replay_sec"] = elapsed
+    report["original_sec"] = items[-1]["timestamp"] - items[0]["timestamp"]
+    report["drone_calls"] = len(drone.calls)
+    print_report(report)
+    print(f"리플레이 {elapsed:.1f}초 (원래 세션 {report['original_sec']:.1f}초), 시뮬레이터 호출 {len(drone.calls)}회")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if report["mismatches"]:
+        raise SystemExit(1)
+    total = report["stages"].get("total")
+    if args.max_regression_pct is not None and total and total["delta_p50_pct"] is not None \
+            and total["delta_p50_pct"] > args.max_regression_pct:
+        print(f"지연 회귀: total p50 {total['delta_p50_pct']:+.1f}% > {args.max_regression_pct}%")
+        raise SystemExit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+CPU 자원 계획 (구성 요소별 스레드 수와 CPU affinity)
+
+Whisper 와 Gemma 를 같은 프로세스의 CPU 에서 돌리면 둘 다 torch 기본 스레드 풀(전체 코어)을 써서
+코어를 과할당하고, 시리얼/텔레메트리 스레드와 Tk 루프가 밀려 제어 주기가 흔들립니다.
+ResourcePlan 은 구성 요소(stt, llm, io, ui)마다 스레드 수를 정하고, 선택적으로 CPU 를 고정합니다.
+
+    - io, ui: 코어가 4개 이상이면 각각 1개, 2~3개면 둘이 1개를 함께 예약
+    - stt, llm: 나머지(compute) 코어를 스레드 수로 나눔 (코어가 4개 미만이면 둘 다 전체 사용)
+
+STT 와 LLM 은 같은 파이프라인 스레드에서 번갈아 실행되고 OpenMP 작업 스레드는 만들어질 때의
+affinity 를 물려받으므로, CPU 고정은 둘이 공유하는 compute 코어 단위로 하고 스레드 수만 따로 둡니다.
+torch.set_num_threads 는 호출한 스레드의 이후 연산에 적용되므로 apply() 는 작업하는 스레드에서 호출합니다.
+
+voice_settings.json 의 "resource_plan" 항목으로 바꿀 수 있습니다.
+    {"pin_cpus": true, "threads": {"stt": 4, "llm": 2}, "cpus": {"io": [7]}}
+"""
+
+import os
+import json
+import threading
+
+COMPONENTS = ("stt", "llm", "io", "ui")
+TORCH_COMPONENTS = ("stt", "llm")
+
+
+def usable_cpus():
+    """이 프로세스가 쓸 수 있는 CPU 번호 목록"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def can_pin():
+    """스레드 단위 CPU affinity 지원 여부 (Linux)"""
+    return hasattr(os, "sched_setaffinity")
+
+
+class ResourcePlan:
+    """구성 요소별 스레드 수와 CPU 집합"""
+
+    def __init__(self, threads, cpus, pin=False):
+        """
+        Args:
+            threads (dict): {구성 요소: 스레드 수}
+            cpus (dict): {구성 요소: CPU 번호 목록}
+            pin (bool): apply() 에서 CPU affinity 도 설정할지 여부
+        """
+        self.threads = dict(threads)
+        self.cpus = {component: sorted(cpu_list) for component, cpu_list in cpus.items()}
+        self.pin = pin and can_pin()
+        self._settings = {"pin_cpus": pin}
+        self._local = threading.local()
+
+    @classmethod
+    def auto(cls, pin=False, cpus=None):
+        """
+        사용 가능한 코어로 기본 계획 생성
+
+        Args:
+            pin (bool): CPU affinity 사용 여부
+            cpus (list[int], optional): 나눌 CPU 목록 (None 이면 usable_cpus())
+        """
+        cpus = sorted(cpus) if cpus else usable_cpus()
+        n = len(cpus)
+        reserved = 2 if n >= 4 else (1 if n >= 2 else 0)
+        io_cpus = cpus[n - 1:] if reserved else cpus
+        ui_cpus = cpus[n - 2:n - 1] if reserved == 2 else io_cpus
+        compute = cpus[:n - reserved]
+
+        c = len(compute)
+        if c >= 4:
+            stt_threads = (c + 1) // 2
+            llm_threads = c - stt_threads
+        else:
+            stt_threads = llm_threads = c
+
+        threads = {"stt": stt_threads, "llm": llm_threads, "io": len(io_cpus), "ui": len(ui_cpus)}
+        plan_cpus = {"stt": compute, "llm": compute, "io": io_cpus, "ui": ui_cpus}
+        return cls(threads, plan_cpus, pin)
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """
+        설정 dict 로 계획 생성 (지정하지 않은 값은 auto() 기본값)
+
+        Args:
+            settings (dict, optional): {"pin_cpus": bool, "threads": {...}, "cpus": {...}}
+        """
+        settings = settings or {}
+        plan = cls.auto(pin=bool(settings.get("pin_cpus", False)))
+        for component, count in (settings.get("threads") or {}).items():
+            if component in COMPONENTS and int(count) > 0:
+                plan.threads[component] = int(count)
+        for component, cpu_list in (settings.get("cpus") or {}).items():
+            if component in COMPONENTS and cpu_list:
+                plan.cpus[component] = sorted(int(cpu) for cpu in cpu_list)
+        plan._settings = dict(settings, pin_cpus=bool(settings.get("pin_cpus", False)))
+        return plan
+
+    @property
+    def settings(self):
+        """voice_settings.json 에 저장할 형식 (지정한 값만, 나머지는 다음 실행 때 다시 auto())"""
+        return dict(self._settings)
+
+    def apply(self, component):
+        """
+        현재 스레드에 구성 요소의 스레드 수(torch)와 CPU affinity 적용
+
+        같은 스레드에서 같은 구성 요소로 다시 호출하면 아무것도 하지 않습니다.
+        """
+        if getattr(self._local, "component", None) == component:
+            return
+        self._local.component = component
+
+        if component in TORCH_COMPONENTS:
+            import torch
+            if torch.get_num_threads() != self.threads[component]:
+                torch.set_num_threads(self.threads[component])
+
+        if self.pin:
+            try:
+                # Linux 에서 pid 0 은 호출한 스레드
+                os.sched_setaffinity(0, self.cpus[component])
+            except OSError as e:
+                print(f"CPU affinity 설정 실패 ({component}: {self.cpus[component]}): {e}")
+
+    def describe(self):
+        """계획 요약 문자열"""
+        parts = []
+        for component in COMPONENTS:
+            cpu_list = self.cpus[component]
+            if len(cpu_list) > 1 and cpu_list[-1] - cpu_list[0] + 1 == len(cpu_list):
+                cpu_text = f"{cpu_list[0]}-{cpu_list[-1]}"
+            else:
+                cpu_text = ",".join(str(cpu) for cpu in cpu_list)
+            parts.append(f"{component} {self.threads[component]}스레드" + (f"@CPU{cpu_text}" if self.pin else ""))
+        return ", ".join(parts)
+
+
+def load_resource_plan(settings_file="voice_settings.json"):
+    """설정 파일의 "resource_plan" 항목으로 계획 생성 (파일이나 항목이 없으면 auto())"""
+    settings = None
+    if os.path.exists(settings_file):
+        try:
+            with open(settings_file, 'r', encoding='utf-8') as f:
+                settings = json.load(f).get("resource_plan")
+        except (OSError, ValueError, AttributeError):
+            settings = None
+    return ResourcePlan.from_settings(settings)
@@ -1,11 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import serial.tools.list_ports
 import threading
 import time
 
+from port_watcher import PortWatcher
+
+NO_PORT_TEXT = "사용 가능한 포트 없음"
+
 class SerialPortManager:
-    def __init__(self, parent, log_callback):
+    def __init__(self, parent, log_callback, connect_timeout_sec=5.0):
         """시리얼 포트 관리자 초기화"""
         self.parent = parent
         self.log = log_callback
@@ -13,12 +16,27 @@ class SerialPortManager:
         self.connected = False
         self.check_thread = None
         
+        # 백그라운드 연결 (시간 초과/취소된 시도의 늦은 결과는 세대 번호로 무시)
+        self.connect_timeout_sec = connect_timeout_sec
+        self._connect_generation = 0
+        self._connecting_port = None
+        self._connect_start = 0.0
+        self._connect_stage = ""
+        self.connect_latencies = []  # 연결 성공까지 걸린 시간 (초)
+        
+        # 백그라운드 포트 감시 (핫플러그)
+        self.port_watcher = None
+        self.ports = {}
+        self._scan_requested = False
+        
         # UI 컴포넌트 참조 저장
         self.port_combo = None
         self.connect_button = None
         self.disconnect_button = None
+        self.cancel_button = None
         self.scan_button = None
         self.status_var = None
+        self.progress_bar = None
         
     def create_widgets(self, frame):
         """포트 관리 위젯 생성"""
@@ -37,70 +55,224 @@ class SerialPortManager:
         self.disconnect_button = ttk.Button(frame, text="연결 해제", command=self.disconnect_drone, state=tk.DISABLED)
         self.disconnect_button.grid(row=0, column=4, padx=5, pady=5)
         
+        self.cancel_button = ttk.Button(frame, text="연결 취소", command=self.cancel_connect, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=5, padx=5, pady=5)
+        
         # 상태 표시 레이블
         self.status_var = tk.StringVar()
         self.status_var.set("대기 중...")
         status_label = ttk.Label(frame, textvariable=self.status_var, font=('Arial', 10, 'italic'))
-        status_label.grid(row=1, column=0, columnspan=5, sticky=tk.W, padx=5, pady=5)
+        status_label.grid(row=1, column=0, columnspan=4, sticky=tk.W, padx=5, pady=5)
+        
+        # 연결 진행 상태 (시간 초과까지 남은 시간)
+        self.progress_bar = ttk.Progressbar(frame, length=150, mode="determinate", maximum=100)
+        self.progress_bar.grid(row=1, column=4, columnspan=2, sticky=tk.E, padx=5, pady=5)
         
-        # 초기 포트 스캔
-        self.scan_ports()
+        # 포트 감시 시작 (조회는 백그라운드 스레드에서, 결과는 after() 로 반영)
+        self.port_combo['values'] = ["포트 검색 중..."]
+        self.port_combo.current(0)
+        self.connect_button.config(state=tk.DISABLED)
+        self._scan_requested = True
+        self.port_watcher = PortWatcher(
+            lambda ports, arrived, removed: self.parent.after(0, self._apply_port_changes, ports, arrived, removed),
+            resource_plan=getattr(self.parent, "resource_plan", None)
+        )
         
     def scan_ports(self):
-        """시리얼 포트를 스캔하여 콤보박스에 표시"""
-        ports = serial.tools.list_ports.comports()
-        port_list = [f"{port.device}" for port in ports]
+        """포트 다시 조회 요청 (결과는 감시 스레드가 _apply_port_changes 로 전달)"""
+        self._scan_requested = True
+        if self.port_watcher is not None:
+            self.port_watcher.scan_now()
+    
+    def _apply_port_changes(self, ports, arrived, removed):
+        """포트 변경분을 콤보박스에 반영 (Tk 스레드)"""
+        self.ports = ports
+        
+        for info in removed:
+            if info.device not in ports:
+                self.log(f"포트 제거됨: {info}")
+                if self.connected and info.device == self.port_combo.get():
+                    self.log(f"경고: 연결된 포트 {info.device}가 제거되었습니다.")
+                    self.status_var.set(f"포트 {info.device}가 제거되었습니다.")
+        if not self._scan_requested:
+            for info in arrived:
+                self.log(f"포트 연결됨: {info}")
+        
+        # CodingDrone 포트를 앞에 표시
+        port_list = sorted(ports, key=lambda device: (not ports[device].is_drone, device))
+        if self._scan_requested:
+            self._scan_requested = False
+            self.log("포트 스캔 완료: " + ", ".join(port_list) if port_list else NO_PORT_TEXT)
         
+        if self.connected or self.connecting:
+            # 연결 중에는 목록만 갱신하고 선택은 바꾸지 않음
+            if port_list:
+                self.port_combo['values'] = port_list
+            return
+        
+        current = self.port_combo.get()
         if not port_list:
-            self.port_combo['values'] = ["사용 가능한 포트 없음"]
+            self.port_combo['values'] = [NO_PORT_TEXT]
             self.port_combo.current(0)
             self.connect_button.config(state=tk.DISABLED)
+            return
+        
+        self.port_combo['values'] = port_list
+        drone_ports = [info.device for info in arrived if info.is_drone]
+        if drone_ports and not (current in ports and ports[current].is_drone):
+            # 새로 꽂힌 CodingDrone 포트 자동 선택
+            self.port_combo.set(drone_ports[0])
+            self.log(f"CodingDrone 포트 자동 선택: {drone_ports[0]}")
+        elif current in ports:
+            self.port_combo.set(current)
         else:
-            self.port_combo['values'] = port_list
             self.port_combo.current(0)
-            self.connect_button.config(state=tk.NORMAL)
-            
-        self.log("포트 스캔 완료: " + ", ".join(port_list) if port_list else "사용 가능한 포트 없음")
+        self.connect_button.config(state=tk.NORMAL)
             
+    @property
+    def connecting(self):
+        """연결 시도 진행 여부"""
+        return self._connecting_port is not None
+    
     def connect_drone(self):
-        """선택한 포트에 드론 연결"""
-        from CodingDrone.drone import Drone  # 필요할 때만 임포트
-        
+        """선택한 포트에 드론 연결 (작업 스레드에서 열고 결과는 after() 로 전달)"""
         port = self.port_combo.get()
         
-        if port == "사용 가능한 포트 없음":
+        if port not in self.ports:
             messagebox.showerror("연결 오류", "사용 가능한 포트가 없습니다.")
             return
-            
-        self.log(f"포트 {port}에 연결 시도 중...")
+        if self.connecting or self.connected:
+            return
+        
+        self._connect_generation += 1
+        generation = self._connect_generation
+        self._connecting_port = port
+        self._connect_start = time.perf_counter()
+        self._connect_stage = "준비"
+        
+        self.log(f"포트 {port}에 연결 시도 중... (제한 시간 {self.connect_timeout_sec:g}초)")
         self.status_var.set(f"포트 {port}에 연결 중...")
+        self._set_connecting_ui(True)
         
+        threading.Thread(target=self._connect_worker, args=(generation, port), daemon=True).start()
+        self._update_connect_progress(generation)
+    
+    def cancel_connect(self):
+        """진행 중인 연결 시도 취소"""
+        if self.connecting:
+            self._abandon_connect("취소")
+    
+    def _set_connecting_ui(self, connecting):
+        """연결 시도 중/종료 시 버튼 상태"""
+        self.connect_button.config(state=tk.DISABLED if connecting else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if connecting else tk.DISABLED)
+        self.port_combo.config(state=tk.DISABLED if connecting else "readonly")
+        self.scan_button.config(state=tk.DISABLED if connecting else tk.NORMAL)
+        self.progress_bar['value'] = 0
+    
+    def _connect_worker(self, generation, port):
+        """드론 객체 생성과 포트 열기 (작업 스레드)"""
+        resource_plan = getattr(self.parent, "resource_plan", None)
+        if resource_plan is not None:
+            resource_plan.apply("io")
+        drone = None
         try:
-            self.drone = Drone()
-            self.drone.open(port)
-            self.connected = True
-            
-            self.status_var.set(f"포트 {port}에 성공적으로 연결되었습니다.")
-            self.log(f"드론이 포트 {port}에 성공적으로 연결되었습니다.")
-            
-            # 버튼 상태 변경
-            self.connect_button.config(state=tk.DISABLED)
-            self.disconnect_button.config(state=tk.NORMAL)
-            self.port_combo.config(state=tk.DISABLED)
-            self.scan_button.config(state=tk.DISABLED)
-            
-            # 이벤트 발생
-            if hasattr(self.parent, "on_drone_connected"):
-                self.parent.on_drone_connected()
-            
-            # 연결 상태 확인 스레드 시작
-            self.check_thread = threading.Thread(target=self.check_connection, daemon=True)
-            self.check_thread.start()
+            self._connect_stage = "CodingDrone 모듈 로드"
+            from CodingDrone.drone import Drone  # 필요할 때만 임포트
             
+            self._connect_stage = "포트 열기"
+            drone = Drone()
+            drone.open(port)
         except Exception as e:
-            self.log(f"연결 실패: {str(e)}")
-            self.status_var.set(f"연결 실패: {str(e)}")
-            messagebox.showerror("연결 오류", f"드론 연결 중 오류가 발생했습니다: {str(e)}")
+            self.parent.after(0, self._on_connect_failed, generation, port, e, drone)
+            return
+        self.parent.after(0, self._on_connect_succeeded, generation, port, drone)
+    
+    def _update_connect_progress(self, generation):
+        """연결 진행 상태 갱신 및 시간 초과 확인 (Tk 스레드, 100ms 마다)"""
+        if generation != self._connect_generation or not self.connecting:
+            return
+        elapsed = time.perf_counter() - self._connect_start
+        if elapsed >= self.connect_timeout_sec:
+            self._abandon_connect("시간 초과")
+            return
+        self.status_var.set(f"포트 {self._connecting_port}에 연결 중... {self._connect_stage} "
+                            f"({elapsed:.1f}/{self.connect_timeout_sec:g}초)")
+        self.progress_bar['value'] = elapsed / self.connect_timeout_sec * 100
+        self.parent.after(100, self._update_connect_progress, generation)
+    
+    def _abandon_connect(self, reason):
+        """연결 시도 포기 (작업 스레드는 계속 돌 수 있으므로 세대 번호를 올려 늦은 결과를 무시)"""
+        port = self._connecting_port
+        elapsed = time.perf_counter() - self._connect_start
+        self._connect_generation += 1
+        self._connecting_port = None
+        self._set_connecting_ui(False)
+        
+        self._apply_port_changes(self.ports, [], [])
+        
+        message = f"연결 {reason}: 포트 {port} ({self._connect_stage} 단계, {elapsed:.1f}초)"
+        self.log(message)
+        self.status_var.set(message)
+        if reason == "시간 초과":
+            messagebox.showerror("연결 오류", f"{message}\n포트가 응답하지 않습니다. 다른 포트를 선택하거나 장치를 다시 연결하세요.")
+    
+    def _on_connect_succeeded(self, generation, port, drone):
+        """연결 성공 처리 (Tk 스레드)"""
+        if generation != self._connect_generation:
+            # 이미 시간 초과/취소된 시도가 늦게 열림: 포트를 잡고 있지 않도록 닫음
+            self.log(f"포기한 연결 시도가 늦게 완료되어 포트 {port}를 닫습니다.")
+            threading.Thread(target=self._close_quietly, args=(drone,), daemon=True).start()
+            return
+        
+        latency = time.perf_counter() - self._connect_start
+        self.connect_latencies.append(latency)
+        self._connecting_port = None
+        self._set_connecting_ui(False)
+        self.drone = drone
+        self.connected = True
+        
+        self.status_var.set(f"포트 {port}에 성공적으로 연결되었습니다.")
+        self.log(f"드론이 포트 {port}에 성공적으로 연결되었습니다. (연결 {latency * 1000:.0f}ms, "
+                 f"평균 {sum(self.connect_latencies) / len(self.connect_latencies) * 1000:.0f}ms / "
+                 f"{len(self.connect_latencies)}회)")
+        
+        # 버튼 상태 변경
+        self.connect_button.config(state=tk.DISABLED)
+        self.disconnect_button.config(state=tk.NORMAL)
+        self.port_combo.config(state=tk.DISABLED)
+        self.scan_button.config(state=tk.DISABLED)
+        self.progress_bar['value'] = 100
+        
+        # 이벤트 발생
+        if hasattr(self.parent, "on_drone_connected"):
+            self.parent.on_drone_connected()
+        
+        # 연결 상태 확인 스레드 시작
+        self.check_thread = threading.Thread(target=self.check_connection, daemon=True)
+        self.check_thread.start()
+    
+    def _on_connect_failed(self, generation, port, error, drone):
+        """연결 실패 처리 (Tk 스레드)"""
+        if drone is not None:
+            threading.Thread(target=self._close_quietly, args=(drone,), daemon=True).start()
+        if generation != self._connect_generation:
+            self.log(f"포기한 연결 시도 실패: 포트 {port} ({str(error)})")
+            return
+        
+        elapsed = time.perf_counter() - self._connect_start
+        self._connecting_port = None
+        self._set_connecting_ui(False)
+        self._apply_port_changes(self.ports, [], [])
+        self.log(f"연결 실패: {str(error)} ({self._connect_stage} 단계, {elapsed:.1f}초)")
+        self.status_var.set(f"연결 실패: {str(error)}")
+        messagebox.showerror("연결 오류", f"드론 연결 중 오류가 발생했습니다: {str(error)}")
+    
+    def _close_quietly(self, drone):
+        try:
+            drone.close()
+        except Exception:
+            pass
             
     def disconnect_drone(self):
         """드론 연결 해제"""
@@ -120,6 +292,10 @@ class SerialPortManager:
                 self.disconnect_button.config(state=tk.DISABLED)
                 self.port_combo.config(state="readonly")
                 self.scan_button.config(state=tk.NORMAL)
+                self.progress_bar['value'] = 0
+                
+                # 연결 중에 바뀐 포트 목록 반영
+                self._apply_port_changes(self.ports, [], [])
                 
                 # 이벤트 발생
                 if hasattr(self.parent, "on_drone_disconnected"):
@@ -127,6 +303,9 @@ class SerialPortManager:
                 
     def check_connection(self):
         """연결 상태를 주기적으로 확인"""
+        resource_plan = getattr(self.parent, "resource_plan", None)
+        if resource_plan is not None:
+            resource_plan.apply("io")
         while self.connected:
             # 여기에 드론 연결 상태 확인 로직 추가 (필요한 경우)
             time.sleep(1)
@@ -141,5 +320,10 @@ class SerialPortManager:
         
     def cleanup(self):
         """리소스 정리"""
+        if self.connecting:
+            self._abandon_connect("취소")
+        if self.port_watcher is not None:
+            self.port_watcher.stop()
+            self.port_watcher = None
         if self.connected:
             self.disconnect_drone()
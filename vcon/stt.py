@@ -8,91 +8,238 @@ please do not modify this comment block. you can modify other than this block.
 このコメントは変更しないでください。 それ以外の部分を自由に変更してもかまいません。
 """
 
-import torch
 from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
 import pyaudio
-import wave
 import numpy as np
 import time
 import os
+import re
 import tempfile
-import threading
 import scipy.io.wavfile as wavfile
 
+from model_artifacts import find_exported_model
+from machine_profile import select_inference_config, apply_threads, quantize_model
+from deadline import InferenceCancelled
+from audio_input import TARGET_SAMPLE_RATE, PolyphaseResampler, to_float32_mono, load_audio_file
+
+# 명령 어휘 쪽으로 인식을 유도하는 Whisper 초기 프롬프트 (이전 문맥으로 주어짐)
+# Whisper 는 거의 무음인 입력에서 프롬프트 단어를 그대로 출력하기도 하므로, 정지 단어(멈춰/정지 등)는 넣지 않습니다.
+COMMAND_PROMPT = "드론 명령: 이륙, 착륙, 앞으로, 뒤로, 왼쪽, 오른쪽, 위로, 아래로, 호버링, 3초 기다려, 1미터, 회전."
+
+_PROMPT_SEPARATORS = re.compile(r"[\s.,:!?]+")
+MIN_ECHO_TERMS = 4  # 프롬프트 어휘를 이만큼 순서대로 이어 붙여야 반복으로 봄 ("호버링 3초 기다려" 같은 실제 명령은 통과)
+
+# 디코딩 프로파일
+#   default: 파이프라인 기본값 (모델의 generation_config 그대로)
+#   command: 몇 단어짜리 명령 발화용 - greedy, 타임스탬프 없음, 짧은 max_new_tokens, 명령 어휘 프롬프트
+DECODE_PROFILES = {
+    "default": {"generate_kwargs": {}, "use_prompt": False},
+    "command": {"generate_kwargs": {"num_beams": 1, "do_sample": False, "max_new_tokens": 48}, "use_prompt": True},
+}
+
+
+def is_prompt_echo(text, prompt):
+    """
+    인식 결과가 프롬프트를 그대로 되풀이한 것인지 판정
+
+    프롬프트 머리말("드론 명령")만 나오거나, 프롬프트 어휘 MIN_ECHO_TERMS 개 이상을 프롬프트 순서 그대로 이어 붙인
+    문장이면 실제 발화가 아니라 프롬프트 반복으로 봅니다.
+    """
+    normalized = _PROMPT_SEPARATORS.sub("", text or "")
+    if not normalized or not prompt:
+        return False
+    header, _, vocabulary = prompt.rpartition(":")
+    header = _PROMPT_SEPARATORS.sub("", header)
+    if header and normalized.startswith(header):
+        normalized = normalized[len(header):]
+        if not normalized:
+            return True
+    terms = [term for term in (_PROMPT_SEPARATORS.sub("", term) for term in vocabulary.split(",")) if term]
+    for start in range(len(terms)):
+        joined = ""
+        for count, term in enumerate(terms[start:], 1):
+            joined += term
+            if len(joined) > len(normalized):
+                break
+            if count >= MIN_ECHO_TERMS and joined == normalized:
+                return True
+    return False
+
+
+def _write_ring(ring, written, data):
+    """누적 인덱스 written 위치부터 data 를 링 버퍼에 기록 (끝에 닿으면 앞으로 돌아감)"""
+    capacity = len(ring)
+    pos = written % capacity
+    first = min(len(data), capacity - pos)
+    ring[pos:pos + first] = data[:first]
+    if first < len(data):
+        ring[:len(data) - first] = data[first:]
+
+
+def _read_ring(ring, start, end):
+    """누적 인덱스 [start, end) 구간을 링 버퍼에서 복사 (덮어써진 앞부분은 제외)"""
+    capacity = len(ring)
+    start = max(start, end - capacity)
+    if end <= start:
+        return np.zeros((0,) + ring.shape[1:], dtype=ring.dtype)
+    first, last = start % capacity, end % capacity
+    if first < last:
+        return ring[first:last].copy()
+    return np.concatenate((ring[first:], ring[:last]))
+
 
 class AudioRecorder:
-    """오디오 녹음을 처리하는 클래스"""
+    """
+    오디오 녹음을 처리하는 클래스
+    
+    입력 스트림은 한 번만 열어 계속 유지하며(callback 모드), 캡처된 int16 프레임은 미리 할당된
+    링 버퍼에 기록됩니다. 녹음 시작은 링 버퍼의 위치만 표시하므로 장치 열기 지연이 없고,
+    pre-roll 구간 덕분에 첫 음절이 잘리지 않습니다. 버튼을 오래 눌러도 메모리 사용량은 일정합니다.
+    callback 에서 블록마다 스트리밍 리샘플러로 16 kHz 로 변환해 두므로, 녹음 종료 시 리샘플링 시간이 들지 않습니다.
+    네이티브 샘플레이트 링 버퍼(ring)는 키워드 검출기 등 다른 소비자가 그대로 읽습니다.
+    """
     
-    def __init__(self):
+    def __init__(self, rate=None, channels=1, device_index=None, frames_per_buffer=1024,
+                 buffer_sec=30.0, preroll_ms=300):
+        """
+        Args:
+            rate (int, optional): 캡처 샘플레이트 (None 이면 장치 기본(네이티브) 샘플레이트)
+            channels (int): 캡처 채널 수 (모노로 다운믹스됨)
+            device_index (int, optional): 입력 장치 인덱스 (None 이면 기본 장치)
+            frames_per_buffer (int): callback 한 번에 전달되는 프레임 수
+            buffer_sec (float): 링 버퍼 길이 (한 발화의 최대 길이)
+            preroll_ms (int): 녹음 시작 이전부터 포함할 구간 (ms)
+        """
         self.audio = pyaudio.PyAudio()
-        self.frames = []
         self.is_recording = False
-        self.record_thread = None
+        self.device_index = device_index
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.stream = None
         
-    def start_recording(self):
-        """녹음 시작"""
-        self.is_recording = True
-        self.frames = []
+        # 많은 USB 마이크가 16 kHz 를 직접 지원하지 않으므로 장치의 네이티브 샘플레이트로 연다
+        if rate is None:
+            if device_index is None:
+                info = self.audio.get_default_input_device_info()
+            else:
+                info = self.audio.get_device_info_by_index(device_index)
+            rate = int(info['defaultSampleRate'])
+        self.rate = int(rate)
+        self.resampler = PolyphaseResampler(self.rate, TARGET_SAMPLE_RATE)
+        
+        # 미리 할당된 링 버퍼와 누적 프레임 인덱스
+        self.capacity = int(self.rate * buffer_sec)
+        self.ring = np.zeros((self.capacity, self.channels), dtype=np.int16)
+        self.frames_written = 0
+        
+        # callback 에서 16 kHz 로 변환한 모노 오디오의 링 버퍼 (출력 인덱스 n 은 입력 n * down / up 에 대응)
+        self.resampled_capacity = int(TARGET_SAMPLE_RATE * buffer_sec)
+        self.resampled_ring = np.zeros(self.resampled_capacity, dtype=np.float32)
+        self.resampled_written = 0
+        self.preroll_frames = int(self.rate * preroll_ms / 1000)
+        self.start_index = 0
+        
+        # 입력 오버플로(드라이버 버퍼 넘침) 및 링 버퍼 초과로 잘린 발화 수
+        self.overflow_count = 0
+        self.truncated_count = 0
+        
+        self.open()
+    
+    def open(self):
+        """입력 스트림 열기 (이미 열려 있으면 무시)"""
+        if self.stream is not None:
+            return
         self.stream = self.audio.open(
             format=pyaudio.paInt16, 
-            channels=1,
-            rate=16000,  # Whisper 모델에 최적화된 샘플레이트
+            channels=self.channels,
+            rate=self.rate,
             input=True,
-            frames_per_buffer=1024
+            input_device_index=self.device_index,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback
         )
+        self.stream.start_stream()
+        print(f"오디오 입력 스트림 시작 ({self.rate} Hz, {self.channels}ch)")
+    
+    def _callback(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: 캡처된 프레임을 링 버퍼에 기록하고, 16 kHz 로 변환해 두 번째 링 버퍼에 기록"""
+        if status & pyaudio.paInputOverflow:
+            self.overflow_count += 1
+        frames = np.frombuffer(in_data, dtype=np.int16).reshape(-1, self.channels)
+        _write_ring(self.ring, self.frames_written, frames)
+        # 데이터를 모두 쓴 뒤에 인덱스를 갱신해야 읽는 쪽이 불완전한 프레임을 보지 않음
+        self.frames_written += len(frames)
         
-        print("녹음 중... (종료하려면 Enter 키를 누르세요)")
-        
-        # 녹음 스레드 시작
-        self.record_thread = threading.Thread(target=self._record)
-        self.record_thread.start()
+        resampled = self.resampler.process(to_float32_mono(frames))
+        _write_ring(self.resampled_ring, self.resampled_written, resampled)
+        self.resampled_written += len(resampled)
+        return (None, pyaudio.paContinue)
     
-    def _record(self):
-        """녹음 처리 (별도 스레드에서 실행)"""
-        while self.is_recording:
-            data = self.stream.read(1024)
-            self.frames.append(data)
+    def read_frames(self, start, end):
+        """누적 인덱스 [start, end) 구간의 프레임을 링 버퍼에서 복사"""
+        return _read_ring(self.ring, start, end)
     
-    def stop_recording(self):
-        """녹음 중지"""
+    def read_resampled(self, start, end):
+        """16 kHz 누적 인덱스 [start, end) 구간의 오디오를 변환된 링 버퍼에서 복사"""
+        return _read_ring(self.resampled_ring, start, end)
+        
+    def start_recording(self):
+        """녹음 시작 (pre-roll 을 포함하도록 링 버퍼 위치만 표시)"""
+        self.open()
+        self.start_index = max(0, self.frames_written - self.preroll_frames)
+        self.is_recording = True
+        print("녹음 중... (종료하려면 Enter 키를 누르세요)")
+    
+    def stop_recording_audio(self):
+        """
+        녹음 중지 후 오디오 반환
+        
+        Returns:
+            np.ndarray or None: 16 kHz float32 모노 배열 (녹음 내용이 없으면 None)
+        """
         if not self.is_recording:
             return None
-            
         self.is_recording = False
         
-        # 녹음 스레드가 종료될 때까지 대기
-        if self.record_thread:
-            self.record_thread.join()
-        
-        # 스트림 정리
-        self.stream.stop_stream()
-        self.stream.close()
-        
-        # 녹음된 데이터가 없으면 None 반환
-        if not self.frames:
+        if self.frames_written - self.start_index > self.capacity:
+            self.truncated_count += 1
+            print(f"발화가 링 버퍼 길이({self.capacity / self.rate:.0f}초)를 넘어 앞부분이 잘렸습니다.")
+        # callback 에서 이미 변환된 구간을 복사 (리샘플러 필터 지연만큼인 1ms 미만의 끝부분은 제외됨)
+        start = self.start_index * self.resampler.up // self.resampler.down
+        audio = self.read_resampled(start, self.resampled_written)
+        if len(audio) == 0:
             return None
-            
-        # 임시 파일로 저장
-        temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-        wf = wave.open(temp_file.name, 'wb')
-        wf.setnchannels(1)
-        wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-        wf.setframerate(16000)
-        wf.writeframes(b''.join(self.frames))
-        wf.close()
         
         print("녹음 완료!")
+        return audio
+    
+    def stop_recording(self):
+        """녹음 중지 후 16 kHz WAV 임시 파일 경로 반환"""
+        audio = self.stop_recording_audio()
+        if audio is None:
+            return None
+        
+        # 임시 파일로 저장 (16 kHz float32 모노)
+        temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
+        temp_file.close()
+        wavfile.write(temp_file.name, TARGET_SAMPLE_RATE, audio)
         return temp_file.name
         
     def close(self):
         """리소스 정리"""
+        self.is_recording = False
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
         self.audio.terminate()
 
 
 class SpeechToText:
     """음성 인식(STT) 클래스"""
     
-    def __init__(self, model_id="openai/whisper-large-v3-turbo", device=None, language="korean", cache_dir="../model_cache"):
+    def __init__(self, model_id="openai/whisper-large-v3-turbo", device=None, language="korean", cache_dir="../model_cache",
+                 resource_plan=None, decode_profile="command", initial_prompt=COMMAND_PROMPT, compile_decoder=False):
         """
         STT 클래스 초기화
         
@@ -101,46 +248,80 @@ class SpeechToText:
             device (str, optional): 사용할 장치 (None이면 자동 감지)
             language (str, optional): 인식할 언어
             cache_dir (str, optional): 모델 캐시 디렉토리 (기본값: "../model_cache")
+            resource_plan (ResourcePlan, optional): CPU 자원 계획 (스레드 수/affinity, None 이면 머신 프로파일의 스레드 수)
+            decode_profile (str): 디코딩 프로파일 ("command" 또는 "default", DECODE_PROFILES 참고)
+            initial_prompt (str, optional): command 프로파일에서 쓸 Whisper 초기 프롬프트
+            compile_decoder (bool): Whisper 디코더에 static KV 캐시와 torch.compile 적용 (실패하면 eager 로 사용).
+                생성 설정을 바꾸고 생성자에서 컴파일 워밍업을 하므로 로딩 시간이 늘어남 (설정으로 켤 때만 사용)
         """
+        if decode_profile not in DECODE_PROFILES:
+            raise ValueError(f"알 수 없는 디코딩 프로파일: {decode_profile} ({', '.join(DECODE_PROFILES)})")
         self.model_id = model_id
         self.language = language
         self.cache_dir = cache_dir
+        self.resource_plan = resource_plan
+        self.decode_profile = decode_profile
+        self.initial_prompt = initial_prompt
+        self.prompt_ids = None
+        self.compiled = False
         
         # 캐시 디렉토리가 존재하지 않으면 생성
         os.makedirs(self.cache_dir, exist_ok=True)
         
-        # 디바이스 설정
-        if device is None:
-            self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-        else:
-            self.device = device
+        # 디바이스, dtype, 스레드 수, 양자화 설정 (gpu_check.py 가 만든 머신 프로파일이 있으면 그 추천값)
+        self.config = select_inference_config(self.cache_dir, "stt", device)
+        self.device = self.config.device
+        self.torch_dtype = self.config.torch_dtype
+        if resource_plan is None:
+            apply_threads(self.config)
         
-        self.torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+        # 변환 시간 통계 (무음 제거로 절감된 시간 추정에 사용)
+        self.last_transcribe_sec = 0.0
+        self.sec_per_audio_sec = None  # 오디오 1초당 변환 시간 (지수 이동 평균)
         
-        print(f"사용 중인 디바이스: {self.device}")
+        print(f"사용 중인 디바이스: {self.device} (추론 설정: {self.config})")
         print(f"선택한 모델: {self.model_id}")
         
         # 모델 및 프로세서 로드
         self._load_model()
+        if compile_decoder:
+            self.compile_decoder()
         
     def _load_model(self):
         """모델과 프로세서 로드"""
         print(f"모델 로딩 중... (캐시 디렉토리: {self.cache_dir})")
+        if self.resource_plan is not None:
+            self.resource_plan.apply("stt")
         
         try:
-            self.model = AutoModelForSpeechSeq2Seq.from_pretrained(
-                self.model_id,
-                torch_dtype=self.torch_dtype,
-                low_cpu_mem_usage=True,
-                use_safetensors=True,
-                cache_dir=self.cache_dir
-            )
-            self.model.to(self.device)
+            # 사전 변환된 아티팩트가 있으면 dtype 변환 없이 바로 대상 디바이스로 memory-map
+            export_dir = find_exported_model(self.cache_dir, self.model_id, self.device, self.torch_dtype)
+            if export_dir:
+                print(f"사전 변환된 모델 사용: {export_dir}")
+                self.model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                    export_dir,
+                    torch_dtype=self.torch_dtype,
+                    low_cpu_mem_usage=True,
+                    use_safetensors=True,
+                    device_map=self.device
+                )
+                self.processor = AutoProcessor.from_pretrained(export_dir)
+            else:
+                self.model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                    self.model_id,
+                    torch_dtype=self.torch_dtype,
+                    low_cpu_mem_usage=True,
+                    use_safetensors=True,
+                    cache_dir=self.cache_dir
+                )
+                self.model.to(self.device)
+                
+                self.processor = AutoProcessor.from_pretrained(
+                    self.model_id,
+                    cache_dir=self.cache_dir
+                )
             
-            self.processor = AutoProcessor.from_pretrained(
-                self.model_id,
-                cache_dir=self.cache_dir
-            )
+            self.model = quantize_model(self.model, self.config)
             
             # 파이프라인 생성
             self.pipeline = pipeline(
@@ -152,27 +333,106 @@ class SpeechToText:
                 device=self.device
             )
             
+            # 명령 어휘 프롬프트 토큰 (Whisper 만 지원)
+            if self.is_whisper and self.initial_prompt:
+                self.prompt_ids = self.processor.get_prompt_ids(self.initial_prompt, return_tensors="pt").to(self.device)
+            
             print("모델 및 프로세서 불러오기 완료")
         except Exception as e:
             print(f"모델 로딩 중 오류 발생: {str(e)}")
             raise
     
-    def transcribe(self, audio_file, language=None):
+    @property
+    def is_whisper(self):
+        return getattr(self.model.config, "model_type", "") == "whisper"
+    
+    def compile_decoder(self):
+        """
+        Whisper 디코더에 static KV 캐시와 torch.compile 적용
+        
+        캐시 크기가 고정되어야 컴파일된 그래프를 발화마다 재사용할 수 있으므로 command 프로파일의
+        max_new_tokens 로 캐시 길이를 맞춥니다. 짧은 무음으로 한 번 실행해 컴파일하고,
+        컴파일러가 없거나 실패하면 원래(eager) 모델로 되돌립니다.
+        
+        Returns:
+            bool: 적용 여부
+        """
+        import torch
+        
+        if not self.is_whisper or not hasattr(torch, "compile"):
+            return False
+        if self.decode_profile != "command":
+            # 다른 프로파일은 발화마다 출력 길이 상한이 달라 고정 크기 캐시를 쓸 수 없음
+            return False
+        if self.config.quantization:
+            print("양자화된 모델에는 torch.compile 을 적용하지 않습니다.")
+            return False
+        
+        eager_forward = self.model.forward
+        generation_config = self.model.generation_config
+        previous = (generation_config.cache_implementation, generation_config.max_new_tokens)
+        generation_config.cache_implementation = "static"
+        generation_config.max_new_tokens = DECODE_PROFILES["command"]["generate_kwargs"]["max_new_tokens"]
+        mode = "reduce-overhead" if self.device.startswith("cuda") else None
+        self.model.forward = torch.compile(self.model.forward, mode=mode, fullgraph=True)
+        
+        start = time.perf_counter()
+        try:
+            self._generate(np.zeros(TARGET_SAMPLE_RATE, dtype=np.float32), self.language)
+        except Exception as e:
+            self.model.forward = eager_forward
+            generation_config.cache_implementation, generation_config.max_new_tokens = previous
+            print(f"torch.compile 적용 실패, eager 모드로 사용합니다: {e}")
+            return False
+        self.compiled = True
+        print(f"디코더 컴파일 완료 (static KV 캐시, {time.perf_counter() - start:.1f}초)")
+        return True
+    
+    def _generate(self, audio_data, language, deadline=None):
+        """디코딩 프로파일을 적용하여 파이프라인 실행"""
+        profile = DECODE_PROFILES[self.decode_profile]
+        generate_kwargs = dict(profile["generate_kwargs"], language=language)
+        if profile["use_prompt"] and self.prompt_ids is not None:
+            generate_kwargs["prompt_ids"] = self.prompt_ids
+        if deadline is not None:
+            generate_kwargs["stopping_criteria"] = deadline.stopping_criteria()
+        
+        # 오디오 데이터를 Transformers 파이프라인에 직접 전달
+        result = self.pipeline(
+            {"array": audio_data, "sampling_rate": TARGET_SAMPLE_RATE},
+            return_timestamps=False,
+            generate_kwargs=generate_kwargs
+        )
+        text = result["text"]
+        # transformers 버전에 따라 출력에 프롬프트가 포함되는 경우 제거
+        if "prompt_ids" in generate_kwargs and text.strip().startswith(self.initial_prompt):
+            text = text.strip()[len(self.initial_prompt):]
+        # 프롬프트만 되풀이한 결과(거의 무음인 입력)는 버림
+        if "prompt_ids" in generate_kwargs and is_prompt_echo(text, self.initial_prompt):
+            print(f"프롬프트 반복으로 보이는 인식 결과를 버립니다: {text.strip()}")
+            return ""
+        return text.strip()
+    
+    def transcribe(self, audio_file, language=None, deadline=None):
         """
         오디오 파일을 텍스트로 변환
         
         Args:
-            audio_file (str): 오디오 파일 경로
+            audio_file (str or np.ndarray): 오디오 파일 경로, 또는 16 kHz float32 모노 배열
             language (str, optional): 인식할 언어 (None이면 초기화 시 설정한 언어 사용)
+            deadline (Deadline, optional): 처리 시간 예산 (넘기거나 취소되면 디코딩을 멈춤)
             
         Returns:
             str: 인식된 텍스트
+            
+        Raises:
+            InferenceCancelled: deadline 이 취소되었거나 예산을 넘긴 경우 (DeadlineExceeded)
         """
-        if not audio_file:
+        if audio_file is None or (isinstance(audio_file, str) and not audio_file):
             return "녹음된 오디오가 없습니다."
         
         # 파일이 존재하는지 확인
-        if not os.path.exists(audio_file):
+        if isinstance(audio_file, str) and not os.path.exists(audio_file):
             return f"오디오 파일을 찾을 수 없습니다: {audio_file}"
         
         lang = language if language is not None else self.language
@@ -180,30 +440,53 @@ class SpeechToText:
         print(f"음성을 텍스트로 변환 중... (언어: {lang})")
         
         try:
-            # WAV 파일을 직접 읽어서 numpy 배열로 변환 (ffmpeg 의존성 제거)
-            sample_rate, audio_data = wavfile.read(audio_file)
+            if isinstance(audio_file, str):
+                # WAV 파일을 직접 읽어 16 kHz float32 모노로 변환 (ffmpeg 의존성 제거, 파이프라인 내부 리샘플링 생략)
+                audio_data = load_audio_file(audio_file)
+            else:
+                audio_data = np.ascontiguousarray(audio_file, dtype=np.float32)
             
-            # 16비트 정수를 float32로 변환 (-1.0 ~ 1.0 범위)
-            if audio_data.dtype == np.int16:
-                audio_data = audio_data.astype(np.float32) / 32768.0
+            if self.resource_plan is not None:
+                self.resource_plan.apply("stt")
             
-            # 스테레오인 경우 모노로 변환
-            if len(audio_data.shape) > 1 and audio_data.shape[1] > 1:
-                audio_data = np.mean(audio_data, axis=1)
+            if deadline is not None:
+                deadline.check("STT")
             
-            # 오디오 데이터를 Transformers 파이프라인에 직접 전달
-            result = self.pipeline(
-                {"array": audio_data, "sampling_rate": sample_rate}, 
-                generate_kwargs={"language": lang}
-            )
+            start = time.perf_counter()
+            text = self._generate(audio_data, lang, deadline)
+            self._update_timing(time.perf_counter() - start, len(audio_data) / TARGET_SAMPLE_RATE)
             
-            return result["text"]
+            # 중간에 멈춘 결과는 사용하지 않음
+            if deadline is not None:
+                deadline.check("STT")
             
+            return text
+            
+        except InferenceCancelled:
+            raise
         except Exception as e:
             print(f"\n[오류] 변환 중 오류 발생: {str(e)}")
             return f"오류: {str(e)}"
 
 
+    def _update_timing(self, elapsed, audio_sec):
+        """변환 시간 통계 갱신"""
+        self.last_transcribe_sec = elapsed
+        if audio_sec <= 0:
+            return
+        rate = elapsed / audio_sec
+        if self.sec_per_audio_sec is None:
+            self.sec_per_audio_sec = rate
+        else:
+            self.sec_per_audio_sec = 0.8 * self.sec_per_audio_sec + 0.2 * rate
+    
+    def estimate_time(self, audio_sec):
+        """주어진 길이의 오디오 변환에 걸릴 시간 추정 (통계가 없으면 0)"""
+        if self.sec_per_audio_sec is None:
+            return 0.0
+        return self.sec_per_audio_sec * audio_sec
+
+
 def main():
     """메인 함수: 실시간 음성 인식 예제"""
     
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# vcon 모듈은 서로 평면 import 하므로 vcon 디렉토리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
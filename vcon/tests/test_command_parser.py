@@ -0,0 +1,39 @@
+import pytest
+
+from command_parser import IncrementalCommandParser, parse_mission
+
+
+def feed_all(parser, text, size=3):
+    """size 글자씩 나눠 넣고 처음 확정된 명령과 그때까지 넣은 길이를 반환"""
+    for i in range(0, len(text), size):
+        command = parser.feed(text[i:i + size])
+        if command is not None:
+            return command, i + size
+    return parser.finish(), len(text)
+
+
+def test_multiline_mission_is_not_cut_to_first_line():
+    output = "takeoff\nmove forward\nwait 2\nlanding"
+    command, _ = feed_all(IncrementalCommandParser(), output)
+    assert [step.command for step in parse_mission(command)] == ["takeoff", "move forward", "wait 2", "landing"]
+
+
+def test_multiline_mission_in_code_block_commits_at_closing_fence():
+    output = "```\ntakeoff\nmove forward\nlanding\n```\n이륙 후 앞으로 이동하고 착륙합니다."
+    command, consumed = feed_all(IncrementalCommandParser(), output)
+    assert command == "takeoff; move forward; landing"
+    assert consumed < output.index("이륙")
+
+
+@pytest.mark.parametrize("output", ["takeoff; move forward\n이륙 후 앞으로 갑니다.", "move up\n\n```\n설명"])
+def test_single_line_commits_when_non_command_text_starts(output):
+    parser = IncrementalCommandParser()
+    command, consumed = feed_all(parser, output, size=1)
+    assert command == output.split("\n")[0]
+    assert consumed < len(output)
+
+
+def test_invalid_output_is_returned_whole():
+    parser = IncrementalCommandParser()
+    assert parser.feed("잘 모르겠습니다") is None
+    assert parser.finish() == "잘 모르겠습니다"
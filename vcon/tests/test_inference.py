@@ -0,0 +1,85 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+
+from inference import CommandInference
+
+SAMPLE_RATE = 16000
+
+
+def utterance():
+    rng = np.random.default_rng(0)
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    silence = np.zeros(SAMPLE_RATE // 2)
+    audio = np.concatenate([silence, 0.3 * np.sin(2 * np.pi * 220 * t), silence])
+    return (audio + 1e-3 * rng.standard_normal(len(audio))).astype(np.float32)
+
+
+class FakeSTT:
+    def __init__(self, text, delay_sec=0.0):
+        self.text = text
+        self.delay_sec = delay_sec
+
+    def estimate_time(self, audio_sec):
+        return 0.0
+
+    def transcribe(self, audio, deadline=None):
+        time.sleep(self.delay_sec)
+        return self.text
+
+
+class BlockingLLM:
+    """release 될 때까지 생성이 끝나지 않는 LLM"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def chat(self, text, deadline=None, stats=None):
+        self.started.set()
+        self.release.wait(5.0)
+        return "move forward"
+
+
+def shared_inference(stt, llm, budget_sec=5.0):
+    locks = {"stt": threading.Lock(), "llm": threading.Lock()}
+    return CommandInference(stt, llm, lambda message: None, budget_sec, stream=False, stage_locks=locks)
+
+
+def test_stop_is_not_queued_behind_another_llm_generation():
+    llm = BlockingLLM()
+    station_a = shared_inference(FakeSTT("앞으로 가줄래"), llm)
+    station_b = CommandInference(FakeSTT("정지"), llm, lambda message: None, stream=False,
+                                 stage_locks=station_a.stage_locks)
+    worker = threading.Thread(target=station_a.run, args=(utterance(),))
+    worker.start()
+    assert llm.started.wait(2.0)
+
+    start = time.perf_counter()
+    record = {}
+    assert station_b.run(utterance(), record=record) == "stop"
+    assert record["source"] == "urgent"
+    assert time.perf_counter() - start < 1.0
+
+    llm.release.set()
+    worker.join(2.0)
+
+
+def test_utterance_that_expires_while_queued_is_dropped():
+    llm = BlockingLLM()
+    busy = shared_inference(FakeSTT("앞으로 가줄래", delay_sec=1.0), llm)
+    queued = CommandInference(FakeSTT("뒤로 가줄래"), llm, lambda message: None, 0.3, stream=False,
+                              stage_locks=busy.stage_locks)
+    worker = threading.Thread(target=busy.run, args=(utterance(),))
+    worker.start()
+    time.sleep(0.1)
+
+    record = {}
+    assert queued.run(utterance(), record=record) is None
+    assert record["source"] == "expired"
+    llm.release.set()
+    worker.join(2.0)
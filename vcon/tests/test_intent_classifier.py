@@ -0,0 +1,21 @@
+from intent_classifier import IntentClassifier, command_template, extract_numbers, fill_slots
+
+
+def test_fill_slots():
+    assert fill_slots("wait <n>", [3.0]) == "wait 3"
+    assert fill_slots("wait <n>", []) is None
+    assert fill_slots("move forward", []) == "move forward"
+    # 슬롯이 없는 명령에 횟수/거리가 붙으면 분류기로 확정하지 않음
+    assert fill_slots("move forward", extract_numbers("두 번 앞으로")) is None
+
+
+def test_counted_utterance_defers_to_llm():
+    texts = ["앞으로 가", "앞으로 가줘", "앞으로 이동", "3초 기다려", "5초 기다려", "2초 기다려"]
+    commands = ["move forward"] * 3 + ["wait 3", "wait 5", "wait 2"]
+    classifier = IntentClassifier.train(texts, [command_template(c) for c in commands], dim=2 ** 10)
+
+    assert classifier.classify("앞으로 가", threshold=0.5).command == "move forward"
+    assert classifier.classify("4초 기다려", threshold=0.5).command == "wait 4"
+    prediction = classifier.classify("두 번 앞으로 가", threshold=0.0)
+    assert prediction.label == "move forward"
+    assert prediction.command is None
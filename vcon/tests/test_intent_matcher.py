@@ -0,0 +1,23 @@
+import pytest
+
+from intent_matcher import is_stop_command, match_intent
+
+
+@pytest.mark.parametrize("text", ["정지", "멈춰!", "긴급 정지", "그만해", "스톱 스톱", "드론 정지해", "Stop."])
+def test_short_stop_phrases_are_stop(text):
+    assert is_stop_command(text)
+    assert match_intent(text) == "stop"
+
+
+@pytest.mark.parametrize("text", ["멈추지 말고 계속 앞으로 가", "그만큼 더 앞으로 가", "앞으로 가다가 멈춰",
+                                  "그만둬", "정지 후 이륙"])
+def test_stop_words_inside_other_sentences_are_not_stop(text):
+    assert not is_stop_command(text)
+    # 정지 키워드가 섞인 애매한 문장은 매칭하지 않음 (대체 경로는 호버링)
+    assert match_intent(text) is None
+
+
+def test_single_movement_is_matched():
+    assert match_intent("앞으로 가") == "move forward"
+    assert match_intent("이륙해") == "takeoff"
+    assert match_intent("왼쪽으로 가다가 오른쪽으로") is None
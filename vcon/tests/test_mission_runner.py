@@ -0,0 +1,28 @@
+import threading
+import time
+
+from command_parser import MissionStep
+from mission_runner import MissionRunner
+
+
+def test_abort_does_not_wait_for_blocking_step():
+    entered = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def execute(command):
+        sent.append(command)
+        entered.set()
+        release.wait(5.0)  # sendControlWhile 처럼 블록되는 전송
+
+    runner = MissionRunner(execute, lambda message: None)
+    runner.start([MissionStep("hovering"), MissionStep("move forward"), MissionStep("landing")])
+    assert entered.wait(2.0)
+
+    start = time.perf_counter()
+    runner.abort()
+    assert time.perf_counter() - start < 0.1
+
+    release.set()
+    runner._thread.join(2.0)
+    assert sent == ["hovering"]
@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("transformers")
+
+from stt import COMMAND_PROMPT, is_prompt_echo
+
+
+@pytest.mark.parametrize("text", ["드론 명령:", "드론 명령: 이륙, 착륙, 앞으로, 뒤로", "이륙, 착륙, 앞으로, 뒤로, 왼쪽",
+                                  "위로 아래로 호버링 3초 기다려 1미터 회전."])
+def test_prompt_echo_is_dropped(text):
+    assert is_prompt_echo(text, COMMAND_PROMPT)
+
+
+@pytest.mark.parametrize("text", ["호버링 3초 기다려", "1미터 회전", "앞으로 뒤로", "왼쪽 오른쪽", "이륙", "드론 명령 이륙",
+                                  "앞으로 가"])
+def test_commands_made_of_prompt_terms_are_kept(text):
+    assert not is_prompt_echo(text, COMMAND_PROMPT)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from audio_input import TARGET_SAMPLE_RATE
+from vad import frame_energy_db, voiced_frames, trim_silence
+
+SR = TARGET_SAMPLE_RATE
+
+
+def _noise(seconds, std, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(SR * seconds)) * std).astype(np.float32)
+
+
+def _tone(seconds, amplitude, freq=220.0):
+    t = np.arange(int(SR * seconds)) / SR
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def test_noise_only_clip_is_rejected():
+    # 약 -40 dBFS 배경 소음만 있는 3초 클립
+    audio = _noise(3.0, 0.01)
+    assert not voiced_frames(frame_energy_db(audio, SR // 50)).any()
+    result = trim_silence(audio)
+    assert result.rejected
+    assert result.kept_sec == 0.0
+
+
+def test_tone_in_noise_is_trimmed_to_the_tone():
+    # 1초 소음 + 1초 톤(0.3) + 1초 소음, 소음은 전체에 0.02
+    noise = _noise(3.0, 0.02)
+    audio = noise.copy()
+    audio[SR:2 * SR] += _tone(1.0, 0.3)
+    result = trim_silence(audio, max_pause_ms=None)
+    assert not result.rejected
+    # 톤 1초 + 앞뒤 여유(200ms x 2) 정도만 남아야 함
+    assert 0.9 <= result.kept_sec <= 1.5
+    assert result.removed_sec >= 1.5
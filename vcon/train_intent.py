@@ -0,0 +1,184 @@
+"""
+의도 분류기 학습 및 오프라인 평가
+
+비행 기록(.vfr)에서 LLM 이 만든 (인식 문장, 명령) 쌍을 모아 IntentClassifier 를 학습하고,
+따로 떼어 둔 평가 세트에서 LLM 명령과의 일치율, 처리 비율(coverage), 임계값별 결과,
+발화당 분류 시간을 기록된 LLM 지연과 비교해 보고합니다.
+
+평가 세트는 인식 문장의 해시로 나누므로 같은 문장이 학습과 평가에 함께 들어가지 않습니다.
+추가 학습 데이터는 JSON lines 파일로 줄 수 있습니다: {"text": "앞으로 가", "command": "move forward"}
+
+사용법:
+    python train_intent.py flight_logs/*.vfr --output intent_model.npz
+    python train_intent.py flight_logs/*.vfr --extra intent_pairs.jsonl --thresholds 0.8 0.9 0.95 --report intent_report.json
+"""
+
+import argparse
+import json
+import time
+import zlib
+
+import numpy as np
+
+from flight_recorder import FlightLog
+from intent_classifier import IntentClassifier, command_template
+
+
+def collect_pairs(paths, sources=("llm",)):
+    """
+    비행 기록에서 학습 쌍 수집
+
+    Args:
+        paths (list[str]): .vfr 파일 목록
+        sources (tuple): 사용할 명령 출처 (기본: LLM 이 만든 명령만)
+
+    Returns:
+        tuple[list, list]: [(문장, 명령)], 기록된 LLM 지연(ms) 목록
+    """
+    pairs = []
+    llm_latency_ms = []
+    for path in paths:
+        log = FlightLog(path)
+        try:
+            for item in log.utterances():
+                utterance = item["utterance"] or {}
+                if utterance.get("source") not in sources:
+                    continue
+                text = (utterance.get("transcript") or "").strip()
+                command = (utterance.get("command") or "").strip()
+                if not text or command_template(command) is None:
+                    continue
+                pairs.append((text, command))
+                if "llm" in utterance.get("latency_ms", {}):
+                    llm_latency_ms.append(utterance["latency_ms"]["llm"])
+        finally:
+            log.close()
+    return pairs, llm_latency_ms
+
+
+def load_extra_pairs(path):
+    """JSON lines 파일의 {"text", "command"} 쌍 (유효하지 않은 명령은 건너뜀)"""
+    pairs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if command_template(item["command"]) is not None:
+                pairs.append((item["text"].strip(), item["command"].strip()))
+    return pairs
+
+
+def split_pairs(pairs, test_fraction):
+    """인식 문장 해시로 학습/평가 세트 분리 (실행마다 같은 결과)"""
+    train, test = [], []
+    for pair in pairs:
+        bucket = zlib.crc32(pair[0].encode("utf-8")) % 1000
+        (test if bucket < test_fraction * 1000 else train).append(pair)
+    return train, test
+
+
+def evaluate(classifier, pairs, thresholds):
+    """
+    임계값별 LLM 명령과의 일치율
+
+    Returns:
+        dict: {임계값: {"coverage", "accuracy", "covered_accuracy", "covered", "correct"}} 와 라벨별 결과
+    """
+    results = {}
+    for threshold in thresholds:
+        covered = correct = 0
+        for text, command in pairs:
+            result = classifier.classify(text, threshold)
+            if result.command is None:
+                continue
+            covered += 1
+            correct += " ".join(result.command.split()) == " ".join(command.split())
+        n = max(len(pairs), 1)
+        results[threshold] = {"covered": covered, "correct": correct, "coverage": covered / n,
+                              "accuracy": correct / n, "covered_accuracy": correct / covered if covered else None}
+
+    per_label = {}
+    for text, command in pairs:
+        label, _ = classifier.predict(text)
+        expected = command_template(command)
+        stats = per_label.setdefault(expected, {"count": 0, "label_correct": 0})
+        stats["count"] += 1
+        stats["label_correct"] += label == expected
+    return {"thresholds": results, "labels": per_label}
+
+
+def measure_latency(classifier, texts, threshold, min_calls=2000):
+    """발화당 분류 시간 (µs)"""
+    texts = list(texts) or ["앞으로 가"]
+    for text in texts[:10]:  # 워밍업
+        classifier.classify(text, threshold)
+    times = []
+    while len(times) < min_calls:
+        for text in texts:
+            start = time.perf_counter()
+            classifier.classify(text, threshold)
+            times.append((time.perf_counter() - start) * 1e6)
+    return {"mean_us": float(np.mean(times)), "p50_us": float(np.percentile(times, 50)),
+            "p99_us": float(np.percentile(times, 99))}
+
+
+def print_report(report):
+    print(f"학습 {report['train']}쌍, 평가 {report['test']}쌍, 라벨 {len(report['label_names'])}개")
+    print(f"{'threshold':>9} {'coverage':>9} {'accuracy':>9} {'covered acc':>12}")
+    for threshold, r in report["evaluation"]["thresholds"].items():
+        covered_accuracy = "-" if r["covered_accuracy"] is None else f"{r['covered_accuracy'] * 100:.1f}%"
+        print(f"{threshold:>9} {r['coverage'] * 100:>8.1f}% {r['accuracy'] * 100:>8.1f}% {covered_accuracy:>12}")
+    print("라벨별 (평가 세트):")
+    for label, stats in sorted(report["evaluation"]["labels"].items(), key=lambda kv: -kv[1]["count"]):
+        print(f"  {label:<32} {stats['label_correct']}/{stats['count']}")
+    latency = report["latency"]
+    llm = report["llm_latency_ms_p50"]
+    speedup = f", LLM p50 {llm:.0f}ms 대비 {llm * 1000 / latency['mean_us']:.0f}배" if llm else ""
+    print(f"분류 시간: 평균 {latency['mean_us']:.1f}µs, p99 {latency['p99_us']:.1f}µs{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the pre-LLM intent classifier from flight recorder logs")
+    parser.add_argument("sessions", nargs="*", help=".vfr session files")
+    parser.add_argument("--extra", default=None, help="Extra JSON lines pairs {\"text\", \"command\"}")
+    parser.add_argument("--test_fraction", type=float, default=0.2, help="Fraction of transcripts held out")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--min_count", type=int, default=2, help="Rarer labels are left to the LLM")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.7, 0.8, 0.9, 0.95, 0.99])
+    parser.add_argument("--output", default="intent_model.npz", help="Model file")
+    parser.add_argument("--report", default=None, help="Write the evaluation as JSON")
+    args = parser.parse_args()
+
+    pairs, llm_latency_ms = collect_pairs(args.sessions)
+    if args.extra:
+        pairs += load_extra_pairs(args.extra)
+    if not pairs:
+        raise SystemExit("학습할 (문장, 명령) 쌍이 없습니다.")
+    train, test = split_pairs(pairs, args.test_fraction)
+    if not test:
+        print("평가 세트가 비어 있어 학습 데이터로 평가합니다.")
+        test = train
+
+    start = time.perf_counter()
+    classifier = IntentClassifier.train([text for text, _ in train], [command_template(c) for _, c in train],
+                                        epochs=args.epochs, min_count=args.min_count)
+    print(f"학습 시간: {time.perf_counter() - start:.1f}초")
+    classifier.save(args.output)
+    print(f"모델 저장: {args.output}")
+
+    report = {
+        "train": len(train), "test": len(test), "label_names": classifier.labels,
+        "evaluation": evaluate(classifier, test, args.thresholds),
+        "latency": measure_latency(classifier, [text for text, _ in test], max(args.thresholds)),
+        "llm_latency_ms_p50": float(np.percentile(llm_latency_ms, 50)) if llm_latency_ms else None,
+    }
+    print_report(report)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
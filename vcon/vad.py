@@ -0,0 +1,251 @@
+"""
+에너지 기반 음성 구간 검출(VAD) 및 무음 제거
+
+푸시투토크 녹음의 앞뒤 무음을 잘라내고, 긴 중간 휴지를 짧게 압축합니다.
+너무 짧거나 무음뿐인 발화는 모델을 호출하기 전에 걸러냅니다.
+StreamingEndpointer 는 버튼 없이 계속 들어오는 스트림(네트워크 오디오)에서 발화 구간을 잘라냅니다.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from audio_input import TARGET_SAMPLE_RATE
+
+
+def frame_energy_db(audio, frame_len):
+    """
+    프레임별 에너지(dBFS) 계산
+
+    Args:
+        audio (np.ndarray): float32 모노 배열
+        frame_len (int): 프레임 길이 (샘플)
+
+    Returns:
+        np.ndarray: 프레임별 에너지 (dB)
+    """
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    power = np.einsum('ij,ij->i', frames, frames) / frame_len
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def _runs(mask):
+    """bool 배열에서 True 구간들의 (시작, 끝) 인덱스 배열 반환"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def voiced_frames(energy_db, margin_db=12.0, floor_db=-50.0, dynamic_range_db=30.0, min_run=2):
+    """
+    프레임별 음성 여부 판정
+
+    배경 소음(하위 10% 에너지)보다 margin_db 이상 크고, 최대 에너지와의 차이가
+    dynamic_range_db 이내인 프레임을 음성으로 봅니다 (두 조건을 모두 만족해야 함).
+    min_run 보다 짧은 구간은 잡음으로 간주합니다.
+    """
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+    noise_db = np.percentile(energy_db, 10)
+    threshold = max(floor_db, noise_db + margin_db, energy_db.max() - dynamic_range_db)
+    voiced = energy_db > threshold
+    starts, ends = _runs(voiced)
+    for start, end in zip(starts, ends):
+        if end - start < min_run:
+            voiced[start:end] = False
+    return voiced
+
+
+class TrimResult:
+    """무음 제거 결과"""
+
+    def __init__(self, audio, original_samples, speech_samples, sample_rate, rejected=False, reason=""):
+        self.audio = audio
+        self.original_samples = original_samples
+        self.speech_samples = speech_samples
+        self.sample_rate = sample_rate
+        self.rejected = rejected
+        self.reason = reason
+
+    @property
+    def original_sec(self):
+        return self.original_samples / self.sample_rate
+
+    @property
+    def kept_sec(self):
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def removed_sec(self):
+        return self.original_sec - self.kept_sec
+
+    @property
+    def removed_fraction(self):
+        """제거된 오디오 비율 (0.0 ~ 1.0)"""
+        if self.original_samples == 0:
+            return 0.0
+        return 1.0 - len(self.audio) / self.original_samples
+
+
+def trim_silence(audio, sample_rate=TARGET_SAMPLE_RATE, frame_ms=20, pad_ms=200, max_pause_ms=400,
+                 min_speech_ms=200, margin_db=12.0, floor_db=-50.0):
+    """
+    앞뒤 무음 제거 및 긴 중간 휴지 압축
+
+    Args:
+        audio (np.ndarray): float32 모노 배열
+        sample_rate (int): 샘플레이트
+        frame_ms (int): 분석 프레임 길이 (ms)
+        pad_ms (int): 음성 구간 앞뒤로 남길 여유 (ms)
+        max_pause_ms (int or None): 중간 휴지를 이 길이로 압축 (None 이면 압축 안 함)
+        min_speech_ms (int): 이보다 음성이 짧으면 발화를 거부 (ms)
+        margin_db (float): 배경 소음 대비 음성 판정 여유 (dB)
+        floor_db (float): 음성으로 인정하는 최소 에너지 (dBFS)
+
+    Returns:
+        TrimResult: 잘라낸 오디오와 통계 (rejected=True 면 모델 호출 불필요)
+    """
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+    frame_len = int(sample_rate * frame_ms / 1000)
+    energy = frame_energy_db(audio, frame_len)
+    voiced = voiced_frames(energy, margin_db=margin_db, floor_db=floor_db)
+
+    speech_frames = int(voiced.sum())
+    speech_samples = speech_frames * frame_len
+    empty = audio[:0]
+    if speech_frames == 0:
+        return TrimResult(empty, len(audio), 0, sample_rate, rejected=True, reason="무음")
+    if speech_samples < sample_rate * min_speech_ms / 1000:
+        return TrimResult(empty, len(audio), speech_samples, sample_rate, rejected=True, reason="발화가 너무 짧음")
+
+    # 앞뒤 여유를 포함한 유지 구간
+    pad = int(pad_ms / frame_ms)
+    voiced_idx = np.flatnonzero(voiced)
+    first = max(0, voiced_idx[0] - pad)
+    last = min(len(voiced), voiced_idx[-1] + pad + 1)
+    keep = np.zeros(len(voiced), dtype=bool)
+    keep[first:last] = True
+
+    # 긴 중간 휴지는 앞뒤 절반씩만 남김
+    if max_pause_ms is not None:
+        max_pause = max(2, int(max_pause_ms / frame_ms))
+        starts, ends = _runs(~voiced[first:last])
+        for start, end in zip(starts + first, ends + first):
+            if start > first and end < last and end - start > max_pause:
+                keep[start + max_pause // 2:end - max_pause // 2] = False
+
+    sample_keep = np.repeat(keep, frame_len)
+    if last == len(voiced):
+        # 마지막 프레임 뒤의 자투리 샘플도 포함
+        sample_keep = np.concatenate((sample_keep, np.ones(len(audio) - len(sample_keep), dtype=bool)))
+    else:
+        sample_keep = np.concatenate((sample_keep, np.zeros(len(audio) - len(sample_keep), dtype=bool)))
+    return TrimResult(audio[sample_keep], len(audio), speech_samples, sample_rate)
+
+
+class StreamingEndpointer:
+    """
+    연속 오디오 스트림에서 발화 단위를 잘라내는 끝점 검출기
+
+    배경 소음 에너지를 음성이 아닌 프레임으로 계속 추정하고, 소음보다 margin_db 이상 큰 프레임이
+    start_frames 개 이어지면 발화 시작, end_silence_ms 동안 음성이 없으면 발화 끝으로 봅니다.
+    시작 전 preroll_ms 구간을 포함하므로 첫 음절이 잘리지 않습니다.
+    """
+
+    def __init__(self, sample_rate=TARGET_SAMPLE_RATE, frame_ms=20, margin_db=12.0, floor_db=-50.0,
+                 start_frames=3, end_silence_ms=700, preroll_ms=300, max_utterance_sec=8.0):
+        """
+        Args:
+            sample_rate (int): 샘플레이트
+            frame_ms (int): 분석 프레임 길이 (ms)
+            margin_db (float): 배경 소음 대비 음성 판정 여유 (dB)
+            floor_db (float): 음성으로 인정하는 최소 에너지 (dBFS)
+            start_frames (int): 발화 시작으로 판단할 연속 음성 프레임 수
+            end_silence_ms (int): 발화 종료로 판단할 무음 길이 (ms)
+            preroll_ms (int): 발화 시작 이전부터 포함할 구간 (ms)
+            max_utterance_sec (float): 발화 최대 길이 (넘으면 그 자리에서 자름)
+        """
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.floor_db = floor_db
+        self.start_frames = start_frames
+        self.end_frames = max(1, int(end_silence_ms / frame_ms))
+        self.max_frames = int(max_utterance_sec * 1000 / frame_ms)
+        self._preroll = deque(maxlen=max(start_frames, int(preroll_ms / frame_ms)))
+        self.reset()
+
+    def reset(self):
+        self.noise_db = None
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._preroll.clear()
+        self._speech = None
+        self._voiced_run = 0
+        self._silent_frames = 0
+
+    @property
+    def in_speech(self):
+        return self._speech is not None
+
+    def process(self, chunk):
+        """
+        오디오 청크 입력
+
+        Args:
+            chunk (np.ndarray): float32 모노 배열
+
+        Returns:
+            list[np.ndarray]: 이 청크에서 끝난 발화들
+        """
+        data = np.concatenate((self._rest, np.asarray(chunk, dtype=np.float32)))
+        n_frames = len(data) // self.frame_len
+        self._rest = data[n_frames * self.frame_len:]
+        if n_frames == 0:
+            return []
+        frames = data[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        energies = frame_energy_db(data[:n_frames * self.frame_len], self.frame_len)
+
+        utterances = []
+        for frame, energy in zip(frames, energies):
+            if self.noise_db is None:
+                self.noise_db = float(energy)
+            voiced = energy > max(self.noise_db + self.margin_db, self.floor_db)
+            if not voiced:
+                # 소음 추정: 내려갈 때는 바로, 올라갈 때는 천천히 따라감
+                self.noise_db = float(energy) if energy < self.noise_db else self.noise_db + 0.05 * (energy - self.noise_db)
+
+            if self._speech is None:
+                self._preroll.append(frame)
+                self._voiced_run = self._voiced_run + 1 if voiced else 0
+                if self._voiced_run >= self.start_frames:
+                    self._speech = list(self._preroll)
+                    self._preroll.clear()
+                    self._silent_frames = 0
+            else:
+                self._speech.append(frame)
+                self._silent_frames = 0 if voiced else self._silent_frames + 1
+                if self._silent_frames >= self.end_frames or len(self._speech) >= self.max_frames:
+                    utterances.append(self._finish())
+        return utterances
+
+    def flush(self):
+        """
+        진행 중인 발화를 바로 끝냄 (클라이언트가 발화 종료를 알린 경우)
+
+        Returns:
+            np.ndarray or None: 발화 (수집 중인 발화가 없으면 None)
+        """
+        if self._speech is None:
+            return None
+        if len(self._rest):
+            self._speech.append(self._rest)
+            self._rest = np.zeros(0, dtype=np.float32)
+        return self._finish()
+
+    def _finish(self):
+        audio = np.concatenate(self._speech)
+        self._speech = None
+        self._voiced_run = 0
+        return audio
@@ -1,10 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import threading
 import os
 import time
 import json  # 설정 저장/불러오기용
 
+# 검출 즉시 정지시키는 호출어 라벨 (kws_templates/<라벨>_<n>.wav)
+URGENT_KEYWORDS = ("정지", "stop")
+
 class VoiceCommandManager:
     def __init__(self, parent, log_callback, drone_controller):
         """음성 명령 관리자 초기화"""
@@ -14,19 +16,67 @@ class VoiceCommandManager:
         
         # STT/LLM 관련 변수
         self.audio_recorder = None
-        self.stt = None
-        self.llm = None
+        self._reported_overflows = 0
+        self._reported_truncations = 0
         self.is_recording = False
         
+        # STT/LLM 모델 관리 (백그라운드 교체, 메모리 예산, 유휴 해제)
+        from model_manager import ModelManager
+        self.models = ModelManager(log=log_callback)
+        self.model_memory_budget_gb = 0.0  # 0 이면 제한 없음
+        self.model_idle_timeout_sec = 0.0  # 0 이면 유휴 해제 안 함
+        self.keep_previous_models = False  # 교체된 모델을 예산 안에서 대기 모델로 남김 (A/B 비교)
+        
         # 설정 변수 초기화 (기본값)
         self.stt_model_var = tk.StringVar(value="openai/whisper-large-v3-turbo")
         self.llm_model_var = tk.StringVar(value="google/gemma-3-1b-it")
+        self.draft_llm_model_var = tk.StringVar(value="")
         self.prompt_path_var = tk.StringVar(value="prompt.txt")
         self.cache_dir_var = tk.StringVar(value="../model_cache")
+        self.kws_template_dir_var = tk.StringVar(value="kws_templates")
+        self.kws_threshold = 0.15
+        self.hands_free_var = tk.BooleanVar(value=False)
+        
+        # 호출어 게이트 (핸즈프리 모드)
+        self.keyword_gate = None
+        
+        # 단일 처리 파이프라인 (새 발화가 진행 중인 처리를 선점)
+        self.pipeline = None
+        
+        # 비행 기록기 (빈 값이면 기록 안 함)
+        self.flight_log_dir = "flight_logs"
+        self.telemetry_interval_sec = 1.0
+        self.flight_recorder = None
+        self.telemetry_sampler = None
+        
+        # 단계별 프로파일링 (profile_dir 또는 VCON_PROFILE_DIR 이 있을 때만 사용)
+        self.profile_dir = ""
+        self.profile_torch_ops = True
+        self.profiler = None
+        
+        # 발화당 처리 시간 예산 (STT + LLM, 초)
+        self.latency_budget_sec = 5.0
+        self.inference = None
+        
+        # LLM 출력 스트리밍 (명령이 확정되면 바로 남은 생성 취소)
+        self.stream_llm = True
+        
+        # STT 디코딩 프로파일 (command: greedy/짧은 출력/명령 어휘 프롬프트) 과 디코더 컴파일 여부
+        # (컴파일은 모델을 읽을 때마다 워밍업 시간이 들어 설정에서 켤 때만 사용)
+        self.stt_decode_profile = "command"
+        self.stt_compile = False
+        
+        # LLM 앞 단계 의도 분류기 (train_intent.py 로 만든 모델 파일이 있을 때만 사용)
+        self.intent_model_path = "intent_model.npz"
+        self.intent_threshold = 0.9
+        
+        # 구성 요소별 CPU 스레드 수/affinity (app 에서 voice_settings.json 으로 생성)
+        self.resource_plan = getattr(parent, "resource_plan", None)
         
         # UI 컴포넌트 참조 저장 변수 초기화
         self.stt_model_entry = None
         self.llm_model_entry = None
+        self.draft_llm_model_entry = None
         self.prompt_path_entry = None
         self.cache_dir_entry = None
         self.browse_button = None
@@ -37,17 +87,41 @@ class VoiceCommandManager:
         self.llm_status_var = None
         self.voice_status_var = None
         self.voice_record_button = None
+        self.hands_free_check = None
         self.recognized_command_var = None
         self.save_settings_button = None
         
+    @property
+    def stt(self):
+        """현재 STT 모델 (유휴 해제되어 내려가 있으면 None)"""
+        return self.models.get("stt")
+    
+    @property
+    def llm(self):
+        """현재 LLM 모델 (유휴 해제되어 내려가 있으면 None)"""
+        return self.models.get("llm")
+    
     def create_widgets(self, frame):
         """음성 제어 위젯 생성"""
         # 저장된 설정 불러오기
         self.load_settings()
+        self.models.memory_budget_gb = self.model_memory_budget_gb or None
+        self.models.idle_timeout_sec = self.model_idle_timeout_sec or None
+        self.models.keep_previous = self.keep_previous_models
         
         # 캐시 디렉토리 확인 및 생성
         os.makedirs(self.cache_dir_var.get(), exist_ok=True)
         
+        # 비행 기록 시작
+        self._start_flight_recorder()
+        
+        # 프로파일링 (켜져 있을 때만 드론 명령 전송을 감쌈)
+        from profiling import create_profiler
+        self.profiler = create_profiler(self.profile_dir, self.profile_torch_ops)
+        if self.profiler is not None:
+            self.profiler.wrap(self.drone_controller, "execute_drone_command", "dispatch", torch_ops=False)
+            self.log(f"프로파일링 사용: {self.profiler.output_dir} ({self.profiler.sampler})")
+        
         # 모델 로딩 프레임
         model_frame = ttk.Frame(frame)
         model_frame.grid(row=0, column=0, columnspan=3, sticky=tk.W+tk.E, padx=5, pady=5)
@@ -74,21 +148,26 @@ class VoiceCommandManager:
         self.load_llm_button = ttk.Button(model_frame, text="LLM 모델 로딩", command=self.load_llm_model)
         self.load_llm_button.grid(row=1, column=3, padx=5, pady=5)
         
+        # 드래프트 모델 입력 (추측 디코딩용, 비워두면 사용 안 함)
+        ttk.Label(model_frame, text="드래프트 모델(선택):").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        self.draft_llm_model_entry = ttk.Entry(model_frame, textvariable=self.draft_llm_model_var, width=30)
+        self.draft_llm_model_entry.grid(row=2, column=1, sticky=tk.W+tk.E, padx=5, pady=5)
+        
         # 프롬프트 파일 경로 입력 및 브라우징 버튼
-        ttk.Label(model_frame, text="프롬프트 파일:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Label(model_frame, text="프롬프트 파일:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
         self.prompt_path_entry = ttk.Entry(model_frame, textvariable=self.prompt_path_var, width=30)
-        self.prompt_path_entry.grid(row=2, column=1, sticky=tk.W+tk.E, padx=5, pady=5)
+        self.prompt_path_entry.grid(row=3, column=1, sticky=tk.W+tk.E, padx=5, pady=5)
         
         self.browse_button = ttk.Button(model_frame, text="찾아보기", command=self.browse_prompt_file)
-        self.browse_button.grid(row=2, column=2, padx=5, pady=5)
+        self.browse_button.grid(row=3, column=2, padx=5, pady=5)
         
         # 캐시 디렉토리 입력 및 브라우징 버튼
-        ttk.Label(model_frame, text="캐시 디렉토리:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        ttk.Label(model_frame, text="캐시 디렉토리:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=5)
         self.cache_dir_entry = ttk.Entry(model_frame, textvariable=self.cache_dir_var, width=30)
-        self.cache_dir_entry.grid(row=3, column=1, sticky=tk.W+tk.E, padx=5, pady=5)
+        self.cache_dir_entry.grid(row=4, column=1, sticky=tk.W+tk.E, padx=5, pady=5)
         
         self.cache_browse_button = ttk.Button(model_frame, text="찾아보기", command=self.browse_cache_dir)
-        self.cache_browse_button.grid(row=3, column=2, padx=5, pady=5)
+        self.cache_browse_button.grid(row=4, column=2, padx=5, pady=5)
         
         # 열 늘리기 설정
         model_frame.columnconfigure(1, weight=1)
@@ -101,6 +180,11 @@ class VoiceCommandManager:
         self.voice_record_button = ttk.Button(frame, text="음성 명령  시작", command=self.toggle_voice_recording, state=tk.DISABLED)
         self.voice_record_button.grid(row=4, column=0, padx=5, pady=5)
         
+        # 핸즈프리 모드 (호출어 뒤의 발화만 처리)
+        self.hands_free_check = ttk.Checkbutton(frame, text="핸즈프리 (호출어)", variable=self.hands_free_var,
+                                                command=self.toggle_hands_free, state=tk.DISABLED)
+        self.hands_free_check.grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
+        
         # 음성 인식 결과 표시 레이블
         ttk.Label(frame, text="인식된 명령:").grid(row=5, column=0, sticky=tk.W, padx=5, pady=5)
         
@@ -116,36 +200,33 @@ class VoiceCommandManager:
         self.save_settings_button.pack(side=tk.RIGHT, padx=5, pady=5)
         
     def load_stt_model(self):
-        """STT 모델 로딩 버튼 핸들러"""
-        if self.stt is not None:
-            messagebox.showinfo("알림", "이미 STT 모델이 로딩되어 있습니다.")
-            return
-            
+        """STT 모델 로딩 버튼 핸들러 (이미 로딩되어 있으면 백그라운드에서 읽은 뒤 발화 사이에 교체)"""
         # 모델 ID 가져오기
         model_id = self.stt_model_var.get().strip()
         if not model_id:
             messagebox.showerror("오류", "STT 모델 ID를 입력해주세요.")
             return
+        
+        key = f"stt:{model_id} ({self.stt_decode_profile}{', compile' if self.stt_compile else ''})"
+        if key == self.models.active_key("stt"):
+            messagebox.showinfo("알림", "같은 설정의 STT 모델을 이미 사용 중입니다.")
+            return
             
         # AudioRecorder 초기화 (먼저 한 번만 초기화)
         if self.audio_recorder is None:
             from stt import AudioRecorder
             self.audio_recorder = AudioRecorder()
             
-        self.stt_status_var.set("로딩 중...")
+        self.stt_status_var.set("교체 중..." if self.models.has("stt") else "로딩 중...")
         self.load_stt_button.config(state=tk.DISABLED)
         self.log(f"음성 인식(STT) 모델 '{model_id}'을 로딩합니다...")
         
-        # STT 모델 초기화 (백그라운드 스레드에서 실행)
-        self.stt_init_thread = threading.Thread(target=self._initialize_stt, args=(model_id,), daemon=True)
-        self.stt_init_thread.start()
+        # STT 모델 초기화 (백그라운드 스레드에서 실행, 현재 모델은 교체 전까지 계속 사용)
+        self.models.load("stt", key, lambda: self._initialize_stt(model_id),
+                         on_done=lambda stt, error: self._on_stt_loaded(model_id, stt, error))
     
     def load_llm_model(self):
-        """LLM 모델 로딩 버튼 핸들러"""
-        if self.llm is not None:
-            messagebox.showinfo("알림", "이미 LLM 모델이 로딩되어 있습니다.")
-            return
-        
+        """LLM 모델 로딩 버튼 핸들러 (이미 로딩되어 있으면 백그라운드에서 읽은 뒤 발화 사이에 교체)"""
         # 모델명 가져오기
         model_name = self.llm_model_var.get().strip()
         if not model_name:
@@ -158,14 +239,25 @@ class VoiceCommandManager:
             messagebox.showerror("오류", "프롬프트 파일 경로를 입력해주세요.")
             return
             
-        self.llm_status_var.set("로딩 중...")
+        draft_model_name = self.draft_llm_model_var.get().strip() or None
+        
+        # 프롬프트 파일을 고친 경우에도 다시 읽도록 수정 시각을 키에 포함
+        prompt_mtime = os.path.getmtime(prompt_file) if os.path.exists(prompt_file) else 0
+        key = f"llm:{model_name}{' + ' + draft_model_name if draft_model_name else ''} ({prompt_file}@{prompt_mtime:.0f})"
+        if key == self.models.active_key("llm"):
+            messagebox.showinfo("알림", "같은 설정의 LLM 모델을 이미 사용 중입니다.")
+            return
+            
+        self.llm_status_var.set("교체 중..." if self.models.has("llm") else "로딩 중...")
         self.load_llm_button.config(state=tk.DISABLED)
         self.log(f"언어 모델(LLM) '{model_name}'을 로딩합니다...")
         self.log(f"프롬프트 파일: {prompt_file}")
+        if draft_model_name:
+            self.log(f"드래프트 모델: {draft_model_name} (추측 디코딩)")
         
-        # LLM 모델 초기화 (백그라운드 스레드에서 실행)
-        self.llm_init_thread = threading.Thread(target=self._initialize_llm, args=(model_name, prompt_file), daemon=True)
-        self.llm_init_thread.start()
+        # LLM 모델 초기화 (백그라운드 스레드에서 실행, 현재 모델은 교체 전까지 계속 사용)
+        self.models.load("llm", key, lambda: self._initialize_llm(model_name, prompt_file, draft_model_name),
+                         on_done=lambda llm, error: self._on_llm_loaded(model_name, prompt_file, draft_model_name, llm, error))
     
     def browse_prompt_file(self):
         """프롬프트 파일 브라우징"""
@@ -196,9 +288,28 @@ class VoiceCommandManager:
             settings = {
                 'stt_model': self.stt_model_var.get(),
                 'llm_model': self.llm_model_var.get(),
+                'draft_llm_model': self.draft_llm_model_var.get(),
                 'prompt_path': self.prompt_path_var.get(),
-                'cache_dir': self.cache_dir_var.get()
+                'cache_dir': self.cache_dir_var.get(),
+                'kws_template_dir': self.kws_template_dir_var.get(),
+                'kws_threshold': self.kws_threshold,
+                'latency_budget_sec': self.latency_budget_sec,
+                'stream_llm': self.stream_llm,
+                'stt_decode_profile': self.stt_decode_profile,
+                'stt_compile': self.stt_compile,
+                'model_memory_budget_gb': self.model_memory_budget_gb,
+                'model_idle_timeout_sec': self.model_idle_timeout_sec,
+                'keep_previous_models': self.keep_previous_models,
+                'intent_model_path': self.intent_model_path,
+                'intent_threshold': self.intent_threshold,
+                'flight_log_dir': self.flight_log_dir,
+                'telemetry_interval_sec': self.telemetry_interval_sec,
+                'profile_dir': self.profile_dir,
+                'profile_torch_ops': self.profile_torch_ops,
+                'connect_timeout_sec': self.drone_controller.serial_manager.connect_timeout_sec
             }
+            if self.resource_plan is not None:
+                settings['resource_plan'] = self.resource_plan.settings
             
             with open('voice_settings.json', 'w', encoding='utf-8') as f:
                 json.dump(settings, f, ensure_ascii=False, indent=4)
@@ -223,6 +334,9 @@ class VoiceCommandManager:
                 if 'llm_model' in settings and settings['llm_model']:
                     self.llm_model_var.set(settings['llm_model'])
                     
+                if 'draft_llm_model' in settings:
+                    self.draft_llm_model_var.set(settings['draft_llm_model'] or "")
+                    
                 if 'prompt_path' in settings and settings['prompt_path']:
                     self.prompt_path_var.set(settings['prompt_path'])
                     
@@ -230,85 +344,159 @@ class VoiceCommandManager:
                     self.cache_dir_var.set(settings['cache_dir'])
                     # 캐시 디렉토리는 생성 시점을 create_widgets로 이동
                 
+                if 'kws_template_dir' in settings and settings['kws_template_dir']:
+                    self.kws_template_dir_var.set(settings['kws_template_dir'])
+                    
+                if 'kws_threshold' in settings:
+                    self.kws_threshold = float(settings['kws_threshold'])
+                    
+                if 'latency_budget_sec' in settings:
+                    self.latency_budget_sec = float(settings['latency_budget_sec'])
+                    
+                if 'stream_llm' in settings:
+                    self.stream_llm = bool(settings['stream_llm'])
+                    
+                if 'stt_decode_profile' in settings and settings['stt_decode_profile']:
+                    self.stt_decode_profile = settings['stt_decode_profile']
+                    
+                if 'stt_compile' in settings:
+                    self.stt_compile = bool(settings['stt_compile'])
+                    
+                if 'model_memory_budget_gb' in settings:
+                    self.model_memory_budget_gb = float(settings['model_memory_budget_gb'] or 0)
+                    
+                if 'model_idle_timeout_sec' in settings:
+                    self.model_idle_timeout_sec = float(settings['model_idle_timeout_sec'] or 0)
+                    
+                if 'keep_previous_models' in settings:
+                    self.keep_previous_models = bool(settings['keep_previous_models'])
+                    
+                if 'intent_model_path' in settings:
+                    self.intent_model_path = settings['intent_model_path'] or ""
+                    
+                if 'intent_threshold' in settings:
+                    self.intent_threshold = float(settings['intent_threshold'])
+                    
+                if 'flight_log_dir' in settings:
+                    self.flight_log_dir = settings['flight_log_dir'] or ""
+                    
+                if 'telemetry_interval_sec' in settings:
+                    self.telemetry_interval_sec = float(settings['telemetry_interval_sec'])
+                    
+                if 'profile_dir' in settings:
+                    self.profile_dir = settings['profile_dir'] or ""
+                    
+                if 'profile_torch_ops' in settings:
+                    self.profile_torch_ops = bool(settings['profile_torch_ops'])
+                    
+                if 'connect_timeout_sec' in settings:
+                    self.drone_controller.serial_manager.connect_timeout_sec = float(settings['connect_timeout_sec'])
+                
                 self.log("저장된 설정을 불러왔습니다.")
         except Exception as e:
             self.log(f"설정 불러오기 중 오류 발생: {str(e)}")
             # 오류가 발생해도 기본값으로 계속 진행
     
     def _initialize_stt(self, model_id):
-        """STT 모델 초기화 (백그라운드 스레드)"""
-        try:
-            from stt import SpeechToText
-            self.stt = SpeechToText(
+        """STT 모델 생성 (모델 관리자의 로딩 스레드, 유휴 해제 후 다시 읽을 때도 사용)"""
+        from stt import SpeechToText
+        if self.profiler is not None:
+            stt = self.profiler.call("load_stt", SpeechToText, model_id=model_id,
+                                     cache_dir=self.cache_dir_var.get(), language="korean",
+                                     resource_plan=self.resource_plan,
+                                     decode_profile=self.stt_decode_profile,
+                                     compile_decoder=self.stt_compile)
+            self.profiler.wrap(stt, "transcribe", "stt")
+        else:
+            stt = SpeechToText(
                 model_id=model_id,
                 cache_dir=self.cache_dir_var.get(),
-                language="korean"
+                language="korean",
+                resource_plan=self.resource_plan,
+                decode_profile=self.stt_decode_profile,
+                compile_decoder=self.stt_compile
             )
-            self.log(f"음성 인식(STT) 시스템이 초기화되었습니다. 모델: {model_id}")
-            self.parent.after(0, self._update_stt_status, True)
-        except Exception as e:
-            self.log(f"STT 초기화 오류: {str(e)}")
+        return stt
+    
+    def _on_stt_loaded(self, model_id, stt, error):
+        """STT 로딩/교체 완료 (모델 관리자의 로딩 스레드)"""
+        if error is not None:
+            self.log(f"STT 초기화 오류: {str(error)}")
             self.parent.after(0, self._update_stt_status, False)
+            return
+        self.log(f"음성 인식(STT) 시스템이 초기화되었습니다. 모델: {model_id}")
+        self._record_session(stt_model=model_id, stt_decode_profile=self.stt_decode_profile,
+                             stt_compiled=stt.compiled)
+        self.log(self.models.describe())
+        self.parent.after(0, self._update_stt_status, True)
     
-    def _initialize_llm(self, model_name, prompt_file):
-        """LLM 모델 초기화 (백그라운드 스레드)"""
-        try:
-            from llm import LLMChat
-            self.llm = LLMChat(
+    def _initialize_llm(self, model_name, prompt_file, draft_model_name=None):
+        """LLM 모델 생성 (모델 관리자의 로딩 스레드, 유휴 해제 후 다시 읽을 때도 사용)"""
+        from llm import LLMChat
+        if self.profiler is not None:
+            llm = self.profiler.call("load_llm", LLMChat, model_name=model_name, cache_dir=self.cache_dir_var.get(),
+                                     prompt_file=prompt_file, draft_model_name=draft_model_name,
+                                     resource_plan=self.resource_plan)
+            self.profiler.wrap(llm, "chat", "llm")
+        else:
+            llm = LLMChat(
                 model_name=model_name,
                 cache_dir=self.cache_dir_var.get(),
-                prompt_file=prompt_file
+                prompt_file=prompt_file,
+                draft_model_name=draft_model_name,
+                resource_plan=self.resource_plan
             )
-            self.log(f"언어 모델(LLM) 시스템이 초기화되었습니다. 모델: {model_name}")
-            self.parent.after(0, self._update_llm_status, True)
-        except Exception as e:
-            self.log(f"LLM 초기화 오류: {str(e)}")
+        return llm
+    
+    def _on_llm_loaded(self, model_name, prompt_file, draft_model_name, llm, error):
+        """LLM 로딩/교체 완료 (모델 관리자의 로딩 스레드)"""
+        if error is not None:
+            self.log(f"LLM 초기화 오류: {str(error)}")
             self.parent.after(0, self._update_llm_status, False)
+            return
+        self.log(f"언어 모델(LLM) 시스템이 초기화되었습니다. 모델: {model_name}")
+        self._record_session(llm_model=model_name, draft_llm_model=draft_model_name,
+                             prompt_file=prompt_file, prompt=llm.system_prompt)
+        self.log(self.models.describe())
+        self.parent.after(0, self._update_llm_status, True)
     
     def _update_stt_status(self, success):
-        """STT 상태 업데이트"""
+        """STT 상태 업데이트 (입력 필드는 잠그지 않음 - 언제든 다른 모델로 교체 가능)"""
+        self.load_stt_button.config(state=tk.NORMAL)
         if success:
             self.stt_status_var.set("로딩 완료")
-            self.load_stt_button.config(state=tk.DISABLED)
-            self.stt_model_entry.config(state=tk.DISABLED)  # 입력 필드 비활성화
-            # STT가 로딩 완료되었어도 LLM이 로딩되지 않았으면 캐시 디렉토리는 여전히 수정 가능해야 함
-            if self.llm is None:
-                self.cache_dir_entry.config(state=tk.NORMAL)
-                self.cache_browse_button.config(state=tk.NORMAL)
         else:
-            self.stt_status_var.set("로딩 실패")
-            self.load_stt_button.config(state=tk.NORMAL)
-            self.stt = None
+            # 교체에 실패하면 이전 모델을 계속 사용
+            self.stt_status_var.set("로딩 실패 (이전 모델 사용)" if self.models.has("stt") else "로딩 실패")
         
         # 음성 제어 버튼 상태 업데이트
         self._update_voice_control_ui()
     
     def _update_llm_status(self, success):
-        """LLM 상태 업데이트"""
+        """LLM 상태 업데이트 (입력 필드는 잠그지 않음 - 언제든 다른 모델로 교체 가능)"""
+        self.load_llm_button.config(state=tk.NORMAL)
         if success:
             self.llm_status_var.set("로딩 완료")
-            self.load_llm_button.config(state=tk.DISABLED)
-            self.llm_model_entry.config(state=tk.DISABLED)  # 입력 필드 비활성화
-            self.prompt_path_entry.config(state=tk.DISABLED)  # 입력 필드 비활성화
-            self.browse_button.config(state=tk.DISABLED)  # 브라우즈 버튼 비활성화
-            self.cache_dir_entry.config(state=tk.DISABLED)  # 캐시 디렉토리 입력 필드 비활성화
-            self.cache_browse_button.config(state=tk.DISABLED)  # 캐시 디렉토리 브라우즈 버튼 비활성화
         else:
-            self.llm_status_var.set("로딩 실패")
-            self.load_llm_button.config(state=tk.NORMAL)
-            self.llm = None
+            # 교체에 실패하면 이전 모델을 계속 사용
+            self.llm_status_var.set("로딩 실패 (이전 모델 사용)" if self.models.has("llm") else "로딩 실패")
         
         # 음성 제어 버튼 상태 업데이트
         self._update_voice_control_ui()
     
     def _update_voice_control_ui(self):
         """음성 제어 UI 업데이트"""
-        if self.stt is not None and self.llm is not None and self.drone_controller.is_drone_connected():
+        if self.models.has("stt") and self.models.has("llm") and self.drone_controller.is_drone_connected():
             # STT와 LLM 모두 초기화되고 드론이 연결되어 있으면 버튼 활성화
             self.voice_record_button.config(state=tk.NORMAL)
+            self.hands_free_check.config(state=tk.NORMAL)
             self.voice_status_var.set("음성 인식 준비 완료")
         else:
             self.voice_record_button.config(state=tk.DISABLED)
+            self.hands_free_check.config(state=tk.DISABLED)
+            if self.hands_free_var.get():
+                self.hands_free_var.set(False)
+                self.toggle_hands_free()
             if not self.drone_controller.is_drone_connected():
                 self.voice_status_var.set("드론이 연결되지 않음")
             else:
@@ -320,7 +508,7 @@ class VoiceCommandManager:
             messagebox.showerror("연결 오류", "드론이 연결되어 있지 않습니다.")
             return
             
-        if self.stt is None or self.llm is None:
+        if not (self.models.has("stt") and self.models.has("llm")):
             messagebox.showerror("초기화 오류", "STT와 LLM 모델이 모두 로딩되어야 합니다. 각 모델 로딩 버튼을 클릭해주세요.")
             return
         
@@ -331,9 +519,64 @@ class VoiceCommandManager:
         else:
             self.start_recording()
     
+    def toggle_hands_free(self):
+        """핸즈프리(호출어) 모드 시작/중지"""
+        if not self.hands_free_var.get():
+            if self.keyword_gate is not None:
+                self.keyword_gate.stop()
+                self.log(f"핸즈프리 모드 종료 (호출어 {self.keyword_gate.detections}회 검출, "
+                         f"전달 {self.keyword_gate.forwarded_sec:.1f}초, 검출기 CPU {self.keyword_gate.cpu_load * 100:.1f}%)")
+                self.keyword_gate = None
+            return
+        
+        try:
+            from keyword_spotter import KeywordSpotter, KeywordGate
+            
+            spotter = KeywordSpotter.from_directory(self.kws_template_dir_var.get(), threshold=self.kws_threshold)
+            self.keyword_gate = KeywordGate(
+                self.audio_recorder,
+                spotter,
+                on_utterance=self._on_keyword_utterance,
+                on_detection=self._on_keyword_detected
+            )
+            self.keyword_gate.start()
+            self.log(f"핸즈프리 모드 시작: 호출어 {', '.join(spotter.templates)} 대기 중")
+        except Exception as e:
+            self.log(f"핸즈프리 모드 시작 오류: {str(e)}")
+            self.hands_free_var.set(False)
+            self.keyword_gate = None
+    
+    def _on_keyword_utterance(self, audio):
+        """호출어 뒤 발화 수신 (게이트 스레드에서 호출)"""
+        self._get_pipeline().submit(audio)
+    
+    def _on_keyword_detected(self, detection):
+        """호출어 검출 (게이트 스레드에서 호출), 긴급 호출어면 STT 없이 바로 정지"""
+        self.log(f"호출어 '{detection.label}' 검출 (거리 {detection.distance:.3f}, 지연 {detection.latency_sec * 1000:.0f}ms)")
+        if detection.label in URGENT_KEYWORDS:
+            self.log("긴급 호출어: 처리 중인 명령을 취소하고 즉시 정지합니다.")
+            self._get_pipeline().dispatch_urgent("stop")
+    
+    def _get_pipeline(self):
+        """파이프라인 컨트롤러 (처음 사용할 때 생성)"""
+        if self.pipeline is None:
+            from pipeline_controller import PipelineController
+            self.pipeline = PipelineController(
+                self._infer_command,
+                self.drone_controller.execute_mission,
+                self.log,
+                on_done=lambda: self.parent.after(0, self.update_ui_after_processing),
+                on_dispatched=self._record_dispatch
+            )
+        return self.pipeline
+    
     def start_recording(self):
         """음성 녹음 시작"""
         try:
+            # 처리 중인 이전 발화가 있으면 취소 (새 명령이 우선)
+            if self.pipeline is not None and self.pipeline.busy:
+                self.pipeline.preempt("새 녹음 시작")
+            
             self.is_recording = True
             self.voice_status_var.set("녹음 중... (클릭하여 중지)")
             self.voice_record_button.config(text="음성 녹음 중지")
@@ -357,79 +600,122 @@ class VoiceCommandManager:
             self.is_recording = False
             self.voice_status_var.set("녹음 중지, 처리 중...")
             self.voice_record_button.config(text="음성 녹음 시작")
-            self.voice_record_button.config(state=tk.DISABLED)  # 처리 중 비활성화
             
-            # 녹음 중지 및 파일 가져오기
-            audio_file = self.audio_recorder.stop_recording()
+            # 녹음 중지 및 오디오 가져오기 (16 kHz float32, 임시 파일 없이 메모리에서 처리)
+            audio = self.audio_recorder.stop_recording_audio()
+            self._report_capture_errors()
             
-            if audio_file:
-                # 처리 스레드 시작
-                process_thread = threading.Thread(
-                    target=self.process_audio_file,
-                    args=(audio_file,),
-                    daemon=True
-                )
-                process_thread.start()
+            if audio is not None:
+                # 파이프라인에 제출 (처리 중에도 녹음 버튼은 계속 사용 가능)
+                self._get_pipeline().submit(audio)
             else:
                 self.log("녹음된 오디오가 없습니다.")
                 self.voice_status_var.set("음성 인식 준비 완료")
-                self.voice_record_button.config(state=tk.NORMAL)
                 
         except Exception as e:
             self.log(f"음성 녹음 중지 오류: {str(e)}")
             self.voice_status_var.set("음성 인식 준비 완료")
-            self.voice_record_button.config(state=tk.NORMAL)
     
-    def process_audio_file(self, audio_file):
-        """오디오 파일 처리 (별도 스레드에서 실행)"""
+    def _report_capture_errors(self):
+        """입력 오버플로/잘린 발화가 새로 발생했으면 로그에 표시"""
+        recorder = self.audio_recorder
+        if recorder.overflow_count > self._reported_overflows:
+            self.log(f"오디오 입력 오버플로 {recorder.overflow_count - self._reported_overflows}회 발생 "
+                     f"(누적 {recorder.overflow_count}회)")
+            self._reported_overflows = recorder.overflow_count
+        if recorder.truncated_count > self._reported_truncations:
+            self.log(f"녹음이 최대 길이를 넘어 앞부분이 잘렸습니다 (누적 {recorder.truncated_count}회)")
+            self._reported_truncations = recorder.truncated_count
+    
+    def _start_flight_recorder(self):
+        """비행 기록기와 텔레메트리 샘플러 시작"""
+        if not self.flight_log_dir or self.flight_recorder is not None:
+            return
         try:
-            # 음성을 텍스트로 변환
-            text = self.stt.transcribe(audio_file)
-            self.log(f"인식된 음성: {text}")
+            from flight_recorder import FlightRecorder, TelemetrySampler
             
-            # LLM으로 명령어 처리
-            response = self.llm.chat(text)
-            command = self.parse_llm_response(response)
+            self.flight_recorder = FlightRecorder(self.flight_log_dir, resource_plan=self.resource_plan)
+            self.telemetry_sampler = TelemetrySampler(
+                self.flight_recorder, self.drone_controller.get_telemetry, self.telemetry_interval_sec,
+                resource_plan=self.resource_plan
+            )
+            self._record_session(latency_budget_sec=self.latency_budget_sec, stream_llm=self.stream_llm,
+                                 intent_model_path=self.intent_model_path, intent_threshold=self.intent_threshold)
+            self.log(f"비행 기록: {self.flight_recorder.path}")
+        except Exception as e:
+            self.log(f"비행 기록 시작 오류: {str(e)}")
+            self.flight_recorder = None
+    
+    def _record_session(self, **fields):
+        if self.flight_recorder is not None:
+            from flight_recorder import SESSION
+            self.flight_recorder.record_event(SESSION, **fields)
+    
+    def _record_dispatch(self, generation, command):
+        """명령 전송 기록 (파이프라인에서 전송 직후 호출)"""
+        if self.flight_recorder is not None:
+            from flight_recorder import DISPATCH
+            self.flight_recorder.record_event(DISPATCH, generation, command=command)
+    
+    def _infer_command(self, audio, cancel_event, generation=0):
+        """
+        녹음된 오디오를 명령으로 변환 (파이프라인 작업 스레드에서 실행)
+        
+        발화마다 오디오, 인식 텍스트, LLM 출력, 명령, 단계별 지연을 비행 기록에 남깁니다.
+        
+        Returns:
+            str or None: 전송할 명령 (발화가 무시되면 None)
             
+        Raises:
+            InferenceCancelled: 새 발화가 들어와 취소된 경우
+        """
+        record = {}
+        if self.flight_recorder is not None:
+            self.flight_recorder.record_audio(generation, audio)
+        try:
+            if self.profiler is not None:
+                # 이 발화의 프로파일 파일에 발화 번호를 붙임
+                with self.profiler.utterance(generation):
+                    command = self._get_inference().run(audio, cancel_event, record)
+            else:
+                command = self._get_inference().run(audio, cancel_event, record)
+        finally:
+            if self.flight_recorder is not None:
+                from flight_recorder import UTTERANCE
+                self.flight_recorder.record_event(UTTERANCE, generation, **record)
+        
+        if command is not None:
             # UI 업데이트 (메인 스레드에서 실행)
             self.parent.after(0, lambda: self.recognized_command_var.set(command))
             self.log(f"처리된 명령: {command}")
-            
-            # 명령어에 따라 드론 제어
-            self.drone_controller.execute_drone_command(command)
-            
-            # 임시 파일 삭제
-            try:
-                os.unlink(audio_file)
-            except:
-                pass
-                
-            # UI 업데이트 (메인 스레드에서 실행)
-            self.parent.after(0, self.update_ui_after_processing)
-            
-        except Exception as e:
-            self.log(f"음성 처리 오류: {str(e)}")
-            # UI 업데이트 (메인 스레드에서 실행)
-            self.parent.after(0, self.update_ui_after_processing)
+        return command
     
-    def update_ui_after_processing(self):
-        """처리 후 UI 업데이트"""
-        self.voice_status_var.set("음성 인식 준비 완료")
-        self.voice_record_button.config(state=tk.NORMAL)
+    def _get_inference(self):
+        """명령 변환 단계 (처음 사용할 때 생성)"""
+        if self.inference is None:
+            from inference import CommandInference
+            self.inference = CommandInference(None, None, self.log, self.latency_budget_sec,
+                                              stream=self.stream_llm, classifier=self._load_intent_classifier(),
+                                              classifier_threshold=self.intent_threshold, models=self.models)
+        return self.inference
     
-    def parse_llm_response(self, response):
-        """LLM 응답 파싱"""
+    def _load_intent_classifier(self):
+        """의도 분류기 모델 로드 (파일이 없거나 읽지 못하면 None - 모든 발화에 LLM 사용)"""
+        if not self.intent_model_path or not os.path.exists(self.intent_model_path):
+            return None
         try:
-            # LLM 출력 구조가 문자열이라면 그대로 반환
-            if isinstance(response, str):
-                return response.strip()
-            
-            # LLM 클래스의 parse_output 메서드를 사용
-            return self.llm.parse_output(response)
-            
+            from intent_classifier import IntentClassifier
+            classifier = IntentClassifier.load(self.intent_model_path)
+            self.log(f"의도 분류기 로드: {self.intent_model_path} (라벨 {len(classifier.labels)}개, 임계값 {self.intent_threshold})")
+            return classifier
         except Exception as e:
-            self.log(f"LLM 응답 파싱 오류: {str(e)}")
-            return "알 수 없는 명령"
+            self.log(f"의도 분류기 로드 실패: {str(e)}")
+            return None
+    
+    def update_ui_after_processing(self):
+        """처리 후 UI 업데이트"""
+        if not self.is_recording:
+            self.voice_status_var.set("음성 인식 준비 완료")
     
     def on_drone_connection_changed(self):
         """드론 연결 상태 변경 시 호출되는 콜백"""
@@ -437,9 +723,30 @@ class VoiceCommandManager:
         
     def cleanup(self):
         """리소스 정리"""
+        # 호출어 게이트 중지
+        if self.keyword_gate is not None:
+            self.keyword_gate.stop()
+            self.keyword_gate = None
+        
+        # 파이프라인 작업 스레드 종료
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline = None
+        
+        # 비행 기록 마무리
+        if self.telemetry_sampler is not None:
+            self.telemetry_sampler.stop()
+            self.telemetry_sampler = None
+        if self.flight_recorder is not None:
+            self.flight_recorder.close()
+            self.flight_recorder = None
+        
+        # 모델 해제
+        self.models.close()
+            
         # 음성 녹음 중지
         if self.is_recording and hasattr(self, 'audio_recorder') and self.audio_recorder:
-            self.audio_recorder.stop_recording()
+            self.audio_recorder.stop_recording_audio()
             self.is_recording = False
             
         # 오디오 레코더 정리